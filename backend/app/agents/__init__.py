@@ -4,7 +4,15 @@ from app.agents.discovery import DiscoveryAgent
 from app.agents.vetting import VettingAgent
 from app.agents.tech_debt import TechDebtAgent
 
+# Agent registry
+AGENTS = {
+    "discovery": DiscoveryAgent,
+    "vetting": VettingAgent,
+    "tech_debt": TechDebtAgent,
+}
+
 __all__ = [
+    "AGENTS",
     "BaseAgent",
     "AgentResult",
     "DiscoveryAgent",
@@ -4,16 +4,23 @@ BaseAgent - Abstract base class for all MAK OS agents
 All agents must inherit from this class and implement the execute() method.
 The base class provides:
 - Automatic logging to agent_logs table
+- Lifecycle and progress events for GET /api/agents/stream
 - Consistent error handling
 - Async execution pattern
 """
+import time
 from abc import ABC, abstractmethod
+from dataclasses import asdict
 from datetime import datetime
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, true
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models import AgentLog
+from app.services.agent_events import (
+    agent_events, AGENT_STARTED, AGENT_PROGRESS, AGENT_FINISHED, AGENT_FAILED
+)
 from dataclasses import dataclass
 
 @dataclass
@@ -41,11 +48,16 @@ class BaseAgent(ABC):
                 )
     """
     
+    # Agents that scan the leads table can be split across worker
+    # processes; each job then carries a "partition": [index, count]
+    partitionable = False
+    
     def __init__(self, name: str, description: str = ""):
         self.name = name
         self.description = description
         self._start_time: Optional[datetime] = None
         self._log_id: Optional[int] = None
+        self._last_progress = 0.0
     
     @abstractmethod
     async def execute(self, context: Optional[Dict[str, Any]] = None) -> AgentResult:
@@ -60,6 +72,30 @@ class BaseAgent(ABC):
         """
         pass
     
+    def partition_filter(self, context: Optional[Dict[str, Any]], id_column):
+        """SQL condition limiting a scan to this job's partition of lead ids"""
+        if context and context.get("partition"):
+            index, count = context["partition"]
+            return id_column % count == index
+        return true()
+    
+    def report_progress(self, leads_processed: int, **data: Any):
+        """
+        Publish an agent.progress event. Calls closer together than
+        AGENT_PROGRESS_INTERVAL seconds are dropped (the finished event
+        carries the final numbers).
+        """
+        now = time.monotonic()
+        if now - self._last_progress < settings.agent_progress_interval:
+            return
+        self._last_progress = now
+        agent_events.publish(
+            AGENT_PROGRESS, self.name,
+            log_id=self._log_id,
+            leads_processed=leads_processed,
+            **data
+        )
+    
     async def run(self, context: Optional[Dict[str, Any]] = None) -> AgentResult:
         """
         Run the agent with automatic logging.
@@ -81,6 +117,9 @@ class BaseAgent(ABC):
             self._log_id = log.id
             await db.commit()
         
+        self._last_progress = 0.0
+        agent_events.publish(AGENT_STARTED, self.name, log_id=self._log_id)
+        
         try:
             # Execute the agent logic
             result = await self.execute(context)
@@ -92,6 +131,12 @@ class BaseAgent(ABC):
                 error_message=result.error_message
             )
             
+            agent_events.publish(
+                AGENT_FINISHED, self.name,
+                log_id=self._log_id,
+                duration=(datetime.utcnow() - self._start_time).total_seconds(),
+                **asdict(result)
+            )
             return result
             
         except Exception as e:
@@ -102,6 +147,13 @@ class BaseAgent(ABC):
                 leads_processed=0,
                 error_message=error_msg
             )
+            agent_events.publish(
+                AGENT_FAILED, self.name,
+                log_id=self._log_id,
+                duration=(datetime.utcnow() - self._start_time).total_seconds(),
+                status='failed',
+                error_message=error_msg
+            )
             
             # Re-raise the exception
             raise
@@ -2,15 +2,24 @@
 DiscoveryAgent - Ingests leads from n8n discovery workflows
 
 This agent receives bulk lead data from n8n and:
-1. Deduplicates by website
-2. Creates new leads in the database
-3. Returns count of processed leads
+1. Deduplicates by normalized website key (within the batch and against the database)
+2. Flags leads without a website whose company name + region closely match an
+   existing lead (or an earlier one in the batch) with Lead.duplicate_of
+3. Creates new leads in the database with a single INSERT ... ON CONFLICT DO NOTHING
+4. Publishes the new lead ids on the event bus (leads.discovered) for vetting
+5. Returns count of processed leads
 """
+from contextlib import nullcontext
 from typing import Dict, Any, List
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from app.agents.base import BaseAgent, AgentResult
-from app.database import AsyncSessionLocal
+from app.config import settings
+from app.database import AsyncSessionLocal, dialect_insert
 from app.models import Lead
+from app.services.dedup import normalize_website
+from app.services.event_bus import event_bus, LEADS_DISCOVERED
+from app.services.lead_counters import apply_deltas, count_keys
+from app.services.name_index import name_index
 
 class DiscoveryAgent(BaseAgent):
     """
@@ -47,39 +56,91 @@ class DiscoveryAgent(BaseAgent):
             )
         
         lead_data = context["leads"]
+        fuzzy = settings.fuzzy_dedup_enabled
+        leads = Lead.__table__
+        returned = (leads.c.id, leads.c.company_name, leads.c.website_key, leads.c.region,
+                    leads.c.status, leads.c.vetting_status, leads.c.duplicate_of)
+        
+        new_count = 0
+        pending_keys = []
         
         async with AsyncSessionLocal() as db:
-            new_count = 0
-            duplicate_count = 0
-            
-            for item in lead_data:
-                # Extract website for deduplication
-                website = item.get("website")
-                
-                # Check if lead already exists
-                if website:
-                    result = await db.execute(
-                        select(Lead).where(Lead.website == website)
-                    )
-                    existing = result.scalar_one_or_none()
+            # Runs that check names at the same time would miss each other's leads
+            async with name_index.exclusive(db) if fuzzy else nullcontext():
+                try:
+                    # Collapse duplicates inside the payload (first occurrence wins)
+                    rows = []
+                    near_duplicates = []  # (row, key of the lead it resembles)
+                    seen_keys = set()
+                    for item in lead_data:
+                        company_name = item.get("company_name", "Unknown")
+                        region = item.get("region")
+                        website = item.get("website")
+                        website_key = normalize_website(website)
+                        row = {
+                            "company_name": company_name,
+                            "website": website,
+                            "website_key": website_key,
+                            "region": region,
+                            "status": "new",
+                            "vetting_status": "pending"
+                        }
+                        
+                        if website_key:
+                            if website_key in seen_keys:
+                                continue
+                            seen_keys.add(website_key)
+                        elif fuzzy:
+                            # Without a website, fall back to fuzzy company name matching
+                            match = name_index.find(company_name, region)
+                            if match:
+                                near_duplicates.append((row, match[0]))
+                                continue
+                        
+                        if fuzzy:
+                            # Provisional entry so later items in this payload match it too
+                            pending_key = ("pending", len(pending_keys))
+                            pending_keys.append((pending_key, row))
+                            name_index.add(pending_key, company_name, region)
+                        rows.append(row)
+                    
+                    inserted = []
+                    if rows:
+                        # One round trip for the whole batch; the unique index on
+                        # website_key makes the database skip leads we already have
+                        stmt = (
+                            dialect_insert(leads)
+                            .on_conflict_do_nothing(index_elements=["website_key"])
+                            .returning(*returned)
+                        )
+                        result = await db.execute(stmt, rows)
+                        inserted.extend(result.all())
+                    
+                    if near_duplicates:
+                        originals = await self._resolve_pending(db, pending_keys, inserted)
+                        flagged = [
+                            {**row, "duplicate_of": originals.get(key, key)}
+                            for row, key in near_duplicates
+                        ]
+                        # No website_key, so nothing can conflict
+                        result = await db.execute(insert(leads).returning(*returned), flagged)
+                        inserted.extend(result.all())
                     
-                    if existing:
-                        duplicate_count += 1
-                        continue
-                
-                # Create new lead
-                lead = Lead(
-                    company_name=item.get("company_name", "Unknown"),
-                    website=website,
-                    region=item.get("region"),
-                    status="new",
-                    vetting_status="pending"
-                )
-                
-                db.add(lead)
-                new_count += 1
-            
-            await db.commit()
+                    new_count = len(inserted)
+                    if inserted:
+                        await apply_deltas(db, count_keys(
+                            (row.status, row.vetting_status, row.region) for row in inserted
+                        ))
+                        await db.commit()
+                finally:
+                    for pending_key, _ in pending_keys:
+                        name_index.remove(pending_key)
+        
+        if inserted:
+            event_bus.publish(LEADS_DISCOVERED, [row.id for row in inserted])
+        
+        near_duplicate_count = sum(1 for row in inserted if row.duplicate_of is not None)
+        duplicate_count = len(lead_data) - new_count
         
         return AgentResult(
             status='success',
@@ -87,6 +148,31 @@ class DiscoveryAgent(BaseAgent):
             metadata={
                 "new_leads": new_count,
                 "duplicates_skipped": duplicate_count,
+                "near_duplicates_flagged": near_duplicate_count,
                 "total_received": len(lead_data)
             }
         )
+    
+    async def _resolve_pending(self, db, pending_keys, inserted) -> Dict[Any, int]:
+        """Lead id behind each provisional index entry of this payload"""
+        by_website = {row.website_key: row.id for row in inserted if row.website_key}
+        by_name = {(row.company_name, row.region): row.id for row in inserted if not row.website_key}
+        
+        # Skipped by ON CONFLICT: the lead that already has the website
+        missing = [
+            row["website_key"] for _, row in pending_keys
+            if row["website_key"] and row["website_key"] not in by_website
+        ]
+        if missing:
+            result = await db.execute(
+                select(Lead.website_key, Lead.id).where(Lead.website_key.in_(missing))
+            )
+            by_website.update(result.all())
+        
+        # Leads without a website that share a name and region would have
+        # matched each other, so (name, region) identifies them
+        return {
+            key: by_website[row["website_key"]] if row["website_key"]
+            else by_name[(row["company_name"], row["region"])]
+            for key, row in pending_keys
+        }
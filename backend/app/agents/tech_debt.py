@@ -6,10 +6,18 @@ This agent:
 2. Sends their websites to n8n for analysis
 3. n8n analyzes: page speed, SEO, security, tech stack
 4. n8n calls back to update lead with findings
+
+Dispatches run concurrently, at most TECH_DEBT_CONCURRENCY at a time.
+With "lead_ids" in the context (set by the lead pipeline for newly
+approved leads) only those leads are considered.
 """
+import asyncio
+import math
+import time
 from typing import Dict, Any
 from sqlalchemy import select, and_
 from app.agents.base import BaseAgent, AgentResult
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models import Lead
 from app.services import n8n_bridge
@@ -19,6 +27,8 @@ class TechDebtAgent(BaseAgent):
     Triggers tech debt analysis for approved leads
     """
     
+    partitionable = True
+    
     def __init__(self):
         super().__init__(
             name="Tech Debt Agent",
@@ -31,39 +41,82 @@ class TechDebtAgent(BaseAgent):
         
         Context (optional):
         {
-            "limit": 10  # Max number of leads to process per run
+            "limit": 10,         # Max number of leads to process per run
+            "concurrency": 5,    # Max n8n requests in flight
+            "lead_ids": [1, 2],  # Only these leads (defaults limit to their count)
+            "partition": [0, 2]  # Only leads with id % 2 == 0 (set by the job queue)
         }
         """
+        lead_ids = context.get("lead_ids") if context else None
+        
         limit = 10
         if context and "limit" in context:
             limit = context["limit"]
+        elif lead_ids is not None:
+            limit = len(lead_ids)
+        elif context and context.get("partition"):
+            # Split the per-run limit across partitions
+            limit = math.ceil(limit / context["partition"][1])
+        
+        concurrency = settings.tech_debt_concurrency
+        if context and "concurrency" in context:
+            concurrency = context["concurrency"]
+        
+        async def dispatch(lead: Lead) -> tuple[bool, str | None, float]:
+            """Trigger n8n for one lead, returning (success, error, seconds)"""
+            async with semaphore:
+                started = time.perf_counter()
+                success, error = await n8n_bridge.trigger_tech_debt_analysis(
+                    lead_id=lead.id,
+                    website=lead.website
+                )
+                dispatched[success] += 1
+                self.report_progress(
+                    dispatched[True],
+                    dispatched=dispatched[True] + dispatched[False],
+                    failed=dispatched[False],
+                    total=len(leads_to_enrich)
+                )
+                return success, error, time.perf_counter() - started
+        
+        conditions = [
+            Lead.vetting_status == "approved",
+            Lead.website.isnot(None),
+            # Not yet enriched (either no pain_points or score is 0)
+            (Lead.pain_points.is_(None)) | (Lead.score == 0),
+            self.partition_filter(context, Lead.id)
+        ]
+        if lead_ids is not None:
+            conditions.append(Lead.id.in_(lead_ids))
         
         async with AsyncSessionLocal() as db:
             # Find approved leads without enrichment
             # (leads with no pain_points or score = 0)
             result = await db.execute(
-                select(Lead).where(
-                    and_(
-                        Lead.vetting_status == "approved",
-                        Lead.website.isnot(None),
-                        # Not yet enriched (either no pain_points or score is 0)
-                        (Lead.pain_points.is_(None)) | (Lead.score == 0)
-                    )
-                ).limit(limit)
+                select(Lead).where(and_(*conditions)).limit(limit)
             )
             leads_to_enrich = result.scalars().all()
             
+            # In batch mode the bridge coalesces requests itself, so let
+            # every lead reach the batcher at once
+            if n8n_bridge.batches("enrichment-tech"):
+                concurrency = max(concurrency, len(leads_to_enrich))
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            dispatched = {True: 0, False: 0}  # n8n calls done, by success
+            
             success_count = 0
             failed_count = 0
             errors = []
             
-            for lead in leads_to_enrich:
-                # Trigger n8n workflow
-                success, error = await n8n_bridge.trigger_tech_debt_analysis(
-                    lead_id=lead.id,
-                    website=lead.website
-                )
-                
+            # Fan out to n8n, bounded by the semaphore
+            run_started = time.perf_counter()
+            results = await asyncio.gather(
+                *(dispatch(lead) for lead in leads_to_enrich)
+            )
+            wall_clock = time.perf_counter() - run_started
+            sequential = sum(elapsed for _, _, elapsed in results)
+            
+            for lead, (success, error, _) in zip(leads_to_enrich, results):
                 if success:
                     # Mark lead as "enriching" (processing)
                     lead.status = "enriching"
@@ -93,6 +146,10 @@ class TechDebtAgent(BaseAgent):
             metadata={
                 "success": success_count,
                 "failed": failed_count,
-                "total_candidates": len(leads_to_enrich)
+                "total_candidates": len(leads_to_enrich),
+                "concurrency": concurrency,
+                "wall_clock_seconds": round(wall_clock, 2),
+                "sequential_seconds": round(sequential, 2),
+                "time_saved_seconds": round(max(sequential - wall_clock, 0), 2)
             }
         )
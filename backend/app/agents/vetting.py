@@ -6,22 +6,46 @@ This agent reviews pending leads and:
 2. Rejects leads that don't (with reason)
 3. Updates vetting_status accordingly
 
-Business Rules:
+Business Rules (defaults, see app/services/vetting_rules.py):
 - REJECT if no website
 - REJECT if company_name is too short (< 3 chars)
 - APPROVE otherwise
+
+Rules are declarative and compile to set-based UPDATE statements (or a
+batch predicate for rules SQL cannot express) over keyset-paginated
+chunks of pending lead ids, with one commit per chunk. Leads are never
+loaded into ORM objects.
+
+Approved ids are published on the event bus (leads.approved) after each
+chunk commits. With "lead_ids" in the context only those leads are vetted.
 """
+import re
+from collections import Counter
 from typing import Dict, Any
-from sqlalchemy import select
+from sqlalchemy import select, update, and_
 from app.agents.base import BaseAgent, AgentResult
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models import Lead
+from app.services.entity_cache import invalidate_after_commit
+from app.services.event_bus import event_bus, LEADS_APPROVED
+from app.services.lead_counters import apply_deltas, count_keys
+from app.services.vetting_rules import load_rules
+
+def _moved(counted, changed_ids, status, vetting_status) -> Counter:
+    """lead_counters deltas for leads moving from their counted key to (status, vetting_status)"""
+    old = [counted[lead_id] for lead_id in changed_ids if lead_id in counted]
+    deltas = count_keys(old, sign=-1)
+    deltas.update(count_keys((status, vetting_status, region) for _, _, region in old))
+    return deltas
 
 class VettingAgent(BaseAgent):
     """
     Vets pending leads based on business rules
     """
     
+    partitionable = True
+    
     def __init__(self):
         super().__init__(
             name="Vetting Agent",
@@ -31,48 +55,124 @@ class VettingAgent(BaseAgent):
     async def execute(self, context: Dict[str, Any] | None = None) -> AgentResult:
         """
         Vet all pending leads.
+        
+        Context (optional):
+        {
+            "chunk_size": 1000,   # Leads vetted per transaction
+            "rules": [...],       # Rule dicts overriding VETTING_RULES for this run
+            "lead_ids": [1, 2],   # Only vet these leads (set by the lead pipeline)
+            "partition": [0, 2]   # Only vet leads with id % 2 == 0 (set by the job queue)
+        }
         """
-        async with AsyncSessionLocal() as db:
-            # Get all pending leads
-            result = await db.execute(
-                select(Lead).where(Lead.vetting_status == "pending")
+        chunk_size = settings.vetting_chunk_size
+        if context and "chunk_size" in context:
+            chunk_size = context["chunk_size"]
+        
+        try:
+            rules = load_rules(context.get("rules") if context else None)
+        except (ValueError, TypeError, re.error) as e:
+            return AgentResult(
+                status='failed',
+                leads_processed=0,
+                error_message=f"Invalid vetting rules: {e}"
             )
-            pending_leads = result.scalars().all()
-            
-            approved_count = 0
-            rejected_count = 0
-            
-            for lead in pending_leads:
-                rejection_reason = None
+        
+        in_partition = self.partition_filter(context, Lead.id)
+        if context and context.get("lead_ids") is not None:
+            in_partition = and_(in_partition, Lead.id.in_(context["lead_ids"]))
+        
+        approved_count = 0
+        rejected_count = 0
+        rejection_reasons: Dict[str, int] = {}
+        last_id = 0
+        
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Next page of pending ids (keyset pagination on id), with the
+                # fields lead_counters are keyed on
+                result = await db.execute(
+                    select(Lead.id, Lead.status, Lead.region)
+                    .where(Lead.vetting_status == "pending", Lead.id > last_id, in_partition)
+                    .order_by(Lead.id)
+                    .limit(chunk_size)
+                )
+                counted = {row.id: (row.status, "pending", row.region) for row in result.all()}
+                ids = list(counted)
+                
+                if not ids:
+                    break
                 
-                # Rule 1: Must have a website
-                if not lead.website or len(lead.website) < 4:
-                    rejection_reason = "No valid website"
+                deltas = Counter()
                 
-                # Rule 2: Company name must be meaningful
-                elif not lead.company_name or len(lead.company_name) < 3:
-                    rejection_reason = "Invalid company name"
+                # Exactly the rows counted above: a lead committed into this
+                # id range since then is left for the next run
+                in_chunk = and_(Lead.vetting_status == "pending", Lead.id.in_(ids))
+                last_id = ids[-1]
                 
-                # Apply verdict
-                if rejection_reason:
-                    lead.vetting_status = "rejected"
+                for rule in rules:
+                    predicate = rule.sql_predicate()
+                    
+                    if predicate is None:
+                        # Rule has no SQL form: evaluate it over the chunk's column
+                        result = await db.execute(
+                            select(Lead.id, rule.column).where(in_chunk)
+                        )
+                        rows = result.all()
+                        failed = rule.batch_predicate([row[1] for row in rows])
+                        failing_ids = [row[0] for row, fail in zip(rows, failed) if fail]
+                        if not failing_ids:
+                            continue
+                        predicate = Lead.id.in_(failing_ids)
+                    
                     # Store rejection reason in pain_points for now
                     # (could add dedicated column in future)
-                    lead.pain_points = {"rejection_reason": rejection_reason}
-                    lead.status = "rejected"
-                    rejected_count += 1
-                else:
-                    lead.vetting_status = "approved"
-                    lead.status = "vetted"
-                    approved_count += 1
+                    result = await db.execute(
+                        update(Lead)
+                        .where(in_chunk, predicate)
+                        .values(
+                            vetting_status="rejected",
+                            status="rejected",
+                            pain_points={"rejection_reason": rule.reason}
+                        )
+                        .returning(Lead.id)
+                        .execution_options(synchronize_session=False)
+                    )
+                    rejected_ids = result.scalars().all()
+                    deltas.update(_moved(counted, rejected_ids, "rejected", "rejected"))
+                    count = len(rejected_ids)
+                    rejected_count += count
+                    if count:
+                        rejection_reasons[rule.reason] = rejection_reasons.get(rule.reason, 0) + count
+                
+                # Whatever is still pending in this chunk passed every rule
+                result = await db.execute(
+                    update(Lead)
+                    .where(in_chunk)
+                    .values(vetting_status="approved", status="vetted")
+                    .returning(Lead.id)
+                    .execution_options(synchronize_session=False)
+                )
+                approved_ids = result.scalars().all()
+                deltas.update(_moved(counted, approved_ids, "vetted", "approved"))
+                approved_count += len(approved_ids)
+                
+                await apply_deltas(db, deltas)
+                invalidate_after_commit(db, Lead, list(counted))
+                await db.commit()
             
-            await db.commit()
+            event_bus.publish(LEADS_APPROVED, approved_ids)
+            self.report_progress(
+                approved_count + rejected_count,
+                approved=approved_count,
+                rejected=rejected_count
+            )
         
         return AgentResult(
             status='success',
             leads_processed=approved_count + rejected_count,
             metadata={
                 "approved": approved_count,
-                "rejected": rejected_count
+                "rejected": rejected_count,
+                "rejection_reasons": rejection_reasons
             }
         )
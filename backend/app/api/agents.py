@@ -1,40 +1,31 @@
 """
 Agents API Routes - Control and monitor agents
 """
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
-from app.models import AgentLog
-from app.schemas import AgentExecuteRequest, AgentLogResponse
-from app.agents import DiscoveryAgent, VettingAgent, TechDebtAgent
+from app.models import AgentLog, AgentJob, AgentSchedule
+from app.schemas import AgentExecuteRequest, AgentLogResponse, AgentJobResponse, AgentScheduleResponse
+from app.agents import AGENTS
+from app.config import settings
+from app.services import job_queue
+from app.services.agent_events import agent_events, format_sse
+from app.services.etag import conditional_get
+from app.services.job_runner import job_runner
 from typing import List
 
 router = APIRouter()
 
-# Agent registry
-AGENTS = {
-    "discovery": DiscoveryAgent,
-    "vetting": VettingAgent,
-    "tech_debt": TechDebtAgent,
-}
-
-async def run_agent_background(agent_name: str, context: dict | None):
-    """Background task to run an agent"""
-    agent_class = AGENTS.get(agent_name.lower())
-    if not agent_class:
-        return
-    
-    agent = agent_class()
-    await agent.run(context)
-
 @router.post("/execute")
 async def execute_agent(
     request: AgentExecuteRequest,
-    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Trigger an agent to execute in the background
+    Queue an agent for execution. Poll /jobs/{job_id} for its status.
     """
     agent_name = request.agent_name.lower()
     
@@ -44,20 +35,92 @@ async def execute_agent(
             detail=f"Agent '{request.agent_name}' not found. Available: {list(AGENTS.keys())}"
         )
     
-    # Schedule agent execution in background
-    background_tasks.add_task(
-        run_agent_background,
-        agent_name,
-        request.context
-    )
+    jobs = await job_queue.enqueue(db, agent_name, request.context)
+    await db.commit()
+    job_runner.notify(agent_name)
     
     return {
-        "status": "scheduled",
+        "status": "queued",
+        "job_id": jobs[0].id,
+        "job_ids": [job.id for job in jobs],  # One per worker partition
         "agent_name": request.agent_name,
-        "message": f"Agent {request.agent_name} scheduled for execution"
+        "message": f"Agent {request.agent_name} queued for execution"
     }
 
-@router.get("/logs", response_model=List[AgentLogResponse])
+@router.get("/jobs", response_model=List[AgentJobResponse], dependencies=[Depends(conditional_get("agent_jobs"))])
+async def list_agent_jobs(
+    skip: int = 0,
+    limit: int = 50,
+    agent_name: str | None = None,
+    status: str | None = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List queued, running and finished agent jobs"""
+    query = select(AgentJob).order_by(AgentJob.id.desc())
+    
+    if agent_name:
+        query = query.where(AgentJob.agent_name == agent_name)
+    if status:
+        query = query.where(AgentJob.status == status)
+    
+    query = query.offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+@router.get("/jobs/{job_id}", response_model=AgentJobResponse)
+async def get_agent_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status of an agent job"""
+    result = await db.execute(select(AgentJob).where(AgentJob.id == job_id))
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+@router.get("/schedules", response_model=List[AgentScheduleResponse])
+async def list_agent_schedules(db: AsyncSession = Depends(get_db)):
+    """Next and last runs of agents scheduled with AGENT_SCHEDULES"""
+    result = await db.execute(select(AgentSchedule).order_by(AgentSchedule.agent_name))
+    return result.scalars().all()
+
+@router.get("/stream")
+async def stream_agent_events(
+    agent_name: str | None = None,
+    last_event_id: str | None = Header(None)
+):
+    """
+    Server-Sent Events feed of agent runs in this process: agent.started,
+    agent.progress, agent.finished and agent.failed. Reconnecting clients
+    (EventSource sends Last-Event-ID) get the events they missed.
+    """
+    try:
+        after_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        after_id = None
+    
+    async def events():
+        with agent_events.subscribe(after_id) as queue:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.agent_stream_heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if agent_name is None or event["agent_name"] == agent_name:
+                    yield format_sse(event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/logs", response_model=List[AgentLogResponse], dependencies=[Depends(conditional_get("agent_logs"))])
 async def get_agent_logs(
     skip: int = 0,
     limit: int = 50,
@@ -1,17 +1,95 @@
 """
 Leads API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from collections import Counter
+from datetime import datetime
+import json
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.database import get_db
-from app.models import Lead
-from app.schemas import LeadCreate, LeadUpdate, LeadResponse
-from typing import List
-import httpx
+from sqlalchemy import delete, false, func, select, update
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import AsyncSessionLocal, engine, get_db
+from app.models import Lead, LeadImport, OutreachDraft, Project
+from app.schemas import (
+    LeadCreate, LeadUpdate, LeadResponse, LeadStatsResponse, LeadSummaryResponse,
+    LeadFilter, LeadSelection, LeadBulkUpdate, LeadImportResponse, LeadChangesResponse
+)
+from app.services import n8n_bridge
+from app.models.lead import LEAD_SCORE_SORT
+from app.models.lead_counter import counter_key
+from app.services.entity_cache import lead_cache, invalidate_after_commit
+from app.services.etag import conditional_get
+from app.services.lead_export import ExportFormat, MEDIA_TYPES, stream_leads
+from app.services.lead_import import (
+    ImportFormat, create_import, insert_leads, resume_import, run_spooled_import, spool_upload
+)
+from app.services.lead_search import search_leads
+from app.services.lead_changes import (
+    CursorExpired, lead_change_notifier, parse_cursor, read_changes, record_deletions, start_cursor
+)
+from app.services.lead_counters import apply_deltas, count_keys, read_summary
+from app.services.lead_stats import get_lead_stats
+from app.services.pagination import (
+    encode_cursor, decode_cursor, sort_expression, after_cursor, estimate_count
+)
+from typing import Any, Dict, List, Literal
 
 router = APIRouter()
 
+# Keyset orders for list_leads, each backed by a (sort key, id) index
+SORT_COLUMNS = {
+    "created_at": Lead.created_at,
+    "score": LEAD_SCORE_SORT,
+}
+
+def filter_conditions(lead_filter: LeadFilter) -> list:
+    """WHERE clauses for a LeadFilter"""
+    conditions = []
+    if lead_filter.status:
+        conditions.append(Lead.status == lead_filter.status)
+    if lead_filter.region:
+        conditions.append(Lead.region == lead_filter.region)
+    if lead_filter.vetting_status:
+        conditions.append(Lead.vetting_status == lead_filter.vetting_status)
+    if lead_filter.min_score is not None:
+        conditions.append(Lead.score >= lead_filter.min_score)
+    if lead_filter.max_score is not None:
+        conditions.append(Lead.score <= lead_filter.max_score)
+    if lead_filter.created_after:
+        conditions.append(Lead.created_at >= lead_filter.created_after)
+    if lead_filter.created_before:
+        conditions.append(Lead.created_at < lead_filter.created_before)
+    return conditions
+
+def filter_params(
+    status: str | None = None,
+    region: str | None = None,
+    vetting_status: str | None = None,
+    min_score: int | None = Query(None, ge=0, le=100),
+    max_score: int | None = Query(None, ge=0, le=100),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None
+) -> LeadFilter:
+    """LeadFilter from query parameters (list and export endpoints)"""
+    return LeadFilter(
+        status=status,
+        region=region,
+        vetting_status=vetting_status,
+        min_score=min_score,
+        max_score=max_score,
+        created_after=created_after,
+        created_before=created_before
+    )
+
+def selection_conditions(selection: LeadSelection) -> list:
+    """WHERE clauses for the leads a bulk request targets"""
+    if selection.ids is not None:
+        return [Lead.id.in_(selection.ids)]
+    return filter_conditions(selection.filter)
+
 @router.post("/", response_model=LeadResponse, status_code=201)
 async def create_lead(
     lead: LeadCreate,
@@ -20,41 +98,437 @@ async def create_lead(
     """Create a new lead"""
     db_lead = Lead(**lead.model_dump())
     db.add(db_lead)
-    await db.flush()
+    
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="A lead with this website already exists")
+    
     await db.refresh(db_lead)
     return db_lead
 
-@router.get("/", response_model=List[LeadResponse])
+@router.get("/", response_model=List[LeadResponse], dependencies=[Depends(conditional_get("leads"))])
 async def list_leads(
-    skip: int = 0,
-    limit: int = 100,
-    status: str | None = None,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1),
+    sort: Literal["created_at", "score"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    lead_filter: LeadFilter = Depends(filter_params),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List leads with optional filtering, one keyset page at a time.
+    
+    Pass the X-Next-Cursor response header back as `cursor` for the next
+    page (same sort, order and filters); it is absent on the last page.
+    X-Total-Estimate approximates the number of matching leads. On SQLite
+    with filters (or without ANALYZE) it is an exact count that stops at
+    10000; X-Total-Estimate-Capped: true then says there are more.
+    """
+    limit = min(limit, settings.leads_max_page_size)
+    sort_column = SORT_COLUMNS[sort]
+    descending = order == "desc"
+    
+    conditions = filter_conditions(lead_filter)
+    
+    query = select(Lead, sort_expression(sort_column).label("sort_value")).where(*conditions)
+    
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if position.get("sort") != sort or position.get("order") != order:
+                raise ValueError("Cursor was issued for a different sort order")
+            query = query.where(
+                after_cursor(sort_column, Lead.id, position["value"], int(position["id"]), descending)
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    
+    sort_key = sort_expression(sort_column)
+    if descending:
+        query = query.order_by(sort_key.desc(), Lead.id.desc())
+    else:
+        query = query.order_by(sort_key.asc(), Lead.id.asc())
+    
+    # One extra row tells whether another page follows
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+    
+    if len(rows) > limit:
+        last_lead, last_value = rows[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "sort": sort,
+            "order": order,
+            "value": last_value,
+            "id": last_lead.id
+        })
+    
+    estimate, capped = await estimate_count(db, Lead.__table__, conditions)
+    if estimate is not None:
+        response.headers["X-Total-Estimate"] = str(estimate)
+    if capped:
+        response.headers["X-Total-Estimate-Capped"] = "true"
+    
+    return [lead for lead, _ in rows[:limit]]
+
+@router.get("/search", response_model=List[LeadResponse], dependencies=[Depends(conditional_get("leads"))])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1),
+    lead_filter: LeadFilter = Depends(filter_params),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all leads with optional filtering"""
-    query = select(Lead)
+    """
+    Full-text search over company name, website, region and pain points,
+    best matches first. Every word must match; the last one may be the
+    start of a word.
     
-    if status:
-        query = query.where(Lead.status == status)
+    Pass the X-Next-Cursor response header back as `cursor` (with the same
+    `q` and filters) for the next page. Only the newest
+    LEAD_SEARCH_MAX_CANDIDATES matches are ranked; X-Search-Truncated: true
+    says older matches were left out (narrow the query or the filters).
+    """
+    limit = min(limit, settings.leads_max_page_size)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    leads = result.scalars().all()
+    position = None
+    if cursor:
+        try:
+            decoded = decode_cursor(cursor)
+            if decoded.get("q") != q:
+                raise ValueError("Cursor was issued for a different query")
+            position = {"rank": float(decoded["rank"]), "id": int(decoded["id"])}
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    
+    leads, next_position, truncated = await search_leads(
+        db, q, filter_conditions(lead_filter), limit, position
+    )
+    if next_position is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor({"q": q, **next_position})
+    if truncated:
+        response.headers["X-Search-Truncated"] = "true"
     return leads
 
+@router.patch("/")
+async def update_leads_bulk(
+    request: LeadBulkUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply the same changes to every lead matching `ids` or `filter`
+    with one UPDATE statement. Returns the number of leads updated.
+    """
+    changes = request.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    
+    rows = await _update_counted(db, selection_conditions(request), changes)
+    
+    deltas = Counter()
+    for _, old_key, new_key in rows:
+        deltas[old_key] -= 1
+        deltas[new_key] += 1
+    await apply_deltas(db, deltas)
+    invalidate_after_commit(db, Lead, [lead_id for lead_id, _, _ in rows])
+    
+    return {"updated": len(rows)}
+
+async def _update_counted(db: AsyncSession, conditions: list, changes: Dict[str, Any]) -> list:
+    """
+    UPDATE the leads matching conditions. Returns (id, old counter key,
+    new counter key) for every updated lead, read by the update itself so
+    concurrent writes can't skew lead_counters.
+    """
+    counted = (Lead.status, Lead.vetting_status, Lead.region)
+    
+    if engine.dialect.name == "postgresql":
+        # UPDATE ... FROM the locked rows, returning the old values beside the new
+        old = (
+            select(Lead.id, *counted)
+            .where(*conditions)
+            .with_for_update()
+            .subquery("old")
+        )
+        result = await db.execute(
+            update(Lead)
+            .where(Lead.id == old.c.id)
+            .values(**changes)
+            .returning(
+                Lead.id,
+                old.c.status, old.c.vetting_status, old.c.region,
+                *counted
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return [
+            (row[0], counter_key(*row[1:4]), counter_key(*row[4:7]))
+            for row in result.all()
+        ]
+    
+    # SQLite's RETURNING can't read other tables. Take the database write
+    # lock first (an UPDATE matching nothing), so the rows read below stay
+    # as they are until this transaction commits
+    await db.execute(
+        update(Lead).where(false()).values(id=Lead.id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(select(Lead.id, *counted).where(*conditions))
+    old_keys = {row.id: counter_key(*row[1:]) for row in result.all()}
+    
+    result = await db.execute(
+        update(Lead)
+        .where(*conditions)
+        .values(**changes)
+        .returning(Lead.id, *counted)
+        .execution_options(synchronize_session=False)
+    )
+    return [(row.id, old_keys[row.id], counter_key(*row[1:])) for row in result.all()]
+
+@router.delete("/")
+async def delete_leads_bulk(
+    request: LeadSelection,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete every lead matching `ids` or `filter` (`{"filter": {}}` deletes
+    all leads) with set-based statements. Their outreach drafts and
+    projects are deleted too, and near-duplicates of the lead lose their
+    duplicate_of flag.
+    """
+    conditions = selection_conditions(request)
+    target_ids = select(Lead.id).where(*conditions)
+    
+    drafts = await db.execute(
+        delete(OutreachDraft)
+        .where(OutreachDraft.lead_id.in_(target_ids))
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        delete(Project)
+        .where(Project.lead_id.in_(target_ids))
+        .returning(Project.id)
+        .execution_options(synchronize_session=False)
+    )
+    project_ids = result.scalars().all()
+    invalidate_after_commit(db, Project, project_ids)
+    result = await db.execute(
+        update(Lead)
+        .where(Lead.duplicate_of.in_(target_ids))
+        .values(duplicate_of=None)
+        .returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_after_commit(db, Lead, result.scalars().all())
+    result = await db.execute(
+        delete(Lead)
+        .where(*conditions)
+        .returning(Lead.id, Lead.status, Lead.vetting_status, Lead.region)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    await apply_deltas(db, count_keys(
+        ((row.status, row.vetting_status, row.region) for row in rows), sign=-1
+    ))
+    
+    await record_deletions(db, [row.id for row in rows])
+    invalidate_after_commit(db, Lead, [row.id for row in rows])
+    
+    return {
+        "deleted": len(rows),
+        "outreach_drafts_deleted": drafts.rowcount,
+        "projects_deleted": len(project_ids)
+    }
+
+@router.get("/export")
+async def export_leads(
+    format: ExportFormat = "ndjson",
+    lead_filter: LeadFilter = Depends(filter_params)
+):
+    """
+    Stream every lead matching the filters (same as GET /api/leads) as
+    NDJSON or CSV, in id order.
+    
+    Rows are read with a server-side cursor on a connection held by the
+    response stream, not the request session.
+    """
+    filename = f"leads-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_leads(filter_conditions(lead_filter), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _start_import(
+    lead_import: LeadImport,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks
+) -> LeadImport:
+    """Take the upload and run the import after responding"""
+    upload = await spool_upload(lead_import.id, request.stream())
+    background_tasks.add_task(run_spooled_import, lead_import.id, upload, lead_import.format)
+    response.headers["Location"] = f"/api/leads/imports/{lead_import.id}"
+    return lead_import
+
+@router.post("/imports", response_model=LeadImportResponse, status_code=202)
+async def import_leads(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    format: ImportFormat = "ndjson",
+    filename: str | None = None
+):
+    """
+    Import leads from an NDJSON or CSV request body.
+    
+    The import is recorded before the body is read and answered with 202
+    as soon as the upload is in; the `Location` header points at its
+    progress (GET /api/leads/imports/{id}). Rows are then committed in
+    chunks of LEAD_IMPORT_CHUNK_SIZE in the background; websites that
+    already exist are skipped, and a failed chunk is rolled back and
+    stops the import.
+    """
+    lead_import = await create_import(format, filename)
+    return await _start_import(lead_import, request, response, background_tasks)
+
+@router.post("/imports/{import_id}/resume", response_model=LeadImportResponse, status_code=202)
+async def resume_import_upload(
+    import_id: int,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks
+):
+    """
+    Continue a failed import. Send the same input again: rows up to the
+    failed chunk (rows_read) are skipped, the rest is imported as in
+    POST /api/leads/imports.
+    """
+    try:
+        lead_import = await resume_import(import_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not lead_import:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return await _start_import(lead_import, request, response, background_tasks)
+
+@router.get("/imports", response_model=List[LeadImportResponse])
+async def list_imports(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Most recent imports first"""
+    result = await db.execute(select(LeadImport).order_by(LeadImport.id.desc()).limit(limit))
+    return result.scalars().all()
+
+@router.get("/imports/{import_id}", response_model=LeadImportResponse)
+async def get_import(
+    import_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of an import"""
+    lead_import = await db.get(LeadImport, import_id)
+    if not lead_import:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return lead_import
+
+async def _change_events(position: Dict[str, Any], limit: int):
+    """
+    SSE body for GET /api/leads/changes: one `changes` event per page, or
+    a `resync` event and the end of the stream once the cursor expired
+    """
+    yield "retry: 3000\n\n"
+    while True:
+        has_more = True
+        while has_more:
+            async with AsyncSessionLocal() as db:
+                try:
+                    page = await read_changes(db, position, limit)
+                except CursorExpired as e:
+                    yield f"event: resync\ndata: {json.dumps({'detail': str(e)})}\n\n"
+                    return
+            position, has_more = parse_cursor(page["cursor"]), page["has_more"]
+            if page["changes"] or page["deleted"]:
+                data = json.dumps(jsonable_encoder(page))
+                yield f"id: {page['cursor']}\nevent: changes\ndata: {data}\n\n"
+        
+        version = await lead_change_notifier.wait_for_change(position["seq"], settings.lead_changes_heartbeat)
+        if version is None:
+            yield ": keep-alive\n\n"
+
+@router.get("/changes", response_model=LeadChangesResponse)
+async def lead_changes(
+    request: Request,
+    since: str | None = None,
+    limit: int = Query(100, ge=1),
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Leads changed or deleted since a cursor, for incremental sync.
+    
+    Without `since` only a cursor for "now" is returned: take it before
+    loading the board, then pull changes from it. Follow `cursor` while
+    `has_more` is true.
+    
+    With `Accept: text/event-stream` (EventSource) the same pages are
+    pushed as `changes` events as soon as leads change; the event id is
+    the cursor, so reconnects resume where they left off (Last-Event-ID
+    takes precedence over `since`).
+    
+    Cursors older than LEAD_CHANGES_RETENTION_DAYS get 410 Gone (a
+    `resync` event on streams): reload the board and take a new cursor.
+    """
+    limit = min(limit, settings.lead_changes_page_size)
+    cursor = last_event_id or since
+    
+    try:
+        position = parse_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if "text/event-stream" in request.headers.get("accept", ""):
+        if position is None:
+            position = parse_cursor(await start_cursor(db))
+        return StreamingResponse(
+            _change_events(position, limit),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    if position is None:
+        return {"changes": [], "deleted": [], "cursor": await start_cursor(db), "has_more": False}
+    try:
+        return await read_changes(db, position, limit)
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+@router.get("/stats", response_model=LeadStatsResponse, dependencies=[Depends(conditional_get("leads"))])
+async def lead_stats(db: AsyncSession = Depends(get_db)):
+    """Lead counts by status, vetting status and region, plus score distribution"""
+    return await get_lead_stats(db)
+
+@router.get("/summary", response_model=LeadSummaryResponse, dependencies=[Depends(conditional_get("leads"))])
+async def lead_summary(db: AsyncSession = Depends(get_db)):
+    """Pipeline counts from the incrementally maintained lead_counters table"""
+    return await read_summary(db)
+
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific lead by ID"""
-    result = await db.execute(select(Lead).where(Lead.id == lead_id))
-    lead = result.scalar_one_or_none()
-    
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
+    """Get a specific lead by ID (served from the entity cache when possible)"""
+    async def load():
+        result = await db.execute(select(Lead).where(Lead.id == lead_id))
+        lead = result.scalar_one_or_none()
+        if not lead:
+            raise HTTPException(status_code=404, detail="Lead not found")
+        return LeadResponse.model_validate(lead)
     
-    return lead
+    return await lead_cache.get_or_load(lead_id, load)
 
 @router.patch("/{lead_id}", response_model=LeadResponse)
 async def update_lead(
@@ -74,7 +548,11 @@ async def update_lead(
     for field, value in update_data.items():
         setattr(lead, field, value)
     
-    await db.flush()
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="A lead with this website already exists")
+    
     await db.refresh(lead)
     return lead
 
@@ -91,64 +569,57 @@ async def delete_lead(
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     
+    # Near-duplicates of this lead become originals
+    result = await db.execute(
+        update(Lead)
+        .where(Lead.duplicate_of == lead_id)
+        .values(duplicate_of=None)
+        .returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_after_commit(db, Lead, result.scalars().all())
     await db.delete(lead)
     return None
 
 @router.post("/bulk")
 async def create_leads_bulk(
-    leads: List[LeadCreate],
+    leads: List[Dict[str, Any]],
     db: AsyncSession = Depends(get_db)
 ):
-    """Create multiple leads at once"""
-    db_leads = []
-    successful = 0
-    failed = 0
-    errors = []
+    """
+    Create multiple leads at once.
     
-    for idx, lead_data in enumerate(leads):
-        try:
-            db_lead = Lead(**lead_data.model_dump())
-            db.add(db_lead)
-            db_leads.append(db_lead)
-            successful += 1
-        except Exception as e:
-            failed += 1
-            errors.append({
-                "index": idx,
-                "company_name": lead_data.company_name,
-                "error": str(e)
-            })
-    
-    try:
-        await db.flush()
-        for db_lead in db_leads:
-            await db.refresh(db_lead)
-    except Exception as e:
-        await db.rollback()
+    Rows are validated one by one and inserted with chunked
+    INSERT ... RETURNING statements. Invalid rows and websites that already
+    exist are reported in `errors` (by index) without failing the others.
+    `ids` lists the created leads in request order.
+    """
+    if len(leads) > settings.leads_bulk_max_size:
         raise HTTPException(
-            status_code=500,
-            detail=f"Database error during bulk insert: {str(e)}"
+            status_code=413,
+            detail=f"At most {settings.leads_bulk_max_size} leads per request"
         )
     
+    created, skipped, invalid = await insert_leads(db, list(enumerate(leads)))
+    errors = sorted(skipped + invalid, key=lambda error: error["index"])
+    
     return {
-        "successful": successful,
-        "failed": failed,
+        "successful": len(created),
+        "failed": len(errors),
         "errors": errors,
-        "total": len(leads)
+        "total": len(leads),
+        "ids": [row.id for _, row in created]
     }
 
 @router.post("/discover")
 async def discover_leads():
     """Trigger n8n workflow to discover new leads"""
-    n8n_webhook_url = "https://mak-n8n.onrender.com/webhook/discover-leads"
+    success, error = await n8n_bridge.trigger_lead_discovery()
     
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(n8n_webhook_url)
-            response.raise_for_status()
-            return {"status": "success", "message": "Lead discovery triggered"}
-    except httpx.HTTPError as e:
+    if not success:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to trigger n8n workflow: {str(e)}"
+            detail=f"Failed to trigger n8n workflow: {error}"
         )
+    
+    return {"status": "success", "message": "Lead discovery triggered"}
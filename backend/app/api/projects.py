@@ -7,6 +7,8 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import Project
 from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.services.entity_cache import project_cache
+from app.services.etag import conditional_get
 from typing import List
 
 router = APIRouter()
@@ -23,7 +25,7 @@ async def create_project(
     await db.refresh(db_project)
     return db_project
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("/", response_model=List[ProjectResponse], dependencies=[Depends(conditional_get("projects"))])
 async def list_projects(
     skip: int = 0,
     limit: int = 100,
@@ -39,14 +41,15 @@ async def get_project(
     project_id: int,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific project"""
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
-    
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    """Get a specific project (served from the entity cache when possible)"""
+    async def load():
+        result = await db.execute(select(Project).where(Project.id == project_id))
+        project = result.scalar_one_or_none()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return ProjectResponse.model_validate(project)
     
-    return project
+    return await project_cache.get_or_load(project_id, load)
 
 @router.patch("/{project_id}", response_model=ProjectResponse)
 async def update_project(
@@ -1,12 +1,13 @@
 """
 Webhooks API - Endpoints for n8n integration
 """
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
-from app.agents import DiscoveryAgent
 from app.models import Lead
+from app.services import n8n_bridge, job_queue
+from app.services.job_runner import job_runner
 from pydantic import BaseModel
 from typing import List
 
@@ -16,28 +17,22 @@ class DiscoveryWebhookPayload(BaseModel):
     """Payload from n8n discovery workflow"""
     leads: List[dict]
 
-async def process_discovery_leads(payload: dict):
-    """Background task to process discovery leads"""
-    agent = DiscoveryAgent()
-    await agent.run(context=payload)
-
 @router.post("/discovery")
 async def discovery_webhook(
     payload: DiscoveryWebhookPayload,
-    background_tasks: BackgroundTasks
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Receive leads from n8n discovery workflows.
-    Triggers DiscoveryAgent in background.
+    Queues a DiscoveryAgent job.
     """
-    # Schedule agent execution
-    background_tasks.add_task(
-        process_discovery_leads,
-        {"leads": payload.leads}
-    )
+    jobs = await job_queue.enqueue(db, "discovery", {"leads": payload.leads})
+    await db.commit()
+    job_runner.notify("discovery")
     
     return {
         "received": len(payload.leads),
+        "job_id": jobs[0].id,
         "message": "Leads queued for processing"
     }
 
@@ -73,3 +68,11 @@ async def enrichment_callback(
         "lead_id": lead_id,
         "message": "Enrichment data applied"
     }
+
+@router.get("/n8n/status")
+async def n8n_status():
+    """
+    Outbound n8n call health: per-workflow call/retry counters and circuit
+    breaker state, plus the shared rate limiter.
+    """
+    return n8n_bridge.status()
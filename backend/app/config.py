@@ -2,6 +2,7 @@
 Configuration and environment management
 """
 import os
+from typing import Any, Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +13,72 @@ class Settings(BaseSettings):
     n8n_webhook_base: str = "https://mak-n8n.onrender.com/webhook"
     n8n_basic_auth_user: str | None = None
     n8n_basic_auth_password: str | None = None
+    n8n_max_connections: int = 20
+    n8n_max_keepalive_connections: int = 10
+    n8n_keepalive_expiry: float = 30.0  # Seconds an idle connection stays open
+    n8n_http2: bool = False  # Requires the optional "h2" package
+    n8n_batch_workflows: List[str] = []  # Workflows whose webhook takes an array of payloads; others get one call per lead
+    n8n_batch_max_size: int = 50
+    n8n_batch_max_delay: float = 0.5  # Seconds to wait for a batch to fill
+    n8n_retry_attempts: int = 3  # Total attempts per call, including the first
+    n8n_retry_base_delay: float = 1.0
+    n8n_retry_max_delay: float = 10.0
+    n8n_retry_overrides: Dict[str, Dict[str, Any]] = {}  # Per workflow, e.g. {"discover-leads": {"max_attempts": 1}}
+    n8n_breaker_failure_threshold: int = 5  # Consecutive failed calls before failing fast
+    n8n_breaker_reset_timeout: float = 30.0  # Seconds before a trial call is let through
+    n8n_rate_limit: float = 10.0  # Requests per second (0 disables)
+    n8n_rate_burst: int = 20
+    
+    # Lead Deduplication
+    fuzzy_dedup_enabled: bool = True
+    fuzzy_dedup_threshold: float = 0.8  # Trigram Jaccard similarity (0-1) of company names
+    
+    # API
+    leads_max_page_size: int = 500  # Upper bound for GET /api/leads?limit=
+    leads_bulk_max_size: int = 10000  # Leads per POST /api/leads/bulk request
+    leads_bulk_chunk_size: int = 1000  # Rows per INSERT statement
+    leads_export_batch_size: int = 1000  # Rows fetched and encoded per export chunk
+    lead_import_chunk_size: int = 1000  # Rows committed per transaction by streaming imports
+    lead_stats_cache_ttl: float = 5.0  # Seconds GET /api/leads/stats results are reused
+    lead_changes_page_size: int = 500  # Upper bound for GET /api/leads/changes?limit=
+    lead_changes_poll_interval: float = 1.0  # Seconds between leads version checks for change streams
+    lead_changes_heartbeat: float = 15.0  # Seconds between keep-alive comments on idle change streams
+    lead_changes_retention_days: int = 30  # Days of change feed history kept by app.jobs.prune_lead_changes
+    lead_search_max_candidates: int = 10000  # Newest matches ranked per GET /api/leads/search query
+    entity_cache_enabled: bool = True  # Cache single lead/project lookups (turn off with several API processes)
+    entity_cache_ttl: float = 30.0  # Seconds a cached lead/project may be served
+    entity_cache_max_size: int = 10000  # Entries per cache before least recently used are evicted
+    
+    # Agents
+    vetting_chunk_size: int = 1000  # Leads vetted per transaction
+    vetting_rules: List[Dict[str, Any]] | None = None  # JSON list, see app/services/vetting_rules.py
+    tech_debt_concurrency: int = 5  # Concurrent n8n dispatches per TechDebtAgent run
+    agent_progress_interval: float = 0.5  # Minimum seconds between progress events of one run
+    agent_events_buffer_size: int = 500  # Recent events replayed to reconnecting stream clients
+    agent_events_queue_size: int = 1000  # Events buffered per stream client before dropping the oldest
+    agent_stream_heartbeat: float = 15.0  # Seconds between keep-alive comments on idle streams
+    
+    # Agent Job Queue
+    agent_workers: Dict[str, int] = {"discovery": 1, "vetting": 1, "tech_debt": 1}  # Workers per agent type
+    agent_job_poll_interval: float = 2.0  # Seconds an idle worker waits before polling again
+    agent_job_heartbeat_interval: float = 10.0
+    agent_job_stale_after: float = 60.0  # Seconds without heartbeat before a job is recovered
+    agent_job_max_attempts: int = 3
+    run_workers_in_web: bool = True  # Set to false when running python -m app.worker
+    worker_processes: int = 2  # Processes started by python -m app.worker
+    
+    # Lead Pipeline (event-driven discovery -> vetting -> tech debt)
+    pipeline_enabled: bool = True
+    pipeline_batch_size: int = 100  # Lead ids per follow-up job
+    pipeline_batch_delay: float = 2.0  # Seconds to wait for a batch to fill
+    
+    # Agent Scheduler
+    agent_schedules: Dict[str, Dict[str, Any]] = {}  # e.g. {"vetting": {"interval": 900}, "tech_debt": {"cron": "0 */6 * * *"}}
+    scheduler_enabled: bool = True
+    scheduler_tick_interval: float = 15.0  # Seconds between checks for due runs
+    scheduler_jitter: float = 30.0  # Max random delay (seconds) added to each run's start
+    scheduler_catch_up: str = "once"  # Missed runs: none (skip), once (run one), all (run each)
+    scheduler_lease_ttl: float = 60.0  # Seconds a replica holds a schedule while enqueueing
     
     # API Keys
     openai_api_key: str | None = None
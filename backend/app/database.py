@@ -4,6 +4,8 @@ Handles SSL mode properly for asyncpg
 """
 import os
 import re
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -67,6 +69,53 @@ AsyncSessionLocal = async_sessionmaker(
 class Base(DeclarativeBase):
     pass
 
+def dialect_insert(table):
+    """
+    Return an INSERT construct for the active dialect.
+    Both SQLite and PostgreSQL inserts support on_conflict_do_nothing()
+    and on_conflict_do_update(), the generic insert() does not.
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def create_missing_columns(conn):
+    """
+    Add nullable columns added to existing tables since they were created
+    (ALTER TABLE ... ADD COLUMN, no backfill). Columns that need values
+    for existing rows are left to maintenance jobs (app/jobs). Run with
+    AsyncConnection.run_sync() before create_missing_indexes().
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable or column.server_default is not None:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+            )
+
+def create_missing_indexes(conn):
+    """
+    Create indexes added to existing tables since they were created.
+    create_all() skips tables that already exist, indexes included.
+    Unique indexes are left to maintenance jobs (app/jobs), since existing
+    rows may violate them. Run with AsyncConnection.run_sync().
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                # IF NOT EXISTS rather than checkfirst: reflection doesn't
+                # see expression indexes (e.g. ix_leads_score_sort_id)
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
 # Dependency for FastAPI routes
 async def get_db():
     async with AsyncSessionLocal() as session:
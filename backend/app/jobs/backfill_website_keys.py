@@ -0,0 +1,246 @@
+"""
+Backfill Job - Compute Lead.website_key and merge existing duplicates
+
+Databases created before website_key existed hold leads whose websites
+only differ in spelling (https://foo.com vs http://www.foo.com/). This job:
+1. Adds the website_key column if it is missing
+2. Computes website_key for every lead in keyset-paginated chunks
+3. Merges duplicates with one sort-merge pass (ORDER BY website_key, id):
+   the oldest lead survives, projects, outreach drafts and near-duplicate
+   flags are re-pointed to it and missing region/pain_points/score are taken from the duplicates
+4. (Re)creates the unique index on website_key
+
+The API and `python -m app.worker` run it on startup when the unique index
+is missing (ensure_website_key_index()), since discovery's
+ON CONFLICT (website_key) fails without it.
+
+Usage:
+    python -m app.jobs.backfill_website_keys [--chunk-size 1000]
+"""
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, delete, inspect, select, text, update
+from app.database import engine, Base, create_missing_columns
+from app.models import ChangeCommit, Lead, LeadCounter, LeadTombstone, OutreachDraft, Project, TableVersion
+from app.services.dedup import normalize_website
+from app.services.lead_changes import record_deletions
+from app.services.lead_counters import apply_deltas, count_keys
+
+logger = logging.getLogger(__name__)
+
+leads = Lead.__table__
+INDEX_NAME = "ix_leads_website_key"
+ADVISORY_LOCK_KEY = 727_001  # pg_advisory_lock key: one backfill at a time
+
+async def ensure_column(conn) -> bool:
+    """Add the website_key column to legacy tables. Returns True if added."""
+    columns = await conn.run_sync(
+        lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("leads")}
+    )
+    if "website_key" in columns:
+        return False
+
+    await conn.execute(text("ALTER TABLE leads ADD COLUMN website_key VARCHAR(500)"))
+    return True
+
+async def backfill_keys(chunk_size: int) -> int:
+    """Compute website_key for all leads. Returns the number of keys changed."""
+    stmt = (
+        update(leads)
+        .where(leads.c.id == bindparam("b_id"))
+        # Maintenance only: keep updated_at as it was
+        .values(website_key=bindparam("b_key"), updated_at=leads.c.updated_at)
+    )
+
+    changed = 0
+    last_id = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                select(leads.c.id, leads.c.website, leads.c.website_key)
+                .where(leads.c.id > last_id)
+                .order_by(leads.c.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            params = []
+            for row in rows:
+                key = normalize_website(row.website)
+                if key != row.website_key:
+                    params.append({"b_id": row.id, "b_key": key})
+
+            if params:
+                await conn.execute(stmt, params)
+                changed += len(params)
+
+    return changed
+
+async def find_duplicate_groups() -> List[List[int]]:
+    """
+    Sort-merge pass over (website_key, id).
+    The database does the sort; we only compare each row with the previous one.
+    """
+    groups: List[List[int]] = []
+    current_key = None
+    current_ids: List[int] = []
+
+    async with engine.connect() as conn:
+        result = await conn.stream(
+            select(leads.c.id, leads.c.website_key)
+            .where(leads.c.website_key.isnot(None))
+            .order_by(leads.c.website_key, leads.c.id)
+        )
+        async for row in result:
+            if row.website_key != current_key:
+                if len(current_ids) > 1:
+                    groups.append(current_ids)
+                current_key = row.website_key
+                current_ids = []
+            current_ids.append(row.id)
+
+    if len(current_ids) > 1:
+        groups.append(current_ids)
+
+    return groups
+
+async def merge_group(conn, ids: List[int]) -> None:
+    """Fold every lead in ids into the first (oldest) one"""
+    survivor_id, duplicate_ids = ids[0], ids[1:]
+
+    result = await conn.execute(
+        select(
+            leads.c.id, leads.c.region, leads.c.pain_points, leads.c.score,
+            leads.c.status, leads.c.vetting_status
+        )
+        .where(leads.c.id.in_(ids))
+        .order_by(leads.c.id)
+    )
+    rows = result.all()
+    survivor = rows[0]
+
+    values: Dict[str, Any] = {}
+    if survivor.region is None:
+        values["region"] = next((r.region for r in rows if r.region), None)
+    if survivor.pain_points is None:
+        values["pain_points"] = next((r.pain_points for r in rows if r.pain_points), None)
+    best_score = max(r.score or 0 for r in rows)
+    if best_score > (survivor.score or 0):
+        values["score"] = best_score
+
+    for table in (Project.__table__, OutreachDraft.__table__):
+        await conn.execute(
+            update(table)
+            .where(table.c.lead_id.in_(duplicate_ids))
+            .values(lead_id=survivor_id)
+        )
+
+    await conn.execute(
+        update(leads)
+        .where(leads.c.duplicate_of.in_(duplicate_ids))
+        .values(duplicate_of=survivor_id)
+    )
+
+    await conn.execute(delete(leads).where(leads.c.id.in_(duplicate_ids)))
+    await record_deletions(conn, duplicate_ids)
+
+    if values:
+        await conn.execute(
+            update(leads).where(leads.c.id == survivor_id).values(**values)
+        )
+
+    # Duplicates leave lead_counters; the survivor may move to another region
+    deltas = count_keys(((r.status, r.vetting_status, r.region) for r in rows), sign=-1)
+    deltas.update(count_keys([
+        (survivor.status, survivor.vetting_status, values.get("region", survivor.region))
+    ]))
+    await apply_deltas(conn, deltas)
+
+async def run(chunk_size: int = 1000) -> Dict[str, Any]:
+    async with engine.begin() as conn:
+        # Written alongside leads; may predate this database
+        await conn.run_sync(
+            Base.metadata.create_all, tables=[
+                LeadCounter.__table__, LeadTombstone.__table__, TableVersion.__table__, ChangeCommit.__table__
+            ]
+        )
+        column_added = await ensure_column(conn)
+        # Written by the merges below (change_token, duplicate_of, ...)
+        await conn.run_sync(create_missing_columns)
+        # Keys may collide until duplicates are merged
+        await conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+
+    keys_changed = await backfill_keys(chunk_size)
+    groups = await find_duplicate_groups()
+
+    for start in range(0, len(groups), chunk_size):
+        async with engine.begin() as conn:
+            for ids in groups[start:start + chunk_size]:
+                await merge_group(conn, ids)
+
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON leads (website_key)"
+        ))
+
+    return {
+        "column_added": column_added,
+        "keys_changed": keys_changed,
+        "duplicate_groups": len(groups),
+        "leads_merged": sum(len(ids) - 1 for ids in groups)
+    }
+
+def has_unique_index(sync_conn) -> bool:
+    """Whether leads.website_key has the unique index ON CONFLICT relies on"""
+    inspector = inspect(sync_conn)
+    if "leads" not in inspector.get_table_names():
+        return False
+    indexes = inspector.get_indexes("leads") + inspector.get_unique_constraints("leads")
+    return any(
+        index.get("unique", True) and index["column_names"] == ["website_key"]
+        for index in indexes
+    )
+
+async def ensure_website_key_index() -> Optional[Dict[str, Any]]:
+    """
+    Run the backfill if the unique website_key index is missing (databases
+    created before it existed). Returns the backfill summary, or None when
+    the index was already there. On PostgreSQL an advisory lock keeps
+    processes starting together from running it twice.
+    """
+    async with engine.connect() as conn:
+        if await conn.run_sync(has_unique_index):
+            return None
+
+    async with engine.connect() as lock_conn:
+        if engine.dialect.name == "postgresql":
+            lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            async with engine.connect() as conn:
+                if await conn.run_sync(has_unique_index):
+                    return None  # Another process finished it while we waited
+            logger.warning("Unique index on leads.website_key is missing; running the website_key backfill")
+            summary = await run()
+            logger.warning("website_key backfill finished: %s", summary)
+            return summary
+        finally:
+            if engine.dialect.name == "postgresql":
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill website_key and merge duplicate leads")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(chunk_size=args.chunk_size))
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
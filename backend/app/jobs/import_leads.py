@@ -0,0 +1,65 @@
+"""
+Import Job - Load leads from an NDJSON or CSV file
+
+Same import as POST /api/leads/imports: the file is read and parsed
+incrementally, rows are committed in chunks, leads whose website already
+exists are skipped, and progress is recorded in lead_imports (so it also
+shows up in GET /api/leads/imports). A failed import continues with
+the chunk it stopped at when it is resumed with the same file.
+
+Usage:
+    python -m app.jobs.import_leads leads.csv [--format csv|ndjson] [--chunk-size 1000]
+    python -m app.jobs.import_leads leads.csv --resume <import id>
+"""
+import argparse
+import asyncio
+import os
+from typing import AsyncIterator
+from app.database import engine, Base
+from app.models import LeadImport
+from app.services.lead_import import create_import, read_blocks, resume_import, run_import
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        async for block in read_blocks(f):
+            yield block
+
+async def run(path: str, format: str, chunk_size: int = None, resume: int = None) -> LeadImport:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        if resume is None:
+            lead_import = await create_import(format, os.path.basename(path))
+            print(f"import {lead_import.id}: reading {path} as {format}")
+        else:
+            lead_import = await resume_import(resume)
+            if lead_import is None:
+                raise SystemExit(f"import {resume} not found")
+            format = lead_import.format
+            print(f"import {resume}: resuming after row {lead_import.rows_read} of {path}")
+        return await run_import(lead_import.id, read_file(path), format, chunk_size)
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Import leads from an NDJSON or CSV file")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--resume", type=int, metavar="IMPORT_ID", help="Continue a failed import of this file")
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    try:
+        lead_import = asyncio.run(run(args.path, format, args.chunk_size, args.resume))
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    for error in lead_import.errors or []:
+        print(f"row {error['index']}: {error['error']}")
+    for key in ("status", "rows_read", "inserted", "skipped", "failed", "error_message"):
+        print(f"{key}: {getattr(lead_import, key)}")
+
+if __name__ == "__main__":
+    main()
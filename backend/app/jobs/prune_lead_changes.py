@@ -0,0 +1,94 @@
+"""
+Prune Job - Drop lead change feed history past the retention horizon
+
+change_commits gains a row per transaction that writes leads and
+lead_tombstones one per deleted lead, and neither is needed once every
+client has synced past them. This job deletes the change_commits rows
+committed more than LEAD_CHANGES_RETENTION_DAYS ago, the tombstones of
+those transactions, and records the highest deleted version as
+table_versions.pruned_version. GET /api/leads/changes answers cursors
+from before it with 410 Gone, so clients reload instead of silently
+missing changes. Rows from before change_commits.committed_at existed
+count as old.
+
+Run it periodically (e.g. daily from cron).
+
+Usage:
+    python -m app.jobs.prune_lead_changes [--dry-run] [--days N]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, delete, func, or_, select, update
+from app.config import settings
+from app.database import engine, Base, create_missing_columns
+from app.models import ChangeCommit, LeadTombstone, TableVersion
+
+commits = ChangeCommit.__table__
+tombstones = LeadTombstone.__table__
+versions = TableVersion.__table__
+
+async def run(dry_run: bool = False, days: Optional[int] = None) -> Dict[str, Any]:
+    days = settings.lead_changes_retention_days if days is None else days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[commits, tombstones, versions])
+        await conn.run_sync(create_missing_columns)
+
+        # Versions follow commit order: everything up to the newest old commit goes
+        horizon = (await conn.execute(
+            select(func.max(commits.c.version)).where(
+                commits.c.table_name == "leads",
+                or_(commits.c.committed_at.is_(None), commits.c.committed_at < cutoff)
+            )
+        )).scalar()
+
+        pruned = {"change_commits": 0, "lead_tombstones": 0}
+        if horizon is not None:
+            old = and_(commits.c.table_name == "leads", commits.c.version <= horizon)
+            old_tokens = select(commits.c.token).where(old)
+            if dry_run:
+                pruned["change_commits"] = (await conn.execute(
+                    select(func.count()).select_from(commits).where(old)
+                )).scalar()
+                pruned["lead_tombstones"] = (await conn.execute(
+                    select(func.count()).select_from(tombstones)
+                    .where(tombstones.c.change_token.in_(old_tokens))
+                )).scalar()
+            else:
+                # Tombstones first, while their tokens can still be looked up
+                pruned["lead_tombstones"] = (await conn.execute(
+                    delete(tombstones).where(tombstones.c.change_token.in_(old_tokens))
+                )).rowcount
+                pruned["change_commits"] = (await conn.execute(delete(commits).where(old))).rowcount
+                await conn.execute(
+                    update(versions)
+                    .where(versions.c.table_name == "leads")
+                    .values(pruned_version=horizon)
+                )
+
+    return {
+        "cutoff": cutoff.isoformat(),
+        "pruned_version": horizon,
+        "change_commits": pruned["change_commits"],
+        "lead_tombstones": pruned["lead_tombstones"],
+        "pruned": not dry_run
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete lead change feed history past the retention horizon")
+    parser.add_argument("--dry-run", action="store_true", help="Count the rows without deleting them")
+    parser.add_argument(
+        "--days", type=int, default=None,
+        help=f"History to keep in days (default: LEAD_CHANGES_RETENTION_DAYS, {settings.lead_changes_retention_days})"
+    )
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(dry_run=args.dry_run, days=args.days))
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
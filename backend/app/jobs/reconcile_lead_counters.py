@@ -0,0 +1,94 @@
+"""
+Reconcile Job - Rebuild lead_counters from the leads table
+
+Counters are maintained incrementally, so anything that writes to leads
+behind the application's back (manual SQL, a crash between statements
+on a non-transactional path) makes them drift. This job recomputes every
+(status, vetting_status, region) count with one GROUP BY, reports the
+keys whose stored count differs, and replaces the table contents.
+
+On PostgreSQL the counters table is locked for the duration, so writers
+that commit while the job runs wait and then apply their deltas on top
+of the rebuilt counts.
+
+Usage:
+    python -m app.jobs.reconcile_lead_counters [--dry-run]
+"""
+import argparse
+import asyncio
+from typing import Any, Dict
+from sqlalchemy import delete, func, insert, select, text
+from app.database import engine, Base
+from app.models import Lead
+from app.models.lead_counter import LeadCounter, NO_REGION, counter_key
+
+leads = Lead.__table__
+counters = LeadCounter.__table__
+
+async def run(dry_run: bool = False) -> Dict[str, Any]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[counters])
+
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("LOCK TABLE lead_counters IN EXCLUSIVE MODE"))
+
+        result = await conn.execute(
+            select(leads.c.status, leads.c.vetting_status, leads.c.region, func.count())
+            .group_by(leads.c.status, leads.c.vetting_status, leads.c.region)
+        )
+        actual: Dict[tuple, int] = {}
+        for status, vetting_status, region, count in result.all():
+            key = counter_key(status, vetting_status, region)
+            actual[key] = actual.get(key, 0) + count
+
+        result = await conn.execute(
+            select(counters.c.status, counters.c.vetting_status, counters.c.region, counters.c.count)
+        )
+        stored = {(row.status, row.vetting_status, row.region): row.count for row in result.all()}
+
+        drift = []
+        for key in sorted(set(actual) | set(stored)):
+            expected, found = actual.get(key, 0), stored.get(key, 0)
+            if expected != found:
+                status, vetting_status, region = key
+                drift.append({
+                    "status": status,
+                    "vetting_status": vetting_status,
+                    "region": region if region != NO_REGION else None,
+                    "stored": found,
+                    "actual": expected
+                })
+
+        if not dry_run:
+            await conn.execute(delete(counters))
+            if actual:
+                await conn.execute(insert(counters), [
+                    {"status": status, "vetting_status": vetting_status, "region": region, "count": count}
+                    for (status, vetting_status, region), count in sorted(actual.items())
+                ])
+
+    return {
+        "leads": sum(actual.values()),
+        "counter_rows": len(actual),
+        "drifted_keys": len(drift),
+        "drift": drift,
+        "rebuilt": not dry_run
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute lead_counters and report drift")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without rewriting the table")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(dry_run=args.dry_run))
+    for row in summary.pop("drift"):
+        region = row["region"] or "-"
+        print(
+            f"drift: {row['status']}/{row['vetting_status']}/{region}: "
+            f"stored {row['stored']}, actual {row['actual']}"
+        )
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,49 @@
 MAK OS V2 - Modern Agency Operating System
 FastAPI Backend Entry Point
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import leads, projects, agents, webhooks
-from app.database import engine, Base
+from app.config import settings
+from app.database import engine, Base, create_missing_columns, create_missing_indexes
+from app.jobs.backfill_website_keys import ensure_website_key_index
+from app.services import entity_cache, n8n_bridge, pipeline
+from app.services.event_bus import event_bus
+from app.services.job_runner import job_runner
+from app.services.lead_search import create_search_index
+from app.services.scheduler import scheduler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database tables and shared clients for the app lifetime"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+        await conn.run_sync(create_search_index)
+    # Discovery's ON CONFLICT (website_key) needs the unique index
+    await ensure_website_key_index()
+    
+    await n8n_bridge.start()
+    if settings.run_workers_in_web:
+        pipeline.register()
+        await job_runner.start()
+    if settings.scheduler_enabled:
+        await scheduler.start()
+    
+    yield
+    
+    await scheduler.stop()
+    await job_runner.stop()
+    await event_bus.flush_all()
+    await n8n_bridge.aclose()
 
 app = FastAPI(
     title="MAK OS V2",
     description="AI-Powered Agency Management Platform",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -23,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Estimate", "X-Total-Estimate-Capped", "X-Search-Truncated", "Content-Disposition", "Location"],
 )
 
 # Include API routers
@@ -31,12 +66,6 @@ app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
 app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 
-@app.on_event("startup")
-async def startup():
-    """Initialize database tables on startup"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
 @app.get("/")
 async def root():
     return {
@@ -48,3 +77,8 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/health/cache")
+async def cache_health():
+    """Entity cache hit/miss counters"""
+    return entity_cache.stats()
@@ -1,7 +1,13 @@
 # Expose models for easy imports
 from app.models.lead import Lead
+from app.models.lead_counter import LeadCounter
+from app.models.lead_tombstone import LeadTombstone
 from app.models.project import Project
 from app.models.agent_log import AgentLog
 from app.models.outreach_draft import OutreachDraft
+from app.models.agent_job import AgentJob
+from app.models.agent_schedule import AgentSchedule
+from app.models.lead_import import LeadImport
+from app.models.table_version import ChangeCommit, TableVersion
 
-__all__ = ["Lead", "Project", "AgentLog", "OutreachDraft"]
+__all__ = ["Lead", "LeadCounter", "Project", "AgentLog", "OutreachDraft", "AgentJob", "AgentSchedule", "LeadImport", "TableVersion", "ChangeCommit", "LeadTombstone"]
@@ -0,0 +1,40 @@
+"""
+AgentJob Model - Durable queue of agent executions
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AgentJob(Base):
+    __tablename__ = "agent_jobs"
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # What to run
+    agent_name = Column(String(100), nullable=False, index=True)
+    context = Column(JSON, nullable=True)
+    partition = Column(Integer, nullable=True, index=True)  # Worker process that owns the job, NULL = any
+
+    # Queue State
+    status = Column(
+        String(50),
+        default="queued",
+        nullable=False,
+        index=True
+    )  # queued, running, completed, failed
+
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    worker_id = Column(String(255), nullable=True)
+
+    # Outcome
+    result = Column(JSON, nullable=True)  # AgentResult status, leads_processed, metadata
+    error_message = Column(Text, nullable=True)
+    agent_log_id = Column(Integer, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,27 @@
+"""
+AgentSchedule Model - Scheduler state and leases per scheduled agent
+"""
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AgentSchedule(Base):
+    __tablename__ = "agent_schedules"
+
+    # One row per entry in AGENT_SCHEDULES
+    agent_name = Column(String(100), primary_key=True)
+
+    # Timing
+    next_run_at = Column(DateTime(timezone=True), nullable=False)  # Nominal cron / interval slot
+    start_after = Column(DateTime(timezone=True), nullable=False)  # next_run_at plus start jitter
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_job_ids = Column(JSON, nullable=True)  # Jobs enqueued by the last run
+    skipped_runs = Column(Integer, default=0, nullable=False)  # Overlaps and missed runs not caught up
+
+    # Lease: only the holder may enqueue the due run
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
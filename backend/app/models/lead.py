@@ -1,13 +1,21 @@
 """
 Lead Model - Core entity for the CRM pipeline
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, ForeignKey, literal_column
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.models.table_version import transaction_token
+from app.services.dedup import normalize_website
 
 class Lead(Base):
     __tablename__ = "leads"
+    __table_args__ = (
+        # Keyset pagination orders (see GET /api/leads)
+        Index("ix_leads_created_at_id", "created_at", "id"),
+        # Change feed lookups by transaction (see GET /api/leads/changes)
+        Index("ix_leads_change_token", "change_token"),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -15,6 +23,7 @@ class Lead(Base):
     # Company Information
     company_name = Column(String(255), nullable=False, index=True)
     website = Column(String(500), nullable=True)
+    website_key = Column(String(500), nullable=True, unique=True, index=True)  # Normalized host/path, see normalize_website()
     region = Column(String(100), nullable=True, index=True)
     
     # Pipeline Status
@@ -32,6 +41,10 @@ class Lead(Base):
         index=True
     )  # pending, approved, rejected
     
+    # Earlier lead with a near-identical company name in the same region,
+    # flagged by DiscoveryAgent for review (see app/services/name_index.py)
+    duplicate_of = Column(Integer, ForeignKey("leads.id"), nullable=True, index=True)
+    
     # Pain Points & Scoring
     pain_points = Column(JSON, nullable=True)  # Flexible JSON storage
     score = Column(Integer, default=0)  # 0-100 lead quality score
@@ -40,6 +53,21 @@ class Lead(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Token of the transaction that last wrote the row, see ChangeCommit in
+    # app/models/table_version.py (NULL for rows older than the column)
+    change_token = Column(String(32), default=transaction_token, onupdate=transaction_token)
+    
     # Relationships
     projects = relationship("Project", back_populates="lead")
     outreach_drafts = relationship("OutreachDraft", back_populates="lead")
+    
+    @validates("website")
+    def _sync_website_key(self, key, website):
+        """Keep website_key in step with website for ORM writes"""
+        self.website_key = normalize_website(website)
+        return website
+
+# Score keyset order (see GET /api/leads): NULL scores sort as -1, below
+# every real score. Queries must use this exact expression to hit the index.
+LEAD_SCORE_SORT = func.coalesce(Lead.score, literal_column("-1"))
+Index("ix_leads_score_sort_id", LEAD_SCORE_SORT, Lead.id)
@@ -0,0 +1,73 @@
+"""
+LeadCounter Model - Lead counts per (status, vetting_status, region)
+
+Maintained in the same transaction as the lead writes that change them:
+- ORM inserts, updates and deletes of Lead are picked up by the
+  after_flush hook below
+- Core INSERT / UPDATE / DELETE statements on leads must call
+  app.services.lead_counters.apply_deltas() themselves
+
+python -m app.jobs.reconcile_lead_counters rebuilds the table from the
+leads table and reports drift.
+"""
+from collections import Counter
+from sqlalchemy import Column, Integer, String, event, inspect
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models.lead import Lead
+
+NO_REGION = ""  # Key for leads without a region (primary key columns can't be NULL)
+
+class LeadCounter(Base):
+    __tablename__ = "lead_counters"
+
+    status = Column(String(50), primary_key=True)
+    vetting_status = Column(String(50), primary_key=True)
+    region = Column(String(100), primary_key=True, default=NO_REGION)
+
+    count = Column(Integer, default=0, nullable=False)
+
+def counter_key(status, vetting_status, region) -> tuple:
+    return (status, vetting_status, region or NO_REGION)
+
+COUNTED_FIELDS = ("status", "vetting_status", "region")
+
+def _original_key(lead: Lead) -> tuple:
+    """Key of the lead as it is in the database before this flush"""
+    state = inspect(lead)
+    values = []
+    for field in COUNTED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        else:
+            values.append(getattr(lead, field))
+    return counter_key(*values)
+
+def _current_key(lead: Lead) -> tuple:
+    return counter_key(*(getattr(lead, field) for field in COUNTED_FIELDS))
+
+@event.listens_for(Session, "after_flush")
+def _track_lead_counts(session, flush_context):
+    # Imported here: the service module imports app.models
+    from app.services.lead_counters import apply_deltas_sync
+
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Lead):
+            deltas[_current_key(obj)] += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Lead) and session.is_modified(obj, include_collections=False):
+            old_key, new_key = _original_key(obj), _current_key(obj)
+            if old_key != new_key:
+                deltas[old_key] -= 1
+                deltas[new_key] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Lead):
+            deltas[_original_key(obj)] -= 1
+
+    if any(deltas.values()):
+        apply_deltas_sync(session.connection(), deltas)
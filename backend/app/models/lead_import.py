@@ -0,0 +1,35 @@
+"""
+LeadImport Model - Progress of a streaming lead import
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LeadImport(Base):
+    __tablename__ = "lead_imports"
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Source
+    format = Column(String(20), nullable=False)  # ndjson, csv
+    filename = Column(String(255), nullable=True)
+
+    status = Column(
+        String(50),
+        default="running",
+        nullable=False
+    )  # running, completed, failed
+
+    # Progress, updated in the same transaction as each committed chunk
+    rows_read = Column(Integer, default=0, nullable=False)  # Input rows in committed chunks
+    inserted = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)  # Website already exists
+    failed = Column(Integer, default=0, nullable=False)  # Invalid rows
+    errors = Column(JSON, nullable=True)  # First rows that were skipped or failed
+    error_message = Column(Text, nullable=True)  # Why the import stopped
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
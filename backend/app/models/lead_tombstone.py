@@ -0,0 +1,35 @@
+"""
+LeadTombstone Model - Deleted lead ids for the lead change feed
+
+GET /api/leads/changes reports deletions from here, ordered like changed
+leads by the commit version of the deleting transaction (change_token,
+see ChangeCommit). Written in the same transaction as the delete:
+- ORM deletes of Lead are picked up by the after_flush hook below
+- Core DELETE statements on leads must call
+  app.services.lead_changes.record_deletions() themselves
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, String, event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.lead import Lead
+from app.models.table_version import transaction_token
+
+class LeadTombstone(Base):
+    __tablename__ = "lead_tombstones"
+    __table_args__ = (
+        Index("ix_lead_tombstones_change_token", "change_token"),
+    )
+
+    lead_id = Column(Integer, primary_key=True)
+    change_token = Column(String(32), default=transaction_token)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+@event.listens_for(Session, "after_flush")
+def _record_lead_deletions(session, flush_context):
+    # Imported here: the service module imports app.models
+    from app.services.lead_changes import record_deletions_sync
+
+    ids = [obj.id for obj in session.deleted if isinstance(obj, Lead)]
+    if ids:
+        record_deletions_sync(session.connection(), ids)
@@ -0,0 +1,110 @@
+"""
+TableVersion Model - Write counter per table, for conditional GETs and change feeds
+
+Every transaction that inserts, updates or deletes rows of a versioned
+table bumps that table's version once, as the last thing it does before
+committing, so a new version becomes visible exactly when the data it
+describes does. Readers derive ETags from the version
+(app/services/etag.py) instead of re-running list queries.
+
+A before_execute hook on every engine notes which versioned tables a
+transaction writes, for ORM flushes and Core insert()/update()/delete()
+statements alike; the commit hook then bumps them. Raw SQL (text(),
+exec_driver_sql) is not tracked. The bump keeps the version row locked
+only while the transaction commits: concurrent writers wait for each
+other's COMMIT, not for each other's work.
+
+Change feeds (CHANGE_LOGGED_TABLES) also need to know which rows a
+committed transaction wrote. Such rows carry the token of their
+transaction (transaction_token() as column default and onupdate) and the
+commit hook records the version each token got in change_commits.
+Versions are handed out in commit order, so "version > N" is a safe
+incremental sync condition. app.jobs.prune_lead_changes deletes old
+change_commits rows and records the highest version it deleted in
+TableVersion.pruned_version: syncs from before it can no longer be served.
+"""
+import uuid
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql import func
+from app.database import Base, dialect_insert
+
+# Tables whose list endpoints serve ETags
+VERSIONED_TABLES = {"leads", "projects", "agent_logs", "agent_jobs"}
+
+# Versioned tables whose rows carry transaction tokens (see change_commits)
+CHANGE_LOGGED_TABLES = {"leads"}
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+    # Change feed history up to this version was pruned (NULL: none yet)
+    pruned_version = Column(BigInteger)
+
+class ChangeCommit(Base):
+    """Version a committed transaction got for a change-logged table it wrote"""
+    __tablename__ = "change_commits"
+    __table_args__ = (
+        Index("ix_change_commits_table_name_version", "table_name", "version"),
+    )
+
+    token = Column(String(32), primary_key=True)
+    table_name = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    # Client-side default, so create_missing_columns() can add it; NULL on
+    # rows from before it existed
+    committed_at = Column(DateTime(timezone=True), default=func.now())
+
+_WRITTEN = "table_versions_written"  # Connection.info key: tables written in this transaction
+_TOKEN = "table_versions_token"  # Connection.info key: token of this transaction
+
+def transaction_token(context) -> str:
+    """Column default: token of the transaction writing the row"""
+    return context.connection.info.setdefault(_TOKEN, uuid.uuid4().hex)
+
+def _bump_statement():
+    table = TableVersion.__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={"version": table.c.version + 1}
+    ).returning(table.c.version)
+
+@event.listens_for(Engine, "before_execute")
+def _track_writes(conn, clauseelement, multiparams, params, execution_options):
+    if not isinstance(clauseelement, UpdateBase):
+        return
+    table_name = getattr(clauseelement.table, "name", None)
+    if table_name in VERSIONED_TABLES:
+        conn.info.setdefault(_WRITTEN, set()).add(table_name)
+
+@event.listens_for(Engine, "commit")
+def _bump_table_versions(conn):
+    written = conn.info.pop(_WRITTEN, None)
+    token = conn.info.pop(_TOKEN, None)
+    if not written:
+        return
+
+    # Same order in every transaction, so committers cannot deadlock
+    for table_name in sorted(written):
+        version = conn.execute(
+            _bump_statement(), {"table_name": table_name, "version": 1}
+        ).scalar_one()
+        if token and table_name in CHANGE_LOGGED_TABLES:
+            conn.execute(
+                insert(ChangeCommit.__table__),
+                {"token": token, "table_name": table_name, "version": version}
+            )
+
+# Rolling back to a savepoint keeps the tracking: writes before the
+# savepoint still commit, and an extra bump is harmless
+@event.listens_for(Engine, "rollback")
+def _forget_writes(conn):
+    # An invalidated connection (e.g. cancelled mid-statement) has no info
+    # to reset; its DBAPI connection is discarded along with it
+    if not conn.invalidated:
+        conn.info.pop(_WRITTEN, None)
+        conn.info.pop(_TOKEN, None)
@@ -1,10 +1,16 @@
 # Expose schemas for easy imports
-from app.schemas.lead import LeadCreate, LeadUpdate, LeadResponse
+from app.schemas.lead import (
+    LeadCreate, LeadUpdate, LeadResponse, LeadStatsResponse, LeadSummaryResponse,
+    LeadFilter, LeadSelection, LeadBulkUpdate, LeadImportResponse,
+    LeadChangesResponse
+)
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from app.schemas.agent import AgentLogResponse, AgentExecuteRequest
+from app.schemas.agent import AgentLogResponse, AgentExecuteRequest, AgentJobResponse, AgentScheduleResponse
 
 __all__ = [
-    "LeadCreate", "LeadUpdate", "LeadResponse",
+    "LeadCreate", "LeadUpdate", "LeadResponse", "LeadStatsResponse", "LeadSummaryResponse",
+    "LeadFilter", "LeadSelection", "LeadBulkUpdate", "LeadImportResponse",
+    "LeadChangesResponse",
     "ProjectCreate", "ProjectUpdate", "ProjectResponse",
-    "AgentLogResponse", "AgentExecuteRequest"
+    "AgentLogResponse", "AgentExecuteRequest", "AgentJobResponse", "AgentScheduleResponse"
 ]
@@ -3,7 +3,7 @@ Agent Pydantic Schemas
 """
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class AgentExecuteRequest(BaseModel):
     """Request to execute an agent"""
@@ -23,3 +23,37 @@ class AgentLogResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class AgentJobResponse(BaseModel):
+    """Schema for agent job responses"""
+    id: int
+    agent_name: str
+    partition: Optional[int] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    worker_id: Optional[str] = None
+    result: Optional[dict] = None
+    error_message: Optional[str] = None
+    agent_log_id: Optional[int] = None
+    created_at: datetime
+    claimed_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class AgentScheduleResponse(BaseModel):
+    """Schema for agent schedule state"""
+    agent_name: str
+    next_run_at: datetime
+    start_after: datetime
+    last_run_at: Optional[datetime] = None
+    last_job_ids: Optional[List[int]] = None
+    skipped_runs: int
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,14 +1,14 @@
 """
 Lead Pydantic Schemas for API validation
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 class LeadBase(BaseModel):
     company_name: str = Field(..., min_length=1, max_length=255)
-    website: Optional[str] = None
-    region: Optional[str] = None
+    website: Optional[str] = Field(None, max_length=500)
+    region: Optional[str] = Field(None, max_length=100)
 
 class LeadCreate(LeadBase):
     """Schema for creating a new lead"""
@@ -30,9 +30,110 @@ class LeadResponse(LeadBase):
     status: str
     vetting_status: str
     pain_points: Optional[dict] = None
-    score: int
+    score: Optional[int] = None  # NULL for leads written outside the API
+    duplicate_of: Optional[int] = None  # Lead this one is a near-duplicate of
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ScoreBucket(BaseModel):
+    """Number of leads with min <= score <= max"""
+    min: int
+    max: int
+    count: int
+
+class LeadStatsResponse(BaseModel):
+    """Aggregate lead counts for dashboards"""
+    total: int
+    by_status: Dict[str, int]
+    by_vetting_status: Dict[str, int]
+    by_region: Dict[str, int]  # Leads without a region are counted as "unknown"
+    score_histogram: List[ScoreBucket]
+    average_score: Optional[float] = None
+    generated_at: datetime
+
+class LeadCounterResponse(BaseModel):
+    """Number of leads with one (status, vetting_status, region) combination"""
+    status: str
+    vetting_status: str
+    region: Optional[str] = None
+    count: int
+
+class LeadSummaryResponse(BaseModel):
+    """Pipeline totals read from the lead_counters table"""
+    total: int
+    by_status: Dict[str, int]
+    by_vetting_status: Dict[str, int]
+    by_region: Dict[str, int]  # Leads without a region are counted as "unknown"
+    counters: List[LeadCounterResponse]
+
+class LeadChangesResponse(BaseModel):
+    """Page of the lead change feed"""
+    changes: List[LeadResponse]  # Leads created or updated, current fields
+    deleted: List[int]  # Ids of deleted leads
+    cursor: str  # Pass back as `since` for the next page
+    has_more: bool
+
+class LeadImportResponse(BaseModel):
+    """Schema for streaming import progress"""
+    id: int
+    format: str
+    filename: Optional[str] = None
+    status: str
+    rows_read: int
+    inserted: int
+    skipped: int
+    failed: int
+    errors: Optional[List[dict]] = None
+    error_message: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+class LeadFilter(BaseModel):
+    """Conditions selecting leads (all optional, combined with AND)"""
+    status: Optional[str] = None
+    region: Optional[str] = None
+    vetting_status: Optional[str] = None
+    min_score: Optional[int] = Field(None, ge=0, le=100)
+    max_score: Optional[int] = Field(None, ge=0, le=100)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+class LeadSelection(BaseModel):
+    """
+    Leads targeted by a bulk operation: either explicit ids or a filter.
+    An empty filter ({}) selects every lead.
+    """
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    filter: Optional[LeadFilter] = None
+    
+    @model_validator(mode="after")
+    def _one_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of 'ids' or 'filter'")
+        return self
+
+class LeadBulkChanges(BaseModel):
+    """Fields a bulk update may set (omitted fields are left as they are)"""
+    status: Optional[str] = None
+    vetting_status: Optional[str] = None
+    region: Optional[str] = Field(None, max_length=100)  # null clears the region
+    score: Optional[int] = Field(None, ge=0, le=100)
+    
+    @field_validator("status", "vetting_status")
+    @classmethod
+    def _not_null(cls, value):
+        # NOT NULL columns; only runs for fields that were given
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+class LeadBulkUpdate(LeadSelection):
+    """Schema for PATCH /api/leads"""
+    changes: LeadBulkChanges
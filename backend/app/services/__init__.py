@@ -1,4 +1,5 @@
 # Services package
 from app.services.n8n_bridge import n8n_bridge
+from app.services.dedup import normalize_website
 
-__all__ = ["n8n_bridge"]
+__all__ = ["n8n_bridge", "normalize_website"]
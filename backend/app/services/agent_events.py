@@ -0,0 +1,87 @@
+"""
+Agent Events - In-process broker for agent lifecycle and progress events
+
+BaseAgent publishes agent.started, agent.progress, agent.finished and
+agent.failed events here; GET /api/agents/stream relays them to browsers
+as Server-Sent Events.
+
+Every subscriber gets its own bounded queue. A subscriber that falls
+behind loses its oldest events rather than slowing down the agents. The
+last AGENT_EVENTS_BUFFER_SIZE events are kept so reconnecting clients
+can resume from their Last-Event-ID.
+
+Only agents running in this process are seen: with RUN_WORKERS_IN_WEB=false
+the agents run in `python -m app.worker` and their events stay there.
+"""
+import asyncio
+import json
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Set
+from app.config import settings
+
+# Event types
+AGENT_STARTED = "agent.started"
+AGENT_PROGRESS = "agent.progress"
+AGENT_FINISHED = "agent.finished"
+AGENT_FAILED = "agent.failed"
+
+class AgentEventBroker:
+    """Fan-out of agent events to any number of subscribers"""
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self._next_id = 1
+        self._recent: deque = deque(maxlen=buffer_size)
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, type: str, agent_name: str, **fields: Any) -> Dict[str, Any]:
+        """Record an event and hand it to every subscriber (never blocks)"""
+        event = {
+            "id": self._next_id,
+            "type": type,
+            "agent_name": agent_name,
+            "time": datetime.utcnow().isoformat(),
+            **fields
+        }
+        self._next_id += 1
+        self._recent.append(event)
+        for queue in self._subscribers:
+            self._put(queue, event)
+        return event
+
+    def _put(self, queue: asyncio.Queue, event: Dict[str, Any]):
+        if queue.full():
+            queue.get_nowait()  # Slow subscriber: drop its oldest event
+        queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self, last_event_id: Optional[int] = None) -> Iterator[asyncio.Queue]:
+        """
+        Queue receiving events published from now on, preceded by the
+        buffered events after `last_event_id` when one is given.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            for event in self._recent:
+                if event["id"] > last_event_id:
+                    self._put(queue, event)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One Server-Sent Events message"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+agent_events = AgentEventBroker(
+    buffer_size=settings.agent_events_buffer_size,
+    queue_size=settings.agent_events_queue_size
+)
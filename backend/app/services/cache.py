@@ -0,0 +1,105 @@
+"""
+In-process TTL cache for expensive read results
+
+get_or_load() returns the cached value while it is fresh; otherwise one
+caller runs the loader while concurrent callers for the same key wait
+for its result instead of hitting the database themselves.
+
+With max_size set, the least recently used entry is evicted when the
+cache is full. A ttl of 0 disables caching (every call loads). A load
+that overlaps an invalidate() is returned but not cached, since it may
+have read the data from before the write.
+
+Each process keeps its own cache, so readers may see results up to `ttl`
+seconds old.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+class TTLCache:
+    """Mapping of keys to values that expire `ttl` seconds after loading"""
+
+    def __init__(self, ttl: float, max_size: Optional[int] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, List] = {}  # key -> [lock, callers using it]
+        self._generation = 0  # Bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when key is None"""
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[Hashable]):
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            self.hits += 1
+            return value
+
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                # Another caller may have loaded it while we waited
+                value = self.get(key, missing)
+                if value is not missing:
+                    self.hits += 1
+                    return value
+                
+                self.misses += 1
+                generation = self._generation
+                value = await loader()
+                if generation == self._generation:
+                    self.set(key, value)
+                return value
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,110 @@
+"""
+Minimal cron expressions for the agent scheduler
+
+Five fields, evaluated in UTC: minute hour day-of-month month day-of-week.
+Each field accepts *, numbers, ranges (1-5), lists (1,15) and steps
+(*/15, 0-30/10). Day-of-week runs 0-6 with 0 = Sunday (7 is also Sunday).
+As in standard cron, when both day fields are restricted a day matches
+if either does.
+"""
+from datetime import datetime, timedelta
+from typing import Set
+
+# (name, low, high) per field
+FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+]
+
+def _parse_field(spec: str, name: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_spec = part.split("/", 1)
+            step = int(step_spec)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron {name} field: {spec}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_spec, end_spec = part.split("-", 1)
+            start, end = int(start_spec), int(end_spec)
+        else:
+            start = int(part)
+            # "5/10" means every 10 starting at 5
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} field out of range ({low}-{high}): {spec}")
+
+        values.update(range(start, end + 1, step))
+
+    return values
+
+class CronSchedule:
+    """Parsed cron expression with next-occurrence lookup"""
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(parts)}: '{expression}'")
+
+        try:
+            fields = [
+                _parse_field(spec, name, low, high)
+                for spec, (name, low, high) in zip(parts, FIELDS)
+            ]
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}") from None
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # Python: Monday = 0, cron: Sunday = 0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # Jump to the first day of the next month
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+
+            return candidate
+
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
@@ -0,0 +1,59 @@
+"""
+Dedup Service - Canonical keys for lead deduplication
+
+n8n discovery sources spell the same website many ways
+(https://foo.com, http://www.foo.com/, FOO.com). normalize_website()
+maps them all to one key that is stored in Lead.website_key and
+protected by a unique index.
+"""
+from typing import Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = {"80", "443"}
+
+def normalize_website(website: Optional[str]) -> Optional[str]:
+    """
+    Build the canonical host/path key for a website.
+
+    - Scheme, credentials, default ports, query string and fragment are dropped
+    - Host and path are lowercased, a leading "www." is removed
+    - Trailing slashes are removed from the path
+
+    Examples:
+        "https://Foo.com/"         -> "foo.com"
+        "http://www.foo.com/menu/" -> "foo.com/menu"
+
+    Returns:
+        The key, or None if the value has no usable host
+    """
+    if not website:
+        return None
+
+    value = website.strip().lower()
+    if not value:
+        return None
+
+    # urlsplit only finds the host when a scheme is present
+    if "://" not in value:
+        value = f"http://{value}"
+
+    try:
+        parts = urlsplit(value)
+    except ValueError:
+        return None
+
+    host = parts.netloc.rsplit("@", 1)[-1]
+    if ":" in host:
+        name, port = host.rsplit(":", 1)
+        if port in DEFAULT_PORTS or not port:
+            host = name
+
+    if host.startswith("www."):
+        host = host[4:]
+    host = host.strip(".")
+
+    if not host:
+        return None
+
+    path = parts.path.rstrip("/")
+    return f"{host}{path}"[:500]
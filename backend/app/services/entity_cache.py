@@ -0,0 +1,69 @@
+"""
+Entity Cache - Read-through LRU+TTL caches for single lead and project lookups
+
+GET /api/leads/{id} and GET /api/projects/{id} serve LeadResponse /
+ProjectResponse snapshots from here. Entries are dropped when the row
+changes:
+- ORM writes on any session (API handlers, agents using AsyncSessionLocal)
+  are picked up by the session hooks below
+- Core UPDATE / DELETE statements must call invalidate_after_commit()
+  with the ids they touched
+
+Keys are dropped as soon as the write is flushed and again after the
+transaction commits, so a read that raced with the write can't keep the
+old row cached.
+
+Writes made by other processes (worker processes, other replicas, the
+maintenance jobs) are only seen once entries expire after
+ENTITY_CACHE_TTL seconds. Set ENTITY_CACHE_ENABLED=false when several
+processes serve the API or when staleness isn't acceptable.
+"""
+from typing import Any, Dict, Iterable, Type
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Lead, Project
+from app.services.cache import TTLCache
+
+_ttl = settings.entity_cache_ttl if settings.entity_cache_enabled else 0
+
+lead_cache = TTLCache(ttl=_ttl, max_size=settings.entity_cache_max_size)
+project_cache = TTLCache(ttl=_ttl, max_size=settings.entity_cache_max_size)
+
+CACHES: Dict[Type, TTLCache] = {
+    Lead: lead_cache,
+    Project: project_cache,
+}
+
+_PENDING = "entity_cache_pending"  # Session.info key: (model, id) pairs written in this transaction
+
+def invalidate_after_commit(session, model: Type, ids: Iterable[int]):
+    """
+    Drop cached rows of `model` now and again when the session's
+    transaction commits. `session` may be a Session or AsyncSession.
+    """
+    cache = CACHES[model]
+    ids = list(ids)
+    cache.invalidate_many(ids)
+    session.info.setdefault(_PENDING, set()).update((model, id) for id in ids)
+
+@event.listens_for(Session, "after_flush")
+def _track_writes(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if type(obj) in CACHES and obj.id is not None:
+            invalidate_after_commit(session, type(obj), [obj.id])
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_pending(session, *args):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        for model, id in pending:
+            CACHES[model].invalidate(id)
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.entity_cache_enabled,
+        "leads": lead_cache.stats(),
+        "projects": project_cache.stats()
+    }
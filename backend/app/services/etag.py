@@ -0,0 +1,63 @@
+"""
+Conditional GET support for list endpoints
+
+ETags are weak validators built from the table_versions counters of the
+tables a response reads (see app/models/table_version.py) plus the query
+string. A request whose If-None-Match matches gets a 304 after one
+primary-key lookup, before the endpoint runs its query or serializes
+anything.
+
+Responses carry Cache-Control: no-cache so browsers keep them but
+revalidate on every request, which makes polling clients send
+If-None-Match automatically.
+"""
+import hashlib
+from typing import Dict, Iterable
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.table_version import TableVersion
+
+async def table_versions(db: AsyncSession, tables: Iterable[str]) -> Dict[str, int]:
+    """Current version of each table (0 if it has never been written)"""
+    tables = sorted(tables)
+    result = await db.execute(
+        select(TableVersion.table_name, TableVersion.version)
+        .where(TableVersion.table_name.in_(tables))
+    )
+    versions = dict(result.all())
+    return {table: versions.get(table, 0) for table in tables}
+
+def make_etag(versions: Dict[str, int], query: str) -> str:
+    watermark = ".".join(f"{table}:{version}" for table, version in versions.items())
+    digest = hashlib.sha1(f"{watermark}?{query}".encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison (weak: W/ prefixes are ignored)"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+def conditional_get(*tables: str):
+    """
+    Dependency answering 304 Not Modified when the client's ETag is still
+    current, and otherwise setting ETag on the response.
+    """
+    async def check(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db)
+    ):
+        etag = make_etag(await table_versions(db, tables), str(request.query_params))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+
+    return check
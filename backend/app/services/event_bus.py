@@ -0,0 +1,98 @@
+"""
+Event Bus - In-process publish/subscribe with micro-batching
+
+Publishers hand over a list of items (lead ids) and return immediately.
+Each subscription buffers items until max_size is reached or max_delay
+seconds have passed since the first one arrived, then calls its handler
+once with the whole batch.
+
+Events are not persisted: anything buffered when the process dies is
+lost, and the scheduled full-table agent runs pick those leads up.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Topics
+LEADS_DISCOVERED = "leads.discovered"  # Ids of leads inserted by DiscoveryAgent
+LEADS_APPROVED = "leads.approved"  # Ids of leads approved by VettingAgent
+
+Handler = Callable[[List[Any]], Awaitable[None]]
+
+class _Subscription:
+    """Buffer and flush timer for one handler"""
+
+    def __init__(self, handler: Handler, max_size: int, max_delay: float):
+        self.handler = handler
+        self.max_size = max(1, max_size)
+        self.max_delay = max_delay
+        self.pending: List[Any] = []
+        self.timer: Optional[asyncio.Task] = None
+        self.flushes: Set[asyncio.Task] = set()
+
+    def add(self, items: List[Any]):
+        self.pending.extend(items)
+
+        if len(self.pending) >= self.max_size:
+            self.start_flush()
+        elif self.timer is None:
+            self.timer = asyncio.create_task(self._flush_after_delay())
+
+    def start_flush(self):
+        timer, self.timer = self.timer, None
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        while self.pending:
+            batch, self.pending = self.pending[:self.max_size], self.pending[self.max_size:]
+            task = asyncio.create_task(self._flush(batch))
+            self.flushes.add(task)
+            task.add_done_callback(self.flushes.discard)
+
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self.max_delay)
+        self.start_flush()
+
+    async def _flush(self, batch: List[Any]):
+        try:
+            await self.handler(batch)
+        except Exception:
+            logger.exception("Event handler %s failed for %d items", self.handler.__name__, len(batch))
+
+class EventBus:
+    """Topic-based micro-batching bus for the current process"""
+
+    def __init__(self):
+        self._subscriptions: Dict[str, List[_Subscription]] = {}
+
+    def subscribe(self, topic: str, handler: Handler, max_size: int = 100, max_delay: float = 1.0):
+        """Call handler with batches of items published to topic"""
+        self._subscriptions.setdefault(topic, []).append(
+            _Subscription(handler, max_size, max_delay)
+        )
+
+    def publish(self, topic: str, items: List[Any]):
+        """Buffer items for every subscriber of topic. Never blocks."""
+        if not items:
+            return
+        for subscription in self._subscriptions.get(topic, []):
+            subscription.add(list(items))
+
+    async def flush_all(self):
+        """Deliver everything still buffered (called on shutdown)"""
+        flushes = []
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.start_flush()
+                flushes.extend(subscription.flushes)
+        if flushes:
+            await asyncio.gather(*flushes, return_exceptions=True)
+
+    def clear(self):
+        """Remove all subscriptions"""
+        self._subscriptions = {}
+
+# Singleton instance
+event_bus = EventBus()
@@ -0,0 +1,225 @@
+"""
+Job Queue Service - Durable agent job queue on the agent_jobs table
+
+Lifecycle: queued -> running -> completed | failed
+
+- enqueue(): insert a queued job, or one job per worker process for
+  agents that scan the leads table (see partition_count())
+- claim(): atomically move the oldest queued job of an agent type to
+  running. PostgreSQL picks it with FOR UPDATE SKIP LOCKED so concurrent
+  workers never block on or double-claim a row; SQLite has no row locks,
+  but the claim is a single UPDATE ... RETURNING, which SQLite executes
+  atomically under its database write lock.
+- heartbeat(): workers refresh heartbeat_at while a job runs
+- complete() / fail(): record the outcome; failed jobs are re-queued
+  until max_attempts is reached. Like heartbeat(), they only touch a job
+  the worker still holds, so a worker whose job was re-queued and claimed
+  by another can't overwrite that run's outcome
+- requeue_stale(): recover jobs whose worker stopped heartbeating
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.agents import AGENTS
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import AgentJob
+
+def partition_count() -> int:
+    """
+    Number of lead partitions. Dedicated worker processes (python -m app.worker)
+    each own the leads whose id % WORKER_PROCESSES equals their index.
+    """
+    if settings.run_workers_in_web:
+        return 1
+    return max(1, settings.worker_processes)
+
+async def enqueue(
+    db: AsyncSession,
+    agent_name: str,
+    context: Optional[Dict[str, Any]] = None
+) -> List[AgentJob]:
+    """
+    Add a job in the caller's transaction. The caller commits.
+    
+    Agents that scan the leads table get one job per partition, so every
+    worker process works on its own rows.
+    """
+    count = partition_count()
+    if not getattr(AGENTS.get(agent_name), "partitionable", False) or count == 1:
+        partitions = [None]
+    else:
+        partitions = list(range(count))
+
+    jobs = []
+    for partition in partitions:
+        job_context = dict(context or {})
+        if partition is not None:
+            job_context["partition"] = [partition, count]
+
+        job = AgentJob(
+            agent_name=agent_name,
+            context=job_context or None,
+            partition=partition,
+            status="queued",
+            attempts=0,
+            max_attempts=settings.agent_job_max_attempts
+        )
+        db.add(job)
+        jobs.append(job)
+
+    await db.flush()
+    for job in jobs:
+        await db.refresh(job)
+    return jobs
+
+async def claim(
+    agent_name: str,
+    worker_id: str,
+    partition: Optional[int] = None
+) -> Optional[AgentJob]:
+    """
+    Claim the oldest queued job for an agent type, or return None.
+    Workers with a partition also take unpartitioned jobs.
+    """
+    now = datetime.now(timezone.utc)
+
+    owned = AgentJob.partition.is_(None)
+    if partition is not None:
+        owned = or_(owned, AgentJob.partition == partition)
+
+    next_job = (
+        select(AgentJob.id)
+        .where(AgentJob.agent_name == agent_name, AgentJob.status == "queued", owned)
+        .order_by(AgentJob.id)
+        .limit(1)
+        # Rendered on PostgreSQL only
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(AgentJob)
+            .where(AgentJob.id == next_job, AgentJob.status == "queued")
+            .values(
+                status="running",
+                worker_id=worker_id,
+                attempts=AgentJob.attempts + 1,
+                claimed_at=now,
+                heartbeat_at=now
+            )
+            .returning(AgentJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await db.commit()
+        return job
+
+async def heartbeat(job_id: int, worker_id: str) -> bool:
+    """Refresh a running job's heartbeat. Returns False if the job was taken away."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(AgentJob)
+            .where(
+                AgentJob.id == job_id,
+                AgentJob.worker_id == worker_id,
+                AgentJob.status == "running"
+            )
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+def _held_by(job_id: int, worker_id: str):
+    return and_(
+        AgentJob.id == job_id,
+        AgentJob.worker_id == worker_id,
+        AgentJob.status == "running"
+    )
+
+async def complete(
+    job_id: int,
+    worker_id: str,
+    result: Dict[str, Any],
+    agent_log_id: Optional[int] = None
+) -> bool:
+    """
+    Finish a job with the agent's result: completed, or failed (without a
+    retry) when the agent reported status 'failed'. Returns False if the
+    job was taken away.
+    """
+    async with AsyncSessionLocal() as db:
+        updated = await db.execute(
+            update(AgentJob)
+            .where(_held_by(job_id, worker_id))
+            .values(
+                status="failed" if result.get("status") == "failed" else "completed",
+                result=result,
+                error_message=result.get("error_message"),
+                agent_log_id=agent_log_id,
+                finished_at=datetime.now(timezone.utc)
+            )
+        )
+        await db.commit()
+        return updated.rowcount > 0
+
+async def fail(
+    job_id: int,
+    worker_id: str,
+    error_message: str,
+    agent_log_id: Optional[int] = None
+) -> bool:
+    """
+    Re-queue a job that raised, or mark it failed once attempts run out.
+    Returns False if the job was taken away.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(AgentJob.attempts, AgentJob.max_attempts).where(_held_by(job_id, worker_id))
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+
+        retry = row.attempts < row.max_attempts
+        updated = await db.execute(
+            update(AgentJob)
+            .where(_held_by(job_id, worker_id), AgentJob.attempts == row.attempts)
+            .values(
+                status="queued" if retry else "failed",
+                worker_id=None,
+                error_message=error_message,
+                agent_log_id=agent_log_id,
+                finished_at=None if retry else datetime.now(timezone.utc)
+            )
+        )
+        await db.commit()
+        return updated.rowcount > 0
+
+async def requeue_stale(stale_after: float) -> int:
+    """
+    Recover running jobs whose worker stopped heartbeating (crash, restart).
+    Returns the number of jobs re-queued or failed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+    stale = and_(AgentJob.status == "running", AgentJob.heartbeat_at < cutoff)
+
+    async with AsyncSessionLocal() as db:
+        requeued = await db.execute(
+            update(AgentJob)
+            .where(stale, AgentJob.attempts < AgentJob.max_attempts)
+            .values(status="queued", worker_id=None, error_message="Worker stopped responding")
+        )
+        failed = await db.execute(
+            update(AgentJob)
+            .where(stale)
+            .values(
+                status="failed",
+                error_message="Worker stopped responding",
+                finished_at=datetime.now(timezone.utc)
+            )
+        )
+        await db.commit()
+        return requeued.rowcount + failed.rowcount
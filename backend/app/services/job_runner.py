@@ -0,0 +1,151 @@
+"""
+Job Runner Service - Executes queued agent jobs
+
+Runs a fixed number of worker loops per agent type (AGENT_WORKERS). Each
+worker claims a job, runs the agent with automatic logging, heartbeats
+while it runs and records the outcome. A reaper loop re-queues jobs
+whose worker stopped heartbeating; when a heartbeat finds the job gone
+(re-queued after a stall), the worker cancels its run.
+
+Idle workers poll every AGENT_JOB_POLL_INTERVAL seconds; notify() wakes
+them immediately for jobs enqueued in this process.
+"""
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import asdict
+from typing import Dict, List, Optional
+from app.agents import AGENTS
+from app.config import settings
+from app.services import job_queue
+
+logger = logging.getLogger(__name__)
+
+class JobRunner:
+    """Pool of asyncio worker loops consuming the agent_jobs queue"""
+
+    def __init__(
+        self,
+        worker_counts: Optional[Dict[str, int]] = None,
+        partition: Optional[int] = None
+    ):
+        self.worker_counts = worker_counts if worker_counts is not None else settings.agent_workers
+        self.partition = partition  # Lead partition owned by this process (python -m app.worker)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeups: Dict[str, asyncio.Event] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start worker and reaper loops"""
+        if self._tasks:
+            return
+
+        host = f"{socket.gethostname()}:{os.getpid()}"
+        if self.partition is not None:
+            host = f"{host}:p{self.partition}"
+        for agent_name, count in self.worker_counts.items():
+            if agent_name not in AGENTS:
+                logger.warning("Ignoring workers for unknown agent '%s'", agent_name)
+                continue
+
+            self._wakeups[agent_name] = asyncio.Event()
+            for index in range(count):
+                worker_id = f"{host}:{agent_name}:{index}"
+                self._tasks.append(asyncio.create_task(self._worker_loop(agent_name, worker_id)))
+
+        self._tasks.append(asyncio.create_task(self._reaper_loop()))
+
+    async def stop(self):
+        """Cancel all loops. Interrupted jobs are recovered by the reaper."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self, agent_name: str):
+        """Wake idle workers for an agent type"""
+        wakeup = self._wakeups.get(agent_name)
+        if wakeup:
+            wakeup.set()
+
+    async def _wait_for_work(self, agent_name: str):
+        wakeup = self._wakeups[agent_name]
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=settings.agent_job_poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+    async def _worker_loop(self, agent_name: str, worker_id: str):
+        while True:
+            try:
+                job = await job_queue.claim(agent_name, worker_id, self.partition)
+            except Exception:
+                logger.exception("Failed to claim %s job", agent_name)
+                job = None
+
+            if job is None:
+                await self._wait_for_work(agent_name)
+                continue
+
+            try:
+                await self._run_job(job, worker_id)
+            except Exception:
+                # Keep the worker alive; the reaper recovers the job
+                logger.exception("Running %s job %s failed", agent_name, job.id)
+
+    async def _run_job(self, job, worker_id: str):
+        agent = AGENTS[job.agent_name]()
+        run = asyncio.create_task(agent.run(job.context))
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job.id, worker_id, run))
+
+        try:
+            result = await run
+            await job_queue.complete(job.id, worker_id, asdict(result), agent_log_id=agent._log_id)
+        except asyncio.CancelledError:
+            # The heartbeat only finishes by itself after cancelling the run
+            if heartbeat.done() and not heartbeat.cancelled():
+                return
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.agent_name)
+            try:
+                await job_queue.fail(
+                    job.id, worker_id, f"{type(e).__name__}: {str(e)}", agent_log_id=agent._log_id
+                )
+            except Exception:
+                # Left running; the reaper re-queues it once its heartbeat goes stale
+                logger.exception("Failed to record the failure of job %s", job.id)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat_loop(self, job_id: int, worker_id: str, run: asyncio.Task):
+        """Heartbeat until cancelled; cancel `run` and stop if the job was taken away"""
+        while True:
+            await asyncio.sleep(settings.agent_job_heartbeat_interval)
+            try:
+                held = await job_queue.heartbeat(job_id, worker_id)
+            except Exception:
+                logger.exception("Heartbeat failed for job %s", job_id)
+                continue
+            if not held:
+                logger.warning("Job %s was taken away from %s; cancelling its run", job_id, worker_id)
+                run.cancel()
+                return
+
+    async def _reaper_loop(self):
+        while True:
+            try:
+                recovered = await job_queue.requeue_stale(settings.agent_job_stale_after)
+                if recovered:
+                    logger.warning("Recovered %d stale agent jobs", recovered)
+            except Exception:
+                logger.exception("Failed to recover stale agent jobs")
+            await asyncio.sleep(settings.agent_job_stale_after / 2)
+
+# Singleton instance
+job_runner = JobRunner()
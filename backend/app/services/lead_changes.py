@@ -0,0 +1,196 @@
+"""
+Lead Changes Service - Incremental sync of leads by commit version
+
+Every lead write stamps Lead.change_token with the token of its
+transaction, every delete leaves a LeadTombstone with one, and the commit
+records the leads table version each token got in change_commits (see
+app/models/table_version.py). Versions are handed out in commit order,
+so a client that has seen everything up to a cursor only needs the rows
+and tombstones whose version is after it.
+
+Cursors are opaque strings wrapping {"seq": n} (everything up to version
+n seen) or {"seq": n, "id": i} (a page ended inside version n at lead i).
+History older than LEAD_CHANGES_RETENTION_DAYS is pruned by
+app.jobs.prune_lead_changes; cursors from before it raise CursorExpired
+and the client has to reload and start over from a new cursor.
+
+LeadChangeNotifier polls the leads version once per
+LEAD_CHANGES_POLL_INTERVAL for the whole process and wakes up streaming
+clients when it moves, so idle streams cost no queries of their own.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import ChangeCommit, Lead, LeadTombstone, TableVersion
+from app.schemas import LeadResponse
+from app.services.etag import table_versions
+from app.services.pagination import encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+tombstones = LeadTombstone.__table__
+commits = ChangeCommit.__table__
+versions = TableVersion.__table__
+
+class CursorExpired(Exception):
+    """The changes after a cursor were pruned"""
+
+def _tombstone_upsert(ids: List[int]):
+    stmt = dialect_insert(tombstones)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["lead_id"],
+        set_={"change_token": stmt.excluded.change_token, "deleted_at": func.now()}
+    )
+    return stmt, [{"lead_id": lead_id} for lead_id in ids]
+
+def record_deletions_sync(connection, ids: List[int]):
+    """record_deletions() for sync connections (session event hooks)"""
+    stmt, rows = _tombstone_upsert(ids)
+    if rows:
+        connection.execute(stmt, rows)
+
+async def record_deletions(db: AsyncSession | AsyncConnection, ids: List[int]):
+    """Leave tombstones for deleted leads, in the caller's transaction (after the delete)"""
+    stmt, rows = _tombstone_upsert(ids)
+    if rows:
+        await db.execute(stmt, rows)
+
+async def current_version(db: AsyncSession) -> int:
+    return (await table_versions(db, ["leads"]))["leads"]
+
+async def retained_since(db: AsyncSession) -> int:
+    """Oldest leads version the change feed can still continue from"""
+    result = await db.execute(
+        select(versions.c.pruned_version).where(versions.c.table_name == "leads")
+    )
+    return result.scalar() or 0
+
+def parse_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a changes cursor; raises ValueError when malformed"""
+    try:
+        position = decode_cursor(cursor)
+        parsed = {"seq": int(position["seq"])}
+        if position.get("id") is not None:
+            parsed["id"] = int(position["id"])
+        return parsed
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def _after(seq_column, id_column, position: Dict[str, Any]):
+    if "id" not in position:
+        return seq_column > position["seq"]
+    return or_(
+        seq_column > position["seq"],
+        and_(seq_column == position["seq"], id_column > position["id"])
+    )
+
+async def start_cursor(db: AsyncSession) -> str:
+    """Cursor for "now": changes committed from here on"""
+    return encode_cursor({"seq": await current_version(db)})
+
+async def read_changes(db: AsyncSession, position: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """
+    Leads changed and deleted after `position`, oldest first, at most
+    `limit` of them. `cursor` in the result continues from there. Raises
+    CursorExpired when changes after `position` were pruned.
+    """
+    # Read before the rows: every transaction up to this version has committed
+    version = await current_version(db)
+
+    result = await db.execute(
+        select(Lead, commits.c.version)
+        .join(commits, and_(commits.c.table_name == "leads", commits.c.token == Lead.change_token))
+        .where(_after(commits.c.version, Lead.id, position))
+        .order_by(commits.c.version, Lead.id)
+        .limit(limit + 1)
+    )
+    items = [(version, lead.id, lead) for lead, version in result.all()]
+
+    result = await db.execute(
+        select(commits.c.version, tombstones.c.lead_id)
+        .join(commits, and_(commits.c.table_name == "leads", commits.c.token == tombstones.c.change_token))
+        .where(_after(commits.c.version, tombstones.c.lead_id, position))
+        .order_by(commits.c.version, tombstones.c.lead_id)
+        .limit(limit + 1)
+    )
+    items.extend((version, lead_id, None) for version, lead_id in result.all())
+
+    # Checked after the reads: a prune that committed before them shows here
+    if position["seq"] < await retained_since(db):
+        raise CursorExpired(f"Changes after version {position['seq']} were pruned, reload and take a new cursor")
+
+    items.sort(key=lambda item: (item[0], item[1]))
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    # Latest state per lead: a delete and a re-insert of the same id can
+    # both fall in one page
+    latest: Dict[int, Optional[Lead]] = {}
+    for _, lead_id, lead in items:
+        latest.pop(lead_id, None)
+        latest[lead_id] = lead
+
+    if has_more:
+        last_seq, last_id, _ = items[-1]
+        next_position = {"seq": last_seq, "id": last_id}
+    else:
+        last_seq = items[-1][0] if items else position["seq"]
+        next_position = {"seq": max(version, last_seq)}
+
+    return {
+        "changes": [LeadResponse.model_validate(lead) for lead in latest.values() if lead is not None],
+        "deleted": [lead_id for lead_id, lead in latest.items() if lead is None],
+        "cursor": encode_cursor(next_position),
+        "has_more": has_more
+    }
+
+class LeadChangeNotifier:
+    """Shared poll of the leads version for streaming clients"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.version: Optional[int] = None
+        self._changed = asyncio.Condition()
+        self._waiters = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_for_change(self, after_version: int, timeout: float) -> Optional[int]:
+        """
+        Wait until the leads version is above `after_version`. Returns the
+        version, or None after `timeout` seconds without a change.
+        """
+        self._waiters += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(
+                        lambda: self.version is not None and self.version > after_version
+                    ),
+                    timeout
+                )
+            return self.version
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters -= 1
+
+    async def _poll(self):
+        while self._waiters:
+            try:
+                async with AsyncSessionLocal() as db:
+                    version = await current_version(db)
+                if version != self.version:
+                    self.version = version
+                    async with self._changed:
+                        self._changed.notify_all()
+            except Exception:
+                logger.exception("Polling the leads version failed")
+            await asyncio.sleep(self.interval)
+
+lead_change_notifier = LeadChangeNotifier(interval=settings.lead_changes_poll_interval)
@@ -0,0 +1,85 @@
+"""
+Lead Counters Service - Maintains and reads the lead_counters table
+
+Deltas are {(status, vetting_status, region): change} mappings applied
+with one INSERT ... ON CONFLICT DO UPDATE SET count = count + change, on
+the caller's connection so they commit (or roll back) with the lead
+writes they describe. Keys are applied in sorted order so concurrent
+transactions lock counter rows in the same order.
+
+ORM writes are tracked automatically (see app/models/lead_counter.py);
+code issuing Core statements against leads calls apply_deltas().
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple, Union
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.database import dialect_insert
+from app.models.lead_counter import LeadCounter, NO_REGION, counter_key
+
+counters = LeadCounter.__table__
+
+Key = Tuple[str, str, str]
+
+def _upsert_params(deltas: Dict[Key, int]) -> Tuple[Any, List[Dict[str, Any]]]:
+    stmt = dialect_insert(counters)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["status", "vetting_status", "region"],
+        set_={"count": counters.c.count + stmt.excluded["count"]}
+    )
+    rows = [
+        {"status": status, "vetting_status": vetting_status, "region": region, "count": change}
+        for (status, vetting_status, region), change in sorted(deltas.items())
+        if change
+    ]
+    return stmt, rows
+
+def apply_deltas_sync(connection, deltas: Dict[Key, int]):
+    """apply_deltas() for sync connections (session event hooks)"""
+    stmt, rows = _upsert_params(deltas)
+    if rows:
+        connection.execute(stmt, rows)
+
+async def apply_deltas(db: Union[AsyncSession, AsyncConnection], deltas: Dict[Key, int]):
+    """Apply counter changes in the session's (or connection's) current transaction"""
+    stmt, rows = _upsert_params(deltas)
+    if rows:
+        await db.execute(stmt, rows)
+
+def count_keys(rows: Iterable[Tuple[Any, Any, Any]], sign: int = 1) -> Counter:
+    """Deltas for (status, vetting_status, region) rows entering (+1) or leaving (-1)"""
+    deltas = Counter()
+    for status, vetting_status, region in rows:
+        deltas[counter_key(status, vetting_status, region)] += sign
+    return deltas
+
+async def read_summary(db: AsyncSession) -> Dict[str, Any]:
+    """Pipeline totals from the counters table (no scan of leads)"""
+    result = await db.execute(select(LeadCounter).where(LeadCounter.count != 0))
+    rows = result.scalars().all()
+
+    total = 0
+    by_status: Counter = Counter()
+    by_vetting_status: Counter = Counter()
+    by_region: Counter = Counter()
+    for row in rows:
+        total += row.count
+        by_status[row.status] += row.count
+        by_vetting_status[row.vetting_status] += row.count
+        by_region[row.region if row.region != NO_REGION else "unknown"] += row.count
+
+    return {
+        "total": total,
+        "by_status": dict(by_status),
+        "by_vetting_status": dict(by_vetting_status),
+        "by_region": dict(by_region),
+        "counters": [
+            {
+                "status": row.status,
+                "vetting_status": row.vetting_status,
+                "region": row.region or None,
+                "count": row.count
+            }
+            for row in rows
+        ]
+    }
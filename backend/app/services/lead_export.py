@@ -0,0 +1,101 @@
+"""
+Lead Export Service - Streams leads as NDJSON or CSV
+
+Rows are read through a server-side cursor (stream() + yield_per) on a
+connection owned by the generator, and encoded one batch at a time, so
+memory stays bounded by LEADS_EXPORT_BATCH_SIZE however many leads
+match. The connection is opened when the response starts streaming and
+released when it finishes or the client disconnects.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal
+from sqlalchemy import select
+from app.config import settings
+from app.database import engine
+from app.models import Lead
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+leads = Lead.__table__
+
+EXPORT_COLUMNS = [
+    leads.c.id,
+    leads.c.company_name,
+    leads.c.website,
+    leads.c.region,
+    leads.c.status,
+    leads.c.vetting_status,
+    leads.c.score,
+    leads.c.duplicate_of,
+    leads.c.pain_points,
+    leads.c.created_at,
+    leads.c.updated_at,
+]
+FIELD_NAMES = [column.name for column in EXPORT_COLUMNS]
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _encode_ndjson(rows: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(row, default=_json_default) + "\n" for row in rows)
+
+def _encode_csv(rows: List[Dict[str, Any]], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELD_NAMES)
+    if header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            **row,
+            "pain_points": json.dumps(row["pain_points"]) if row["pain_points"] is not None else "",
+            "created_at": row["created_at"].isoformat() if row["created_at"] else "",
+            "updated_at": row["updated_at"].isoformat() if row["updated_at"] else "",
+        })
+    return buffer.getvalue()
+
+async def stream_leads(conditions: list, format: ExportFormat) -> AsyncIterator[str]:
+    """Yield the leads matching `conditions`, in id order, as encoded text chunks"""
+    batch_size = settings.leads_export_batch_size
+    query = (
+        select(*EXPORT_COLUMNS)
+        .where(*conditions)
+        .order_by(leads.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    if format == "csv":
+        # Header even when nothing matches
+        yield _encode_csv([], header=True)
+
+    exported = 0
+    async with engine.connect() as conn:
+        result = await conn.stream(query)
+        try:
+            async for partition in result.mappings().partitions(batch_size):
+                rows = [dict(row) for row in partition]
+                exported += len(rows)
+                if format == "csv":
+                    yield _encode_csv(rows, header=False)
+                else:
+                    yield _encode_ndjson(rows)
+        except Exception:
+            # Headers are already sent; the client sees a truncated body
+            logger.exception("Lead export failed after %d rows", exported)
+            raise
+        finally:
+            await result.close()
+
+    logger.info("Exported %d leads as %s", exported, format)
@@ -0,0 +1,317 @@
+"""
+Lead Import Service - Validates, deduplicates and inserts batches of leads
+
+insert_leads() backs both POST /api/leads/bulk and streaming imports.
+Streaming imports (POST /api/leads/imports, python -m app.jobs.import_leads)
+parse NDJSON or CSV incrementally from a byte stream and commit every
+LEAD_IMPORT_CHUNK_SIZE rows in their own transaction, together with the
+progress counters on the lead_imports row. If a chunk fails, only that
+chunk is rolled back and the import stops, marked failed. rows_read then
+counts the input rows covered by committed chunks: resuming the import
+with the same input (resume_import()) skips that many rows and carries on
+with the failed chunk.
+
+The API copies the request body to a temporary file (spool_upload())
+and answers before any row is processed; run_spooled_import() then runs
+the import from that file in the background.
+"""
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import tempfile
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Literal, Optional, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import Lead, LeadImport
+from app.schemas import LeadCreate
+from app.services.dedup import normalize_website
+from app.services.lead_counters import apply_deltas, count_keys
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# A parsed row: a mapping of lead fields, or why the input couldn't be parsed
+ParsedRow = Union[Dict[str, Any], str]
+
+MAX_RECORDED_ERRORS = 100  # Per import, kept on the lead_imports row
+READ_SIZE = 64 * 1024  # Bytes per read from files being imported
+
+leads = Lead.__table__
+RETURNED = (
+    leads.c.id, leads.c.website_key, leads.c.company_name,
+    leads.c.region, leads.c.status, leads.c.vetting_status
+)
+
+def _row_error(index: int, raw: ParsedRow, error: str) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "company_name": raw.get("company_name") if isinstance(raw, dict) else None,
+        "error": error
+    }
+
+async def insert_leads(
+    db: AsyncSession,
+    rows: List[Tuple[int, ParsedRow]]
+) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Validate and insert (index, row) pairs in the session's transaction.
+
+    Returns (created, skipped, invalid): created is (index, returned row)
+    in index order; skipped lists rows whose website already exists in
+    the table or earlier in `rows`; invalid lists rows that failed
+    validation. Lead counters are updated.
+    """
+    invalid = []
+    skipped = []
+    keyed: Dict[str, tuple] = {}  # website_key -> (index, row)
+    unkeyed = []  # (index, row) for leads without a website
+
+    for idx, raw in rows:
+        if isinstance(raw, str):
+            invalid.append(_row_error(idx, raw, raw))
+            continue
+        try:
+            lead_data = LeadCreate.model_validate(raw)
+        except ValidationError as e:
+            invalid.append(_row_error(idx, raw, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )))
+            continue
+
+        row = {**lead_data.model_dump(), "website_key": normalize_website(lead_data.website)}
+        if row["website_key"] is None:
+            unkeyed.append((idx, row))
+        elif row["website_key"] in keyed:
+            skipped.append(_row_error(
+                idx, raw, f"Same website as lead {keyed[row['website_key']][0]} in this request"
+            ))
+        else:
+            keyed[row["website_key"]] = (idx, row)
+
+    chunk_size = settings.leads_bulk_chunk_size
+    created = []  # (index, returned row)
+
+    # Leads with a website: existing ones are skipped by the unique index
+    # and told apart by the website_key they would have had
+    keyed_rows = list(keyed.values())
+    for start in range(0, len(keyed_rows), chunk_size):
+        chunk = keyed_rows[start:start + chunk_size]
+        result = await db.execute(
+            dialect_insert(leads)
+            .on_conflict_do_nothing(index_elements=["website_key"])
+            .returning(*RETURNED),
+            [row for _, row in chunk]
+        )
+        inserted = {row.website_key: row for row in result.all()}
+        for idx, row in chunk:
+            if row["website_key"] in inserted:
+                created.append((idx, inserted[row["website_key"]]))
+            else:
+                skipped.append(_row_error(idx, row, "A lead with this website already exists"))
+
+    # Leads without a website can't conflict. RETURNING order isn't
+    # guaranteed (asking for it makes SQLite insert row by row), but rows
+    # with the same name and region are interchangeable, so match on those
+    for start in range(0, len(unkeyed), chunk_size):
+        chunk = unkeyed[start:start + chunk_size]
+        result = await db.execute(insert(leads).returning(*RETURNED), [row for _, row in chunk])
+
+        indexes = defaultdict(deque)
+        for idx, row in chunk:
+            indexes[(row["company_name"], row["region"])].append(idx)
+        for row in result.all():
+            created.append((indexes[(row.company_name, row.region)].popleft(), row))
+
+    await apply_deltas(db, count_keys(
+        (row.status, row.vetting_status, row.region) for _, row in created
+    ))
+
+    created.sort(key=lambda item: item[0])
+    return created, skipped, invalid
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines (without line endings)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line; blank lines are ignored"""
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield f"Invalid JSON: {e}"
+            continue
+        yield value if isinstance(value, dict) else "Expected a JSON object"
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    CSV with a header row naming the lead fields (unknown columns are
+    ignored, empty cells are null).
+
+    Quoted fields may contain newlines: lines are joined until the record
+    holds an even number of quote characters, which is when it is complete.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    async for line in _lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield {name: (value if value != "" else None) for name, value in zip(header, values)}
+
+    if record:
+        yield "Unterminated quoted field at end of input"
+
+async def create_import(format: ImportFormat, filename: Optional[str] = None) -> LeadImport:
+    """Record a new running import"""
+    async with AsyncSessionLocal() as db:
+        lead_import = LeadImport(format=format, filename=filename, status="running", errors=[])
+        db.add(lead_import)
+        await db.commit()
+        await db.refresh(lead_import)
+        return lead_import
+
+async def resume_import(import_id: int) -> Optional[LeadImport]:
+    """
+    Mark a failed import running again, to be fed the same input through
+    run_import(). Returns None if there is no such import; raises
+    ValueError if it didn't fail.
+    """
+    async with AsyncSessionLocal() as db:
+        lead_import = await db.get(LeadImport, import_id)
+        if lead_import is None:
+            return None
+        if lead_import.status != "failed":
+            raise ValueError(f"Import {import_id} is {lead_import.status}, only failed imports can be resumed")
+        lead_import.status = "running"
+        lead_import.error_message = None
+        lead_import.finished_at = None
+        await db.commit()
+        await db.refresh(lead_import)
+        return lead_import
+
+async def read_blocks(f: BinaryIO) -> AsyncIterator[bytes]:
+    """A binary file's remaining content, without blocking the event loop"""
+    while True:
+        block = await asyncio.to_thread(f.read, READ_SIZE)
+        if not block:
+            break
+        yield block
+
+async def spool_upload(import_id: int, chunks: AsyncIterator[bytes]) -> BinaryIO:
+    """
+    Copy an upload to a temporary file for run_spooled_import(). If the
+    upload breaks off, the import is marked failed and the error re-raised.
+    """
+    upload = tempfile.TemporaryFile()
+    try:
+        async for chunk in chunks:
+            await asyncio.to_thread(upload.write, chunk)
+    except Exception as e:
+        upload.close()
+        await _finish(import_id, "failed", f"Upload interrupted: {e!r}")
+        raise
+    return upload
+
+async def run_spooled_import(import_id: int, upload: BinaryIO, format: ImportFormat) -> LeadImport:
+    """run_import() from a spool_upload() file, which is closed afterwards"""
+    try:
+        upload.seek(0)
+        return await run_import(import_id, read_blocks(upload), format)
+    finally:
+        upload.close()
+
+async def _commit_chunk(import_id: int, rows: List[Tuple[int, ParsedRow]]):
+    async with AsyncSessionLocal() as db:
+        created, skipped, invalid = await insert_leads(db, rows)
+
+        lead_import = await db.get(LeadImport, import_id)
+        lead_import.rows_read += len(rows)
+        lead_import.inserted += len(created)
+        lead_import.skipped += len(skipped)
+        lead_import.failed += len(invalid)
+
+        room = MAX_RECORDED_ERRORS - len(lead_import.errors or [])
+        if room > 0 and (skipped or invalid):
+            new_errors = sorted(skipped + invalid, key=lambda error: error["index"])[:room]
+            lead_import.errors = (lead_import.errors or []) + new_errors
+
+        await db.commit()
+
+async def _finish(import_id: int, status: str, error_message: Optional[str] = None) -> LeadImport:
+    async with AsyncSessionLocal() as db:
+        lead_import = await db.get(LeadImport, import_id)
+        lead_import.status = status
+        lead_import.error_message = error_message
+        lead_import.finished_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(lead_import)
+        return lead_import
+
+async def run_import(
+    import_id: int,
+    chunks: AsyncIterator[bytes],
+    format: ImportFormat,
+    chunk_size: Optional[int] = None
+) -> LeadImport:
+    """
+    Parse `chunks` and insert the leads, committing every `chunk_size`
+    rows. The first rows_read rows were committed by an earlier run of a
+    resumed import and are skipped. Returns the finished LeadImport.
+    """
+    chunk_size = chunk_size or settings.lead_import_chunk_size
+    parse = parse_csv if format == "csv" else parse_ndjson
+
+    async with AsyncSessionLocal() as db:
+        committed = (await db.get(LeadImport, import_id)).rows_read
+
+    batch: List[Tuple[int, ParsedRow]] = []
+    index = 0
+    try:
+        async for row in parse(chunks):
+            index += 1
+            if index <= committed:
+                continue
+            batch.append((index - 1, row))
+            if len(batch) >= chunk_size:
+                await _commit_chunk(import_id, batch)
+                batch = []
+        if batch:
+            await _commit_chunk(import_id, batch)
+    except Exception as e:
+        start = index - len(batch)
+        logger.exception("Lead import %s failed in the chunk starting at row %d", import_id, start)
+        return await _finish(import_id, "failed", f"Failed in the chunk starting at row {start}: {e}")
+
+    return await _finish(import_id, "completed")
@@ -0,0 +1,176 @@
+"""
+Lead Search Service - Full-text search over leads
+
+The searchable text of a lead is its company_name, website, region and the
+string values inside pain_points, weighted in that order. The database
+keeps the index in step with every write, raw SQL included:
+
+- SQLite: an FTS5 table (leads_fts, rowid = lead id) filled by triggers
+  on leads, ranked with bm25()
+- PostgreSQL: a generated tsvector column (leads.search_vector) with a
+  GIN index, ranked with ts_rank_cd()
+
+create_search_index() sets either up at startup and fills the SQLite
+index from existing rows the first time.
+
+Queries match every word, the last one as a prefix (search as you type).
+Results come ranked best first; pages continue after the (rank, id) of the
+previous page's last row. Only the newest LEAD_SEARCH_MAX_CANDIDATES
+matches that pass the list filters are ranked, and search_leads() reports
+when older ones were left out. Words found in most leads stay slow on
+SQLite: bm25() reads all their matches once per query.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, column, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import engine
+from app.models import Lead
+
+# bm25() column weights: company_name, website, region, pain_points
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+leads_fts = table("leads_fts", column("rowid"))
+
+# String values of a pain_points JSON document, space separated
+_SQLITE_PAIN_TEXT = (
+    "CASE WHEN json_valid({row}.pain_points) THEN "
+    "(SELECT group_concat(atom, ' ') FROM json_tree({row}.pain_points) WHERE type = 'text') END"
+)
+
+def _sqlite_insert(row: str) -> str:
+    return (
+        "INSERT INTO leads_fts (rowid, company_name, website, region, pain_points) "
+        f"SELECT {row}.id, {row}.company_name, {row}.website, {row}.region, "
+        f"{_SQLITE_PAIN_TEXT.format(row=row)}"
+    )
+
+SQLITE_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN "
+    f"{_sqlite_insert('new')}; END",
+    "CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN "
+    "DELETE FROM leads_fts WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS leads_fts_update "
+    f"AFTER UPDATE OF id, company_name, website, region, pain_points ON leads BEGIN "
+    f"DELETE FROM leads_fts WHERE rowid = old.id; {_sqlite_insert('new')}; END",
+]
+
+POSTGRES_DDL = [
+    # Websites are indexed whole and split at punctuation, so "acme" finds acme.com
+    """
+    ALTER TABLE leads ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(company_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(website, '') || ' ' ||
+                  translate(coalesce(website, ''), './:-_', '     ')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(region, '')), 'C') ||
+        setweight(json_to_tsvector('simple', coalesce(pain_points, 'null'::json), '["string"]'::jsonb), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_leads_search_vector ON leads USING GIN (search_vector)",
+]
+
+def create_search_index(conn):
+    """
+    Create the full-text index and its write-time maintenance if missing.
+    Run with AsyncConnection.run_sync() after create_all().
+    """
+    if conn.dialect.name == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.exec_driver_sql(statement)
+        return
+
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'"
+    ).scalar()
+    if not exists:
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE leads_fts USING fts5("
+            "company_name, website, region, pain_points, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        conn.exec_driver_sql(f"{_sqlite_insert('leads')} FROM leads")
+    for statement in SQLITE_DDL:
+        conn.exec_driver_sql(statement)
+
+def query_terms(q: str) -> List[str]:
+    """Words of a search string; punctuation only separates them"""
+    return re.findall(r"\w+", q.lower())
+
+def _match(terms: List[str]) -> Tuple[Any, Any]:
+    """(WHERE clause, rank expression) for terms; higher ranks are better"""
+    # A one-letter prefix would expand to most of the vocabulary
+    prefix = len(terms[-1]) > 1
+
+    if engine.dialect.name == "postgresql":
+        words = terms[:-1] + [f"{terms[-1]}:*" if prefix else terms[-1]]
+        tsquery = func.to_tsquery("simple", " & ".join(words))
+        search_vector = literal_column("leads.search_vector")
+        return search_vector.op("@@")(tsquery), func.ts_rank_cd(search_vector, tsquery)
+
+    # bm25() is lower for better matches
+    fts = literal_column("leads_fts")
+    words = [f'"{term}"' for term in terms]
+    if prefix:
+        words[-1] += "*"
+    return fts.op("MATCH")(" ".join(words)), -func.bm25(fts, *FTS_WEIGHTS)
+
+async def search_leads(
+    db: AsyncSession,
+    q: str,
+    conditions: List[Any],
+    limit: int,
+    position: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Lead], Optional[Dict[str, Any]], bool]:
+    """
+    One page of leads matching `q` and `conditions`, best first. Returns
+    the leads, the position to continue from (None on the last page) and
+    whether older matches were left out of the ranking.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return [], None, False
+
+    # Rank the newest matches only, so broad terms cost a bounded amount of
+    # work. The filters apply here, or older matching leads would be cut
+    # before the filters see them
+    where, rank = _match(terms)
+    if engine.dialect.name == "postgresql":
+        match_id = Lead.id
+        candidates = select(match_id.label("id"), rank.label("rank"))
+    else:
+        match_id = leads_fts.c.rowid
+        candidates = (
+            select(match_id.label("id"), rank.label("rank"))
+            .select_from(leads_fts)
+            .join(Lead, Lead.id == match_id)
+        )
+    max_candidates = settings.lead_search_max_candidates
+    candidates = (
+        candidates
+        .where(where, *conditions)
+        .order_by(match_id.desc())
+        .limit(max_candidates)
+        .cte("candidates")
+    )
+    rank = candidates.c.rank
+    ranked = select(func.count()).select_from(candidates).scalar_subquery()
+    query = select(Lead, rank, ranked).join(candidates, Lead.id == candidates.c.id)
+
+    if position is not None:
+        query = query.where(or_(
+            rank < position["rank"],
+            and_(rank == position["rank"], Lead.id > position["id"])
+        ))
+
+    # One extra row tells whether another page follows
+    result = await db.execute(query.order_by(rank.desc(), Lead.id).limit(limit + 1))
+    rows = result.all()
+
+    next_position = None
+    if len(rows) > limit:
+        last_lead, last_rank, _ = rows[limit - 1]
+        next_position = {"rank": last_rank, "id": last_lead.id}
+    # A full window may have left matches out
+    truncated = bool(rows) and rows[0][2] >= max_candidates
+    return [lead for lead, _, _ in rows[:limit]], next_position, truncated
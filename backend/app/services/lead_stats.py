@@ -0,0 +1,73 @@
+"""
+Lead Stats Service - Dashboard aggregates over the leads table
+
+Everything is computed with GROUP BY queries, so the response size and
+the work done by the API stay constant however many leads there are.
+Results are cached for LEAD_STATS_CACHE_TTL seconds per version of the
+leads table, so a lead write is seen right away and the cached body never
+falls behind the ETag GET /api/leads/stats serves with it.
+"""
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models import Lead
+from app.services.cache import TTLCache
+from app.services.etag import table_versions
+
+BUCKET_WIDTH = 10  # Score histogram buckets 0-9, 10-19, ..., 90-100
+
+_cache = TTLCache(ttl=settings.lead_stats_cache_ttl, max_size=2)  # Older versions are never read again
+
+async def _counts_by(db: AsyncSession, column) -> Dict[str, int]:
+    result = await db.execute(select(column, func.count()).group_by(column))
+    return {
+        (value if value is not None else "unknown"): count
+        for value, count in result.all()
+    }
+
+async def compute_lead_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Run the aggregate queries (uncached)"""
+    result = await db.execute(select(func.count(), func.avg(Lead.score)))
+    total, average = result.one()
+
+    # 100 joins the top bucket
+    last_bucket = 100 // BUCKET_WIDTH - 1
+    bucket = case(
+        (Lead.score >= last_bucket * BUCKET_WIDTH, last_bucket),
+        else_=Lead.score // BUCKET_WIDTH
+    ).label("bucket")
+    result = await db.execute(
+        select(bucket, func.count())
+        .where(Lead.score.isnot(None))
+        .group_by(bucket)
+    )
+    bucket_counts = dict(result.all())
+
+    histogram = []
+    for index in range(last_bucket + 1):
+        low = index * BUCKET_WIDTH
+        histogram.append({
+            "min": low,
+            "max": 100 if index == last_bucket else low + BUCKET_WIDTH - 1,
+            "count": bucket_counts.get(index, 0)
+        })
+
+    return {
+        "total": total,
+        "by_status": await _counts_by(db, Lead.status),
+        "by_vetting_status": await _counts_by(db, Lead.vetting_status),
+        "by_region": await _counts_by(db, Lead.region),
+        "score_histogram": histogram,
+        "average_score": round(float(average), 2) if average is not None else None,
+        "generated_at": datetime.utcnow()
+    }
+
+async def get_lead_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Cached lead stats"""
+    # Read before the aggregates, so the result covers at least this version
+    versions = await table_versions(db, ["leads"])
+    return await _cache.get_or_load(
+        ("leads", versions["leads"]), lambda: compute_lead_stats(db)
+    )
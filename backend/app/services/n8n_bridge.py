@@ -3,10 +3,27 @@ n8n Bridge Service - Handles communication with n8n workflows
 
 This service provides a clean interface for sending commands to n8n
 and manages webhook URLs, authentication, and error handling.
+
+All requests share one pooled httpx.AsyncClient (keep-alive, optional
+HTTP/2) that is opened and closed with the FastAPI lifespan.
+
+Each call is retried with exponential backoff and jitter, guarded by a
+per-workflow circuit breaker and throttled by a shared token bucket.
+
+Per-lead enrichment triggers for the workflows in N8N_BATCH_WORKFLOWS are
+coalesced into array payloads by a WebhookBatcher (see webhook_batcher.py).
+The shipped workflows read a single object, so by default every lead gets
+its own call.
 """
+import asyncio
+import logging
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 from app.config import settings
+from app.services.resilience import CircuitBreaker, RetryPolicy, TokenBucket
+from app.services.webhook_batcher import WebhookBatcher
+
+logger = logging.getLogger(__name__)
 
 class N8nBridge:
     """
@@ -17,60 +34,244 @@ class N8nBridge:
         self.webhook_base = settings.n8n_webhook_base
         self.auth_user = settings.n8n_basic_auth_user
         self.auth_password = settings.n8n_basic_auth_password
+        self._client: Optional[httpx.AsyncClient] = None
+        self.batch_workflows = set(settings.n8n_batch_workflows)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._retry_policies: Dict[str, RetryPolicy] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._rate_limiter = TokenBucket(
+            rate=settings.n8n_rate_limit,
+            capacity=settings.n8n_rate_burst
+        )
+        self._batcher = WebhookBatcher(
+            self.send_webhook,
+            max_size=settings.n8n_batch_max_size,
+            max_delay=settings.n8n_batch_max_delay
+        )
+        # Reject malformed N8N_RETRY_OVERRIDES at startup, not on the first call
+        for workflow_name in settings.n8n_retry_overrides:
+            self._retry_policy(workflow_name)
+    
+    async def start(self):
+        """Open the shared HTTP client (called on app startup)"""
+        if self._client is not None:
+            return
+        
+        # Prepare auth if configured
+        auth = None
+        if self.auth_user and self.auth_password:
+            auth = httpx.BasicAuth(self.auth_user, self.auth_password)
+        
+        http2 = settings.n8n_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("N8N_HTTP2 is set but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+        
+        self._client = httpx.AsyncClient(
+            auth=auth,
+            http2=http2,
+            timeout=30,
+            limits=httpx.Limits(
+                max_connections=settings.n8n_max_connections,
+                max_keepalive_connections=settings.n8n_max_keepalive_connections,
+                keepalive_expiry=settings.n8n_keepalive_expiry
+            )
+        )
+    
+    async def aclose(self):
+        """Flush queued batches and close the shared HTTP client (called on app shutdown)"""
+        await self._batcher.flush_all()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Scripts and workers run agents without the app lifespan
+        if self._client is None:
+            await self.start()
+        return self._client
     
     async def send_webhook(
         self,
         workflow_name: str,
-        payload: Dict[str, Any],
+        payload: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
         timeout: int = 30
-    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+    ) -> tuple[bool, Optional[Any], Optional[str]]:
         """
         Send a webhook request to an n8n workflow.
         
         Args:
             workflow_name: Name of the workflow (e.g., "enrichment-tech")
-            payload: Data to send to the workflow
+            payload: Data to send to the workflow (None sends an empty body,
+                a list sends a batch)
             timeout: Request timeout in seconds
         
         Returns:
-            Tuple of (success: bool, response_data: dict | None, error: str | None)
+            Tuple of (success: bool, response_data: dict | list | None, error: str | None)
         """
-        url = f"{self.webhook_base}/{workflow_name}"
+        breaker = self._breaker(workflow_name)
+        policy = self._retry_policy(workflow_name)
+        stats = self._workflow_stats(workflow_name)
+        stats["calls"] += 1
         
-        # Prepare auth if configured
-        auth = None
-        if self.auth_user and self.auth_password:
-            auth = httpx.BasicAuth(self.auth_user, self.auth_password)
+        # Fail fast while n8n is known to be down
+        if not breaker.allow():
+            stats["failures"] += 1
+            return False, None, (
+                f"Circuit open for {workflow_name}: n8n unavailable, "
+                f"next attempt in {breaker.retry_after():.0f}s"
+            )
         
+        trial = breaker.state == CircuitBreaker.HALF_OPEN
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    auth=auth
-                )
+            for attempt in range(max(1, policy.max_attempts)):
+                if attempt > 0:
+                    stats["retries"] += 1
+                    await asyncio.sleep(policy.delay(attempt - 1))
                 
-                response.raise_for_status()
+                await self._rate_limiter.acquire()
+                success, data, error, retryable = await self._post(workflow_name, payload, timeout)
                 
-                # Try to parse JSON response
-                try:
-                    data = response.json()
-                except Exception:
-                    data = {"status": "ok"}
+                if success:
+                    breaker.record_success()
+                    stats["successes"] += 1
+                    return True, data, None
                 
-                return True, data, None
+                stats["last_error"] = error
+                if not retryable:
+                    break
+            
+            if retryable:
+                breaker.record_failure()
+            else:
+                # n8n answered, it just refused this request
+                breaker.record_success()
+        except Exception as e:
+            # Failed on our side (e.g. a payload that isn't JSON), which
+            # says nothing about n8n
+            error = f"Unexpected error: {str(e)}"
+            stats["last_error"] = error
+        finally:
+            # A trial call cancelled or failed without a verdict must not
+            # keep the circuit half-open
+            if trial:
+                breaker.end_trial()
+        stats["failures"] += 1
+        return False, None, error
+    
+    async def _post(
+        self,
+        workflow_name: str,
+        payload: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]],
+        timeout: int
+    ) -> tuple[bool, Optional[Any], Optional[str], bool]:
+        """
+        Make a single webhook request. Errors other than HTTP and
+        transport errors are raised.
+        
+        Returns:
+            Tuple of (success, response_data, error, retryable)
+        """
+        url = f"{self.webhook_base}/{workflow_name}"
+        
+        try:
+            client = await self._get_client()
+            response = await client.post(
+                url,
+                json=payload,
+                timeout=timeout
+            )
+            
+            response.raise_for_status()
+            
+            # Try to parse JSON response
+            try:
+                data = response.json()
+            except Exception:
+                data = {"status": "ok"}
+            
+            return True, data, None, False
         
         except httpx.HTTPStatusError as e:
             error_msg = f"HTTP {e.response.status_code}: {e.response.text[:200]}"
-            return False, None, error_msg
+            # Server errors and throttling are transient, other 4xx are not
+            retryable = e.response.status_code >= 500 or e.response.status_code == 429
+            return False, None, error_msg, retryable
         
         except httpx.RequestError as e:
             error_msg = f"Request failed: {str(e)}"
-            return False, None, error_msg
+            return False, None, error_msg, True
+    
+    def batches(self, workflow_name: str) -> bool:
+        """Whether triggers for workflow_name are sent as array payloads"""
+        return workflow_name in self.batch_workflows
+    
+    async def _trigger(self, workflow_name: str, payload: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """Send one per-lead payload, batched if the workflow accepts arrays"""
+        if self.batches(workflow_name):
+            return await self._batcher.submit(workflow_name, payload)
         
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            return False, None, error_msg
+        success, response, error = await self.send_webhook(workflow_name, payload)
+        return success, error
+    
+    def _breaker(self, workflow_name: str) -> CircuitBreaker:
+        if workflow_name not in self._breakers:
+            self._breakers[workflow_name] = CircuitBreaker(
+                failure_threshold=settings.n8n_breaker_failure_threshold,
+                reset_timeout=settings.n8n_breaker_reset_timeout
+            )
+        return self._breakers[workflow_name]
+    
+    def _retry_policy(self, workflow_name: str) -> RetryPolicy:
+        if workflow_name not in self._retry_policies:
+            options = {
+                "max_attempts": settings.n8n_retry_attempts,
+                "base_delay": settings.n8n_retry_base_delay,
+                "max_delay": settings.n8n_retry_max_delay,
+                **settings.n8n_retry_overrides.get(workflow_name, {})
+            }
+            self._retry_policies[workflow_name] = RetryPolicy(**options)
+        return self._retry_policies[workflow_name]
+    
+    def _workflow_stats(self, workflow_name: str) -> Dict[str, Any]:
+        return self._stats.setdefault(workflow_name, {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "last_error": None
+        })
+    
+    def status(self) -> Dict[str, Any]:
+        """Retry, circuit breaker and rate limiter state for monitoring"""
+        return {
+            "rate_limiter": self._rate_limiter.snapshot(),
+            "workflows": {
+                name: {
+                    **stats,
+                    "circuit": self._breaker(name).snapshot(),
+                    "retry_policy": self._retry_policy(name).snapshot()
+                }
+                for name, stats in self._stats.items()
+            }
+        }
+    
+    async def trigger_lead_discovery(self) -> tuple[bool, Optional[str]]:
+        """
+        Trigger the lead discovery workflow.
+        
+        Returns:
+            Tuple of (success: bool, error: str | None)
+        """
+        success, response, error = await self.send_webhook(
+            "discover-leads",
+            timeout=60
+        )
+        
+        return success, error
     
     async def trigger_tech_debt_analysis(
         self,
@@ -92,12 +293,7 @@ class N8nBridge:
             "website": website
         }
         
-        success, response, error = await self.send_webhook(
-            "enrichment-tech",
-            payload
-        )
-        
-        return success, error
+        return await self._trigger("enrichment-tech", payload)
     
     async def trigger_review_mining(
         self,
@@ -119,12 +315,7 @@ class N8nBridge:
             "company_name": company_name
         }
         
-        success, response, error = await self.send_webhook(
-            "enrichment-reviews",
-            payload
-        )
-        
-        return success, error
+        return await self._trigger("enrichment-reviews", payload)
 
 # Singleton instance
 n8n_bridge = N8nBridge()
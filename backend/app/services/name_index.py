@@ -0,0 +1,260 @@
+"""
+Name Index Service - Fuzzy company-name duplicate detection
+
+OSM and the Serper fallback return the same business under slightly
+different names ("Sakura Sushi", "Sakura Sushi Restaurant LLC"), usually
+without a website, so website_key cannot catch them. This service keeps an
+in-memory MinHash LSH index over character trigrams of Lead.company_name,
+bucketed per region:
+
+- find() hashes one name and only compares it against leads that share
+  an LSH band, instead of scanning every lead in the region
+- leads flagged as near-duplicates (Lead.duplicate_of) are not indexed,
+  so matches always point at the original
+
+The leads table is the source of truth, so every process (web, workers,
+replicas) sees the others' writes: sync() loads the index on first use
+and afterwards applies the leads changed or deleted since the last sync,
+found through the change feed tables (see app/services/lead_changes.py),
+or loads it again when those were pruned in between.
+exclusive() serializes check-then-insert between discovery runs: within
+a process, and across processes on PostgreSQL (advisory lock).
+"""
+import asyncio
+import random
+import re
+import zlib
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from sqlalchemy import and_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models import ChangeCommit, Lead, LeadTombstone
+from app.services.etag import table_versions
+from app.services.lead_changes import retained_since
+
+# Mersenne prime for the universal hash family used by MinHash
+PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+MAX_CACHED_SHINGLES = 200_000
+
+# pg_advisory_xact_lock key held while duplicates are checked and inserted
+ADVISORY_LOCK_KEY = 727_003
+
+# Legal/generic suffixes that make the same business look different
+STOP_WORDS = {
+    "llc", "inc", "ltd", "limited", "co", "corp", "company",
+    "fze", "fzco", "fzc", "est", "the", "and", "&",
+}
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase, strip punctuation and legal suffixes"""
+    if not name:
+        return ""
+    # Dots go first, so "L.L.C." and "Co." are words to drop
+    words = re.findall(r"[\w&]+", name.lower().replace(".", ""))
+    return " ".join(w for w in words if w not in STOP_WORDS)
+
+def trigrams(name: str) -> Set[str]:
+    """Character trigrams of a normalized name, padded so short names still shingle"""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) so the LSH S-curve crosses 50% near the threshold.
+    The curve's inflection point is roughly (1 / bands) ** (1 / rows).
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        # Bias slightly below the threshold so true matches are not missed
+        error = abs((1 / bands) ** (1 / rows) - (threshold - 0.05))
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+class NameIndex:
+    """
+    MinHash LSH index over (region, company name trigrams).
+
+    Keys are opaque hashables, normally lead ids.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, PRIME), rng.randrange(0, PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self._shingle_cache: Dict[str, Tuple[int, ...]] = {}
+
+        # key -> (region, trigrams, band hashes)
+        self._entries: Dict[Hashable, Tuple[str, Set[str], List[int]]] = {}
+        # (region, band number, band hash) -> keys
+        self._buckets: Dict[Tuple[str, int, int], Set[Hashable]] = {}
+
+        self.loaded = False
+        self.version = 0  # leads table version the index reflects
+        self._sync_lock = asyncio.Lock()
+        self._writer_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _shingle_hashes(self, shingle: str) -> Tuple[int, ...]:
+        """
+        All num_perm hash values of one trigram.
+        The trigram vocabulary is small, so these are computed once and cached.
+        """
+        hashes = self._shingle_cache.get(shingle)
+        if hashes is None:
+            h = zlib.crc32(shingle.encode())
+            hashes = tuple(((a * h + b) % PRIME) & MAX_HASH for a, b in self._perms)
+            if len(self._shingle_cache) < MAX_CACHED_SHINGLES:
+                self._shingle_cache[shingle] = hashes
+        return hashes
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        # Element-wise minimum across the trigram hash vectors
+        return list(map(min, zip(*(self._shingle_hashes(s) for s in shingles))))
+
+    def _band_hashes(self, signature: List[int]) -> List[int]:
+        rows = self.rows
+        return [
+            hash(tuple(signature[i * rows:(i + 1) * rows]))
+            for i in range(self.bands)
+        ]
+
+    def _prepare(self, name: str, region: Optional[str]):
+        shingles = trigrams(normalize_name(name))
+        region_key = (region or "").strip().lower()
+        return region_key, shingles
+
+    def add(self, key: Hashable, name: str, region: Optional[str] = None) -> None:
+        """Index a lead. Re-adding an existing key replaces it."""
+        self.remove(key)
+
+        region_key, shingles = self._prepare(name, region)
+        if not shingles:
+            return
+
+        bands = self._band_hashes(self._signature(shingles))
+        self._entries[key] = (region_key, shingles, bands)
+        for band_no, band_hash in enumerate(bands):
+            self._buckets.setdefault((region_key, band_no, band_hash), set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+
+        region_key, _, bands = entry
+        for band_no, band_hash in enumerate(bands):
+            bucket = self._buckets.get((region_key, band_no, band_hash))
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(region_key, band_no, band_hash)]
+
+    def find(self, name: str, region: Optional[str] = None) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed lead in the same region.
+
+        Returns:
+            Tuple of (key, similarity) if one reaches the threshold, else None
+        """
+        region_key, shingles = self._prepare(name, region)
+        if not shingles:
+            return None
+
+        candidates: Set[Hashable] = set()
+        for band_no, band_hash in enumerate(self._band_hashes(self._signature(shingles))):
+            candidates |= self._buckets.get((region_key, band_no, band_hash), set())
+
+        best = None
+        for key in candidates:
+            similarity = jaccard(shingles, self._entries[key][1])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    async def sync(self) -> None:
+        """Load the index on first use, then catch up with lead writes since the last sync"""
+        async with self._sync_lock:
+            async with AsyncSessionLocal() as db:
+                # Read before the rows: a write committed in between is
+                # applied again next time, which is harmless
+                version = (await table_versions(db, ["leads"]))["leads"]
+                if self.loaded and version != self.version:
+                    await self._catch_up(db)
+                    # Changes since the last sync were pruned: start over
+                    if self.version < await retained_since(db):
+                        self._entries.clear()
+                        self._buckets.clear()
+                        self.loaded = False
+                if not self.loaded:
+                    await self._load(db)
+            self.version = version
+            self.loaded = True
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.stream(
+            select(Lead.id, Lead.company_name, Lead.region)
+            .where(Lead.duplicate_of.is_(None))
+        )
+        async for row in result:
+            self.add(row.id, row.company_name, row.region)
+
+    async def _catch_up(self, db: AsyncSession) -> None:
+        commits = ChangeCommit.__table__
+        tombstones = LeadTombstone.__table__
+
+        # Deletes first: a re-used id is removed and then indexed again
+        result = await db.stream(
+            select(tombstones.c.lead_id)
+            .join(commits, and_(commits.c.table_name == "leads", commits.c.token == tombstones.c.change_token))
+            .where(commits.c.version > self.version)
+        )
+        async for row in result:
+            self.remove(row.lead_id)
+
+        result = await db.stream(
+            select(Lead.id, Lead.company_name, Lead.region, Lead.duplicate_of)
+            .join(commits, and_(commits.c.table_name == "leads", commits.c.token == Lead.change_token))
+            .where(commits.c.version > self.version)
+        )
+        async for row in result:
+            if row.duplicate_of is None:
+                self.add(row.id, row.company_name, row.region)
+            else:
+                self.remove(row.id)
+
+    @asynccontextmanager
+    async def exclusive(self, db: AsyncSession):
+        """
+        Hold off other duplicate checks in this process until the block
+        exits, and in other processes until `db`'s transaction ends
+        (PostgreSQL only), then sync. Check and insert inside the block so
+        concurrent discovery runs see each other's leads.
+        """
+        async with self._writer_lock:
+            if engine.dialect.name == "postgresql":
+                await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            await self.sync()
+            yield
+
+# Singleton instance
+name_index = NameIndex(threshold=settings.fuzzy_dedup_threshold)
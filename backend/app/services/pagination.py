@@ -0,0 +1,113 @@
+"""
+Keyset pagination helpers
+
+Cursors are opaque url-safe tokens holding the sort key and id of the
+last row of a page. The next page continues strictly after that
+(sort value, id) pair, so every page costs an index range scan no
+matter how deep it is, unlike OFFSET.
+
+estimate_count() returns a cheap row estimate for page headers instead
+of an exact COUNT(*):
+- PostgreSQL: pg_class.reltuples without filters, the planner's row
+  estimate (EXPLAIN) with filters
+- SQLite: the row count kept in sqlite_stat1 by ANALYZE without filters,
+  otherwise a COUNT(*) that stops after `cap` rows. It then reports `cap`
+  and flags it as a lower bound.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import DateTime, String, and_, or_, select, func, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import engine
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
+
+def sort_expression(column):
+    """
+    Expression to sort and compare a column on. SQLite stores datetimes as
+    text and CURRENT_TIMESTAMP defaults lack the microseconds SQLAlchemy
+    binds, so those are compared as the stored text.
+    """
+    if engine.dialect.name == "sqlite" and isinstance(column.type, DateTime):
+        return type_coerce(column, String)
+    return column
+
+def cursor_value(column, value: Any) -> Any:
+    """Turn a decoded cursor value back into a bind value for column"""
+    if value is not None and isinstance(column.type, DateTime) and engine.dialect.name != "sqlite":
+        return datetime.fromisoformat(value)
+    return value
+
+def after_cursor(column, id_column, value: Any, last_id: int, descending: bool):
+    """Rows strictly after (value, last_id) in (column, id) order"""
+    sort_key = sort_expression(column)
+    value = cursor_value(column, value)
+    if descending:
+        return or_(sort_key < value, and_(sort_key == value, id_column < last_id))
+    return or_(sort_key > value, and_(sort_key == value, id_column > last_id))
+
+async def estimate_count(
+    db: AsyncSession,
+    table,
+    conditions: List[Any],
+    cap: int = 10000
+) -> Tuple[Optional[int], bool]:
+    """
+    Approximate number of rows in table matching conditions, and whether
+    it is only a lower bound (the SQLite COUNT reached `cap`)
+    """
+    dialect = engine.dialect.name
+
+    if dialect == "postgresql":
+        if not conditions:
+            result = await db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                {"name": table.name}
+            )
+            estimate = result.scalar()
+            # -1 until the table is first vacuumed or analyzed
+            if estimate is not None and estimate >= 0:
+                return int(estimate), False
+
+        compiled = select(table.c.id).where(*conditions).compile(engine.sync_engine)
+        params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+
+    if not conditions:
+        result = await db.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        )
+        if result.scalar():
+            result = await db.execute(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :name LIMIT 1"),
+                {"name": table.name}
+            )
+            stat = result.scalar()
+            if stat:
+                return int(stat.split()[0]), False
+
+    # One row past the cap tells whether the count stopped early
+    bounded = select(table.c.id).where(*conditions).limit(cap + 1).subquery()
+    result = await db.execute(select(func.count()).select_from(bounded))
+    count = result.scalar()
+    return min(count, cap), count > cap
@@ -0,0 +1,46 @@
+"""
+Lead Pipeline - Event-driven Discovery -> Vetting -> TechDebt
+
+DiscoveryAgent publishes the ids of the leads it inserts and VettingAgent
+the ids it approves (see event_bus.py). This module subscribes to both
+and turns each micro-batch into a queued job limited to those ids:
+
+    leads.discovered -> vetting   {"lead_ids": [...]}
+    leads.approved   -> tech_debt {"lead_ids": [...]}
+
+so new leads are vetted and sent for enrichment within seconds, without
+rescanning the leads table. Jobs go through the durable agent_jobs queue
+and keep its retries, worker limits and logging.
+"""
+from typing import List, Optional
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services import job_queue
+from app.services.event_bus import EventBus, event_bus, LEADS_DISCOVERED, LEADS_APPROVED
+from app.services.job_runner import JobRunner, job_runner
+
+def register(bus: EventBus = event_bus, runner: Optional[JobRunner] = None):
+    """Subscribe the pipeline stages. runner is woken for each queued job."""
+    if not settings.pipeline_enabled:
+        return
+
+    runner = runner or job_runner
+
+    async def enqueue_for(agent_name: str, lead_ids: List[int]):
+        async with AsyncSessionLocal() as db:
+            await job_queue.enqueue(db, agent_name, {"lead_ids": sorted(set(lead_ids))})
+            await db.commit()
+        runner.notify(agent_name)
+
+    async def vet_discovered(lead_ids: List[int]):
+        await enqueue_for("vetting", lead_ids)
+
+    async def enrich_approved(lead_ids: List[int]):
+        await enqueue_for("tech_debt", lead_ids)
+
+    options = {
+        "max_size": settings.pipeline_batch_size,
+        "max_delay": settings.pipeline_batch_delay
+    }
+    bus.subscribe(LEADS_DISCOVERED, vet_discovered, **options)
+    bus.subscribe(LEADS_APPROVED, enrich_approved, **options)
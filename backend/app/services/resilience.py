@@ -0,0 +1,156 @@
+"""
+Resilience primitives for outbound calls (used by N8nBridge)
+
+- RetryPolicy: exponential backoff with full jitter
+- CircuitBreaker: fails fast after repeated failures, probes with one
+  trial call once the reset timeout has passed
+- TokenBucket: async rate limiter with burst capacity
+
+All three expose snapshot() so their state can be served by the API.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+@dataclass
+class RetryPolicy:
+    """How often and how patiently to retry a failed call"""
+    max_attempts: int = 3
+    base_delay: float = 1.0  # Seconds before the first retry
+    max_delay: float = 10.0  # Upper bound for any single backoff
+
+    def __post_init__(self):
+        # Settings may spell these as any JSON number ("max_attempts": 2.0)
+        self.max_attempts = int(self.max_attempts)
+        self.base_delay = float(self.base_delay)
+        self.max_delay = float(self.max_delay)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number attempt + 1 (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay
+        }
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures.
+    Open -> half-open after reset_timeout seconds; one trial call decides
+    whether the circuit closes again or re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            else:
+                self.rejected_calls += 1
+                return False
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected_calls += 1
+                return False
+            self._trial_in_flight = True
+
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def end_trial(self):
+        """Let another trial call through when one ended without a verdict"""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
+
+class TokenBucket:
+    """Allows `rate` calls per second on average and bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Take one token, sleeping until one is available"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self.waits += 1
+                self.total_wait_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens_available": round(self.tokens, 2),
+            "waits": self.waits,
+            "total_wait_seconds": round(self.total_wait_seconds, 2)
+        }
@@ -0,0 +1,264 @@
+"""
+Agent Scheduler - Periodic agent runs from AGENT_SCHEDULES
+
+Each entry schedules one agent with either a cron expression (UTC) or an
+interval in seconds:
+
+    {"vetting": {"interval": 900},
+     "tech_debt": {"cron": "0 */6 * * *", "jitter": 60, "catch_up": "none",
+                   "context": {"limit": 20}}}
+
+State lives in the agent_schedules table, so every replica runs the same
+loop safely:
+
+- Lease: a due run is taken with one atomic UPDATE ... WHERE the lease is
+  free or expired, so exactly one replica enqueues it.
+- No overlap: while jobs from the previous run are still queued or
+  running, the next run waits (catch_up "once" / "all") or is skipped
+  (catch_up "none").
+- Jitter: each run starts up to `jitter` seconds after its slot, so
+  schedules sharing a slot don't hit the database and n8n at once.
+- Catch-up after downtime: "none" skips missed slots, "once" runs one
+  coalesced run, "all" runs every missed slot in turn.
+
+Times are timezone-aware UTC. PostgreSQL returns the stored times aware,
+SQLite naive; utc() brings both to the same form before any arithmetic.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update, or_, func
+from app.agents import AGENTS
+from app.config import settings
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import AgentJob, AgentSchedule
+from app.services import job_queue
+from app.services.cron import CronSchedule
+from app.services.job_runner import job_runner
+
+logger = logging.getLogger(__name__)
+
+CATCH_UP_MODES = ("none", "once", "all")
+
+def utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive values are taken to be UTC already"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+@dataclass
+class ScheduleRule:
+    """When and how to run one agent"""
+    agent_name: str
+    cron: Optional[CronSchedule] = None
+    interval: Optional[float] = None  # Seconds
+    jitter: float = 0.0
+    catch_up: str = "once"
+    context: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, agent_name: str, raw: Dict[str, Any]) -> "ScheduleRule":
+        if agent_name not in AGENTS:
+            raise ValueError(f"Schedule for unknown agent '{agent_name}'. Available: {list(AGENTS.keys())}")
+
+        if ("cron" in raw) == ("interval" in raw):
+            raise ValueError(f"Schedule for '{agent_name}' needs exactly one of 'cron' or 'interval'")
+
+        interval = raw.get("interval")
+        if interval is not None and float(interval) <= 0:
+            raise ValueError(f"Schedule interval for '{agent_name}' must be positive")
+
+        catch_up = raw.get("catch_up", settings.scheduler_catch_up)
+        if catch_up not in CATCH_UP_MODES:
+            raise ValueError(f"Schedule catch_up for '{agent_name}' must be one of {CATCH_UP_MODES}")
+
+        return cls(
+            agent_name=agent_name,
+            cron=CronSchedule(raw["cron"]) if "cron" in raw else None,
+            interval=float(interval) if interval is not None else None,
+            jitter=float(raw.get("jitter", settings.scheduler_jitter)),
+            catch_up=catch_up,
+            context=raw.get("context") or {}
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Next nominal slot after moment"""
+        if self.cron:
+            return self.cron.next_after(moment)
+        return moment + timedelta(seconds=self.interval)
+
+    def start_for(self, slot: datetime) -> datetime:
+        """When the run for a slot may start"""
+        return slot + timedelta(seconds=random.uniform(0, self.jitter))
+
+def load_schedules(raw: Optional[Dict[str, Dict[str, Any]]] = None) -> List[ScheduleRule]:
+    """Parse AGENT_SCHEDULES (or the given mapping). Raises ValueError on bad entries."""
+    raw = settings.agent_schedules if raw is None else raw
+    return [ScheduleRule.from_dict(agent_name, options) for agent_name, options in raw.items()]
+
+class AgentScheduler:
+    """Enqueues scheduled agent runs; safe to run on every replica"""
+
+    def __init__(self, schedules: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.schedules = schedules
+        self.rules: List[ScheduleRule] = []
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Register schedules and start the scheduling loop"""
+        if self._task:
+            return
+
+        # Invalid AGENT_SCHEDULES fail startup rather than silently never running
+        self.rules = load_schedules(self.schedules)
+        if not self.rules:
+            return
+
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            for rule in self.rules:
+                slot = rule.next_after(now)
+                await db.execute(
+                    dialect_insert(AgentSchedule)
+                    .values(
+                        agent_name=rule.agent_name,
+                        next_run_at=slot,
+                        start_after=rule.start_for(slot),
+                        skipped_runs=0
+                    )
+                    .on_conflict_do_nothing(index_elements=["agent_name"])
+                )
+            await db.commit()
+
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        # Spread replicas that booted together across the tick
+        await asyncio.sleep(random.uniform(0, settings.scheduler_tick_interval))
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(settings.scheduler_tick_interval)
+
+    async def tick(self, now: Optional[datetime] = None) -> List[int]:
+        """Enqueue every due run this replica wins the lease for. Returns the new job ids."""
+        now = utc(now) if now else datetime.now(timezone.utc)
+        job_ids = []
+        for rule in self.rules:
+            schedule = await self._acquire(rule, now)
+            if schedule is not None:
+                job_ids.extend(await self._run(rule, schedule, now))
+        return job_ids
+
+    async def _acquire(self, rule: ScheduleRule, now: datetime) -> Optional[AgentSchedule]:
+        """Take the lease on a due schedule, or return None"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(AgentSchedule)
+                .where(
+                    AgentSchedule.agent_name == rule.agent_name,
+                    AgentSchedule.start_after <= now,
+                    or_(
+                        AgentSchedule.lease_expires_at.is_(None),
+                        AgentSchedule.lease_expires_at < now,
+                        AgentSchedule.lease_owner == self.owner
+                    )
+                )
+                .values(
+                    lease_owner=self.owner,
+                    lease_expires_at=now + timedelta(seconds=settings.scheduler_lease_ttl)
+                )
+                .returning(AgentSchedule)
+                .execution_options(synchronize_session=False)
+            )
+            schedule = result.scalar_one_or_none()
+            await db.commit()
+            return schedule
+
+    async def _run(self, rule: ScheduleRule, schedule: AgentSchedule, now: datetime) -> List[int]:
+        """Enqueue the due run (or skip it) and move the schedule on, then release the lease"""
+        now = utc(now)
+        start_after = utc(schedule.start_after)
+        next_run_at = utc(schedule.next_run_at)
+        
+        async with AsyncSessionLocal() as db:
+            still_active = 0
+            if schedule.last_job_ids:
+                result = await db.execute(
+                    select(func.count(AgentJob.id)).where(
+                        AgentJob.id.in_(schedule.last_job_ids),
+                        AgentJob.status.in_(["queued", "running"])
+                    )
+                )
+                still_active = result.scalar()
+
+            # Missed by more than two ticks: the process was down at the slot
+            missed = (now - start_after).total_seconds() > 2 * settings.scheduler_tick_interval
+
+            if still_active and rule.catch_up != "none":
+                # Hold the slot until the previous run finishes
+                await self._release(db, rule.agent_name)
+                await db.commit()
+                return []
+
+            if still_active or (missed and rule.catch_up == "none"):
+                logger.info("Skipping scheduled %s run due at %s", rule.agent_name, next_run_at)
+                slot = rule.next_after(now)
+                values = {"skipped_runs": AgentSchedule.skipped_runs + 1}
+                jobs = []
+            else:
+                jobs = await job_queue.enqueue(db, rule.agent_name, rule.context)
+                if rule.catch_up == "all":
+                    # Step through missed slots one run at a time
+                    slot = rule.next_after(next_run_at)
+                else:
+                    slot = rule.next_after(max(now, next_run_at))
+                values = {"last_run_at": now, "last_job_ids": [job.id for job in jobs]}
+
+            released = await self._release(
+                db,
+                rule.agent_name,
+                next_run_at=slot,
+                start_after=rule.start_for(slot),
+                **values
+            )
+            if not released:
+                # Lease expired and another replica took over mid-run
+                await db.rollback()
+                return []
+
+            await db.commit()
+
+        if jobs:
+            logger.info("Scheduled %s run queued jobs %s", rule.agent_name, [job.id for job in jobs])
+            job_runner.notify(rule.agent_name)
+        return [job.id for job in jobs]
+
+    async def _release(self, db, agent_name: str, **values) -> bool:
+        """Clear our lease, applying values. False if we no longer hold it."""
+        result = await db.execute(
+            update(AgentSchedule)
+            .where(
+                AgentSchedule.agent_name == agent_name,
+                AgentSchedule.lease_owner == self.owner
+            )
+            .values(lease_owner=None, lease_expires_at=None, **values)
+        )
+        return result.rowcount > 0
+
+# Singleton instance
+scheduler = AgentScheduler()
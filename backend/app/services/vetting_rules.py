@@ -0,0 +1,122 @@
+"""
+Vetting Rules Service - Declarative rules for VettingAgent
+
+A rule states a requirement a pending lead must meet; leads that fail it
+are rejected with the rule's reason. Rules are plain dicts so they can be
+changed through configuration (VETTING_RULES, a JSON list) or per run
+through the agent context, without a deploy:
+
+    {"field": "website", "operator": "min_length", "threshold": 4,
+     "reason": "No valid website"}
+
+Each rule compiles to:
+- a SQL predicate matching failing leads, when the operator has an exact
+  SQL equivalent on both SQLite and PostgreSQL, so it runs as one UPDATE
+- otherwise a batch predicate that evaluates one column of a whole chunk
+  at once (used for regex operators, whose dialects differ between
+  Python, SQLite and PostgreSQL)
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func, not_, or_
+from sqlalchemy.sql.elements import ColumnElement
+from app.config import settings
+from app.models import Lead
+
+# The rules VettingAgent has always applied
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"field": "website", "operator": "min_length", "threshold": 4, "reason": "No valid website"},
+    {"field": "company_name", "operator": "min_length", "threshold": 3, "reason": "Invalid company name"},
+]
+
+FIELDS = {"company_name", "website", "website_key", "region", "status", "score"}
+
+# operator -> predicate matching *failing* values, in SQL and in Python.
+# NULL handling is spelled out so both forms always agree.
+SQL_OPERATORS: Dict[str, Callable[[Any, Any], ColumnElement]] = {
+    "required": lambda col, t: or_(col.is_(None), func.trim(col) == ""),
+    "min_length": lambda col, t: or_(col.is_(None), func.length(col) < t),
+    "max_length": lambda col, t: func.length(col) > t,
+    "equals": lambda col, t: or_(col.is_(None), col != t),
+    "not_equals": lambda col, t: col == t,
+    "in": lambda col, t: or_(col.is_(None), col.not_in(t)),
+    "not_in": lambda col, t: col.in_(t),
+    "gte": lambda col, t: or_(col.is_(None), col < t),
+    "lte": lambda col, t: or_(col.is_(None), col > t),
+    "contains": lambda col, t: or_(
+        col.is_(None), not_(func.lower(col).contains(str(t).lower(), autoescape=True))
+    ),
+    "not_contains": lambda col, t: func.lower(col).contains(str(t).lower(), autoescape=True),
+}
+
+PYTHON_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "required": lambda v, t: v is None or str(v).strip() == "",
+    "min_length": lambda v, t: v is None or len(v) < t,
+    "max_length": lambda v, t: v is not None and len(v) > t,
+    "equals": lambda v, t: v is None or v != t,
+    "not_equals": lambda v, t: v is not None and v == t,
+    "in": lambda v, t: v is None or v not in t,
+    "not_in": lambda v, t: v is not None and v in t,
+    "gte": lambda v, t: v is None or v < t,
+    "lte": lambda v, t: v is None or v > t,
+    "contains": lambda v, t: v is None or str(t).lower() not in v.lower(),
+    "not_contains": lambda v, t: v is not None and str(t).lower() in v.lower(),
+    "matches": lambda v, t: v is None or not t.search(v),
+    "not_matches": lambda v, t: v is not None and bool(t.search(v)),
+}
+
+@dataclass
+class VettingRule:
+    """A compiled vetting rule"""
+    field: str
+    operator: str
+    threshold: Any
+    reason: str
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VettingRule":
+        field = data.get("field")
+        operator = data.get("operator")
+        threshold = data.get("threshold")
+
+        if field not in FIELDS:
+            raise ValueError(f"Unknown rule field '{field}'. Available: {sorted(FIELDS)}")
+        if operator not in PYTHON_OPERATORS:
+            raise ValueError(f"Unknown rule operator '{operator}'. Available: {sorted(PYTHON_OPERATORS)}")
+        if operator in ("in", "not_in"):
+            threshold = list(threshold or [])
+        if operator in ("matches", "not_matches"):
+            threshold = re.compile(threshold)
+
+        return cls(
+            field=field,
+            operator=operator,
+            threshold=threshold,
+            reason=data.get("reason") or f"Failed {field} {operator} check"
+        )
+
+    @property
+    def column(self):
+        return getattr(Lead, self.field)
+
+    def sql_predicate(self) -> Optional[ColumnElement]:
+        """SQL condition matching failing leads, or None if the rule must run in Python"""
+        build = SQL_OPERATORS.get(self.operator)
+        if build is None:
+            return None
+        return build(self.column, self.threshold)
+
+    def batch_predicate(self, values: List[Any]) -> List[bool]:
+        """Evaluate one column of a chunk; True marks a failing lead"""
+        fails, threshold = PYTHON_OPERATORS[self.operator], self.threshold
+        return [fails(v, threshold) for v in values]
+
+def load_rules(raw: Optional[List[Dict[str, Any]]] = None) -> List[VettingRule]:
+    """
+    Compile rules from the given list, falling back to the VETTING_RULES
+    setting and then to DEFAULT_RULES.
+    """
+    if raw is None:
+        raw = settings.vetting_rules or DEFAULT_RULES
+    return [VettingRule.from_dict(rule) for rule in raw]
@@ -0,0 +1,95 @@
+"""
+Webhook Batcher - Coalesces per-lead n8n webhooks into array payloads
+
+Callers submit one payload at a time and await their own result. Payloads
+for the same workflow are held until max_size is reached or max_delay
+seconds have passed since the first one arrived, then sent as a single
+JSON array.
+
+Per-item results:
+- If n8n answers with a JSON array of the same length, each element is
+  that item's result ({"success": false, "error": "..."} marks a failure)
+- Otherwise every item in the batch shares the request's outcome
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# send(workflow_name, payloads) -> (success, response_data, error)
+SendFunc = Callable[[str, List[Dict[str, Any]]], Awaitable[Tuple[bool, Any, Optional[str]]]]
+
+class WebhookBatcher:
+    """Size/time triggered batching of webhook payloads per workflow"""
+
+    def __init__(self, send: SendFunc, max_size: int = 50, max_delay: float = 0.5):
+        self._send = send
+        self.max_size = max(1, max_size)
+        self.max_delay = max_delay
+        self._pending: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, workflow_name: str, payload: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Queue one payload and wait for its batch to be sent.
+
+        Returns:
+            Tuple of (success: bool, error: str | None) for this payload
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self._pending.setdefault(workflow_name, [])
+        queue.append((payload, future))
+
+        if len(queue) >= self.max_size:
+            self._start_flush(workflow_name)
+        elif workflow_name not in self._timers:
+            self._timers[workflow_name] = asyncio.create_task(
+                self._flush_after_delay(workflow_name)
+            )
+
+        return await future
+
+    async def flush_all(self):
+        """Send everything still queued (called on shutdown)"""
+        for workflow_name in list(self._pending):
+            self._start_flush(workflow_name)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _flush_after_delay(self, workflow_name: str):
+        await asyncio.sleep(self.max_delay)
+        self._timers.pop(workflow_name, None)
+        self._start_flush(workflow_name)
+
+    def _start_flush(self, workflow_name: str):
+        timer = self._timers.pop(workflow_name, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        batch = self._pending.pop(workflow_name, [])
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._flush(workflow_name, batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, workflow_name: str, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        payloads = [payload for payload, _ in batch]
+
+        try:
+            success, data, error = await self._send(workflow_name, payloads)
+        except Exception as e:
+            success, data, error = False, None, f"Unexpected error: {str(e)}"
+
+        per_item = isinstance(data, list) and len(data) == len(batch)
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+
+            if not success:
+                future.set_result((False, error))
+            elif per_item and isinstance(data[index], dict) and data[index].get("success") is False:
+                future.set_result((False, data[index].get("error") or "Rejected by n8n"))
+            else:
+                future.set_result((True, None))
@@ -0,0 +1,138 @@
+"""
+Agent Worker - Runs agent jobs outside the web process
+
+Usage:
+    python -m app.worker [--processes N]
+
+Starts WORKER_PROCESSES child processes, each with its own event loop,
+database pool and n8n client. Child N runs a JobRunner for partition N:
+it claims jobs queued for that partition (plus unpartitioned ones), and
+partitionable agents only touch leads whose id % N equals its index, so
+the processes never contend for the same rows.
+
+The parent supervises the children and restarts any that exit
+unexpectedly. SIGTERM / SIGINT stop all children; jobs interrupted
+mid-run are re-queued by the reaper once their heartbeat goes stale.
+
+Set RUN_WORKERS_IN_WEB=false on the web service when this runs, so jobs
+are split into one per partition and the API only enqueues.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+RESTART_DELAY = 5.0  # Seconds before restarting a crashed child
+
+async def _create_tables():
+    import app.models  # noqa: F401  Register tables on Base.metadata
+    from app.database import engine, Base, create_missing_columns, create_missing_indexes
+    from app.jobs.backfill_website_keys import ensure_website_key_index
+    from app.services.lead_search import create_search_index
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+        await conn.run_sync(create_search_index)
+    # Discovery's ON CONFLICT (website_key) needs the unique index
+    await ensure_website_key_index()
+    await engine.dispose()
+
+async def _serve(partition: int):
+    from app.database import engine
+    from app.services import n8n_bridge, pipeline
+    from app.services.event_bus import event_bus
+    from app.services.job_runner import JobRunner
+
+    runner = JobRunner(partition=partition)
+    pipeline.register(runner=runner)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await n8n_bridge.start()
+    await runner.start()
+    logger.info("Worker partition %d started", partition)
+
+    try:
+        await stop.wait()
+    finally:
+        await runner.stop()
+        await event_bus.flush_all()
+        await n8n_bridge.aclose()
+        await engine.dispose()
+        logger.info("Worker partition %d stopped", partition)
+
+def _child_main(partition: int):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [p{partition}] %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_serve(partition))
+
+def main():
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Run agent job workers")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [supervisor] %(levelname)s %(name)s: %(message)s")
+
+    if args.processes != settings.worker_processes:
+        # Partitions are assigned when jobs are enqueued, so the web service must agree
+        logger.warning(
+            "--processes=%d differs from WORKER_PROCESSES=%d; jobs enqueued for other partitions will not be claimed",
+            args.processes, settings.worker_processes
+        )
+
+    # Once, before the children start, so they don't race on CREATE TABLE
+    asyncio.run(_create_tables())
+
+    # Fresh interpreters: no event loop or pooled connections inherited from the parent
+    context = multiprocessing.get_context("spawn")
+    children: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start_child(partition: int):
+        process = context.Process(target=_child_main, args=(partition,), name=f"agent-worker-{partition}")
+        process.start()
+        children[partition] = process
+        logger.info("Started worker partition %d (pid %d)", partition, process.pid)
+
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    for partition in range(max(1, args.processes)):
+        start_child(partition)
+
+    while not stopping:
+        time.sleep(1.0)
+        for partition, process in list(children.items()):
+            if not process.is_alive() and not stopping:
+                logger.warning(
+                    "Worker partition %d exited with code %s, restarting in %.0fs",
+                    partition, process.exitcode, RESTART_DELAY
+                )
+                time.sleep(RESTART_DELAY)
+                start_child(partition)
+
+    logger.info("Stopping %d workers", len(children))
+    for process in children.values():
+        if process.is_alive():
+            process.terminate()
+    for process in children.values():
+        process.join(timeout=30)
+        if process.is_alive():
+            process.kill()
+
+if __name__ == "__main__":
+    main()
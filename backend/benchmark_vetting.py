@@ -0,0 +1,148 @@
+"""
+Benchmark VettingAgent's rule engine against the old per-row loop
+
+This script:
+1. Seeds a scratch SQLite database with 100k pending leads
+2. Vets them with the original load-everything, per-row Python loop
+3. Resets them to pending and vets them with VettingAgent's compiled rules
+4. Prints both timings and checks that the verdicts match
+
+Usage:
+    python benchmark_vetting.py [--leads 100000] [--regex-rule]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+
+# Must be set before app.database is imported
+DB_PATH = os.path.join(tempfile.gettempdir(), "mak_os_benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from sqlalchemy import func, insert, select, update
+from app.agents import VettingAgent
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import Lead
+from app.services.vetting_rules import DEFAULT_RULES
+
+# Python-only rule, exercises the batch predicate path
+REGEX_RULE = {"field": "company_name", "operator": "not_matches", "threshold": r"(?i)\btest\b", "reason": "Test entry"}
+
+def random_lead(rng: random.Random) -> dict:
+    name_length = rng.choice([1, 2, 5, 8, 12, 20])
+    name = "".join(rng.choices(string.ascii_letters + " ", k=name_length))
+    if rng.random() < 0.02:
+        name += " test"
+    website = rng.choice([None, "", "x.io", f"https://{name.strip().replace(' ', '')}.com"])
+    return {
+        "company_name": name,
+        "website": website,
+        "region": rng.choice(["UAE", "UK", "US", None]),
+        "status": "new",
+        "vetting_status": "pending"
+    }
+
+async def seed(count: int):
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(42)
+    async with AsyncSessionLocal() as db:
+        for start in range(0, count, 10_000):
+            rows = [random_lead(rng) for _ in range(min(10_000, count - start))]
+            await db.execute(insert(Lead), rows)
+        await db.commit()
+
+async def reset():
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Lead).values(vetting_status="pending", status="new", pain_points=None)
+        )
+        await db.commit()
+
+async def legacy_vetting(regex_rule: bool) -> dict:
+    """The original VettingAgent.execute loop"""
+    pattern = re.compile(REGEX_RULE["threshold"]) if regex_rule else None
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Lead).where(Lead.vetting_status == "pending")
+        )
+        pending_leads = result.scalars().all()
+
+        approved_count = 0
+        rejected_count = 0
+
+        for lead in pending_leads:
+            rejection_reason = None
+
+            if not lead.website or len(lead.website) < 4:
+                rejection_reason = "No valid website"
+            elif not lead.company_name or len(lead.company_name) < 3:
+                rejection_reason = "Invalid company name"
+            elif pattern and pattern.search(lead.company_name):
+                rejection_reason = REGEX_RULE["reason"]
+
+            if rejection_reason:
+                lead.vetting_status = "rejected"
+                lead.pain_points = {"rejection_reason": rejection_reason}
+                lead.status = "rejected"
+                rejected_count += 1
+            else:
+                lead.vetting_status = "approved"
+                lead.status = "vetted"
+                approved_count += 1
+
+        await db.commit()
+
+    return {"approved": approved_count, "rejected": rejected_count}
+
+async def verdicts() -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Lead.vetting_status, func.count()).group_by(Lead.vetting_status)
+        )
+        return dict(result.all())
+
+async def benchmark(count: int, regex_rule: bool):
+    print(f"🌱 Seeding {count:,} pending leads into {DB_PATH}...")
+    await seed(count)
+
+    print("\n⏱️  Legacy per-row loop")
+    start = time.perf_counter()
+    legacy = await legacy_vetting(regex_rule)
+    legacy_time = time.perf_counter() - start
+    legacy_verdicts = await verdicts()
+    print(f"   {legacy_time:.2f}s  {legacy}")
+
+    await reset()
+
+    rules = DEFAULT_RULES + ([REGEX_RULE] if regex_rule else [])
+    print("\n⏱️  Compiled rule engine (VettingAgent)")
+    start = time.perf_counter()
+    result = await VettingAgent().execute({"rules": rules})
+    engine_time = time.perf_counter() - start
+    engine_verdicts = await verdicts()
+    print(f"   {engine_time:.2f}s  {result.metadata}")
+
+    print("\n" + "=" * 60)
+    print(f"Speedup: {legacy_time / engine_time:.1f}x")
+    if legacy_verdicts == engine_verdicts:
+        print("✅ Verdicts match")
+    else:
+        print(f"❌ Verdicts differ: {legacy_verdicts} vs {engine_verdicts}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--regex-rule", action="store_true", help="Add a Python-only regex rule")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.leads, args.regex_rule))
@@ -0,0 +1,68 @@
+"""
+Tests for ETags and 304s on the list endpoints
+
+Runs against a throwaway SQLite database:
+    python test_conditional_get.py
+or with pytest:
+    pytest test_conditional_get.py
+"""
+import os
+import tempfile
+import uuid
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_conditional_get.db')}"
+os.environ["RUN_WORKERS_IN_WEB"] = "false"
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+def _add_lead(client: TestClient) -> dict:
+    name = uuid.uuid4().hex[:12]
+    response = client.post("/api/leads/", json={"company_name": name, "website": f"{name}.com"})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def test_unchanged_list_is_not_modified():
+    with TestClient(app) as client:
+        _add_lead(client)
+        first = client.get("/api/leads")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        again = client.get("/api/leads", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+
+        # Other query strings have their own ETag
+        assert client.get("/api/leads?limit=1").headers["etag"] != etag
+
+def test_write_changes_the_etag():
+    with TestClient(app) as client:
+        etag = client.get("/api/leads").headers["etag"]
+        _add_lead(client)
+        response = client.get("/api/leads", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+def test_stats_body_follows_its_etag():
+    """The stats cache must not serve the previous body under a new ETag"""
+    with TestClient(app) as client:
+        before = client.get("/api/leads/stats")
+        _add_lead(client)
+
+        # Within the stats cache TTL
+        after = client.get("/api/leads/stats", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert after.json()["total"] == before.json()["total"] + 1
+
+        pinned = client.get("/api/leads/stats", headers={"If-None-Match": after.headers["etag"]})
+        assert pinned.status_code == 304
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
@@ -0,0 +1,125 @@
+"""
+Tests for website deduplication: normalize_website, DiscoveryAgent batches
+and the website_key backfill job
+
+Runs against a throwaway SQLite database:
+    python test_dedup.py
+or with pytest:
+    pytest test_dedup.py
+"""
+import asyncio
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_dedup.db')}"
+
+from sqlalchemy import delete, insert, select, text
+from app.agents import DiscoveryAgent
+from app.agents import discovery as discovery_module
+from app.database import AsyncSessionLocal, Base, engine
+from app.jobs import backfill_website_keys
+from app.jobs.reconcile_lead_counters import run as reconcile
+from app.models import Lead, LeadCounter, OutreachDraft, Project
+from app.config import settings
+from app.services.dedup import normalize_website
+from app.services.event_bus import EventBus
+
+async def _reset():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        for model in (OutreachDraft, Project, Lead, LeadCounter):
+            await db.execute(delete(model))
+        await db.commit()
+
+async def _leads():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Lead).order_by(Lead.id))).scalars().all()
+
+def test_normalize_website():
+    for website in ("https://Foo.com/", "http://www.foo.com", "FOO.com", " foo.com:443 ", "https://user@foo.com/?q=1#top"):
+        assert normalize_website(website) == "foo.com", website
+    assert normalize_website("http://www.foo.com/Menu/") == "foo.com/menu"
+    assert normalize_website("foo.com:8080") == "foo.com:8080"
+    for website in (None, "", "   ", "http://", "https://www./"):
+        assert normalize_website(website) is None, website
+
+def test_discovery_collapses_batch_and_existing_duplicates():
+    async def scenario():
+        await _reset()
+        first = await DiscoveryAgent().run({"leads": [
+            {"company_name": "Foo", "website": "https://foo.com", "region": "UAE"},
+            {"company_name": "Foo Again", "website": "http://www.FOO.com/"},
+            {"company_name": "Bar", "website": "bar.com"},
+            {"company_name": "No Site"},
+        ]})
+        assert first.metadata["new_leads"] == 3 and first.metadata["duplicates_skipped"] == 1
+
+        second = await DiscoveryAgent().run({"leads": [
+            {"company_name": "Bar Repeat", "website": "https://bar.com/"},
+            {"company_name": "Baz", "website": "baz.com"},
+        ]})
+        assert second.metadata == {
+            "new_leads": 1, "duplicates_skipped": 1, "near_duplicates_flagged": 0, "total_received": 2
+        }
+
+        leads = await _leads()
+        assert [(lead.company_name, lead.website_key) for lead in leads] == [
+            ("Foo", "foo.com"), ("Bar", "bar.com"), ("No Site", None), ("Baz", "baz.com")
+        ]
+        assert (await reconcile(dry_run=True))["drifted_keys"] == 0
+
+    # Website dedup only, and no pipeline vetting the new leads meanwhile
+    event_bus, fuzzy = discovery_module.event_bus, settings.fuzzy_dedup_enabled
+    discovery_module.event_bus, settings.fuzzy_dedup_enabled = EventBus(), False
+    try:
+        asyncio.run(scenario())
+    finally:
+        discovery_module.event_bus, settings.fuzzy_dedup_enabled = event_bus, fuzzy
+
+def test_backfill_merges_legacy_duplicates():
+    async def scenario():
+        await _reset()
+        # A database from before website_key: no unique index, no keys
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {backfill_website_keys.INDEX_NAME}"))
+            result = await conn.execute(insert(Lead.__table__).returning(Lead.id), [
+                {"company_name": name, "website": website, "region": region, "score": score,
+                 "status": "new", "vetting_status": "pending"}
+                for name, website, region, score in [
+                    ("Foo", "foo.com", None, 10),
+                    ("Bar", "bar.com", None, 0),
+                    ("Foo Dup", "https://www.foo.com/", "UAE", 40),
+                    ("Foo Dup 2", "FOO.COM", "KSA", 0),
+                ]
+            ])
+            foo, bar, foo_dup, _ = result.scalars().all()
+            await conn.execute(insert(Project.__table__), [{"lead_id": foo_dup, "stage": "build"}])
+        await reconcile()
+
+        summary = await backfill_website_keys.run(chunk_size=2)
+        assert summary["duplicate_groups"] == 1 and summary["leads_merged"] == 2
+
+        leads = await _leads()
+        assert [lead.id for lead in leads] == [foo, bar]
+        survivor = leads[0]
+        # The oldest lead survives and takes over what it lacked
+        assert (survivor.website_key, survivor.region, survivor.score) == ("foo.com", "UAE", 40)
+        async with AsyncSessionLocal() as db:
+            assert (await db.execute(select(Project.lead_id))).scalars().all() == [foo]
+
+        async with engine.connect() as conn:
+            assert await conn.run_sync(backfill_website_keys.has_unique_index)
+        assert await backfill_website_keys.ensure_website_key_index() is None
+        assert (await reconcile(dry_run=True))["drifted_keys"] == 0
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
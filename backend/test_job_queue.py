@@ -0,0 +1,136 @@
+"""
+Tests for the agent job queue and runner
+
+Runs against a throwaway SQLite database:
+    python test_job_queue.py
+or with pytest:
+    pytest test_job_queue.py
+"""
+import asyncio
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_job_queue.db')}"
+
+from sqlalchemy import delete
+from app.agents import AGENTS, AgentResult
+from app.config import settings
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import AgentJob
+from app.services import job_queue
+from app.services.job_runner import JobRunner
+
+async def _reset():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AgentJob))
+        await db.commit()
+
+async def _enqueue(agent_name: str = "vetting") -> int:
+    async with AsyncSessionLocal() as db:
+        job, = await job_queue.enqueue(db, agent_name)
+        await db.commit()
+        return job.id
+
+async def _job(job_id: int) -> AgentJob:
+    async with AsyncSessionLocal() as db:
+        return await db.get(AgentJob, job_id)
+
+async def _take_over(agent_name: str, worker_id: str) -> AgentJob:
+    """Re-queue every running job as stale and claim it again"""
+    assert await job_queue.requeue_stale(stale_after=-1) > 0
+    return await job_queue.claim(agent_name, worker_id)
+
+def test_claim_marks_running():
+    async def scenario():
+        await _reset()
+        job_id = await _enqueue()
+        job = await job_queue.claim("vetting", "a")
+        assert job.id == job_id and job.status == "running" and job.attempts == 1
+        assert await job_queue.claim("vetting", "b") is None
+        assert await job_queue.heartbeat(job_id, "a")
+        assert not await job_queue.heartbeat(job_id, "b")
+
+    asyncio.run(scenario())
+
+def test_taken_over_job_keeps_new_owners_outcome():
+    async def scenario():
+        await _reset()
+        job_id = await _enqueue()
+        await job_queue.claim("vetting", "a")
+        taken = await _take_over("vetting", "b")
+        assert taken.id == job_id and taken.attempts == 2
+
+        # The first worker finishes late: nothing may change
+        assert not await job_queue.complete(job_id, "a", {"status": "success"})
+        assert not await job_queue.fail(job_id, "a", "boom")
+        assert not await job_queue.heartbeat(job_id, "a")
+        job = await _job(job_id)
+        assert (job.status, job.worker_id, job.attempts, job.result) == ("running", "b", 2, None)
+
+        assert await job_queue.complete(job_id, "b", {"status": "success"})
+        job = await _job(job_id)
+        assert job.status == "completed" and job.result == {"status": "success"}
+
+    asyncio.run(scenario())
+
+def test_fail_requeues_until_attempts_run_out():
+    async def scenario():
+        await _reset()
+        job_id = await _enqueue()
+        for attempt in range(1, settings.agent_job_max_attempts + 1):
+            assert (await job_queue.claim("vetting", "a")).attempts == attempt
+            assert await job_queue.fail(job_id, "a", "boom")
+        job = await _job(job_id)
+        assert job.status == "failed" and job.finished_at is not None
+        assert await job_queue.claim("vetting", "a") is None
+
+    asyncio.run(scenario())
+
+class _SlowAgent:
+    """Stands in for an agent whose run outlives its job"""
+    cancelled = False
+
+    def __init__(self):
+        self._log_id = None
+
+    async def run(self, context=None) -> AgentResult:
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            _SlowAgent.cancelled = True
+            raise
+        return AgentResult(status="success", leads_processed=0)
+
+def test_runner_cancels_run_when_job_is_taken_away():
+    async def scenario():
+        await _reset()
+        AGENTS["slow"] = _SlowAgent
+        interval = settings.agent_job_heartbeat_interval
+        settings.agent_job_heartbeat_interval = 0.05
+        try:
+            job_id = await _enqueue("slow")
+            job = await job_queue.claim("slow", "a")
+            running = asyncio.create_task(JobRunner({})._run_job(job, "a"))
+            await asyncio.sleep(0.1)
+            await _take_over("slow", "b")
+
+            await asyncio.wait_for(running, timeout=5)
+            assert _SlowAgent.cancelled
+            job = await _job(job_id)
+            assert (job.status, job.worker_id) == ("running", "b")
+        finally:
+            settings.agent_job_heartbeat_interval = interval
+            del AGENTS["slow"]
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
@@ -0,0 +1,131 @@
+"""
+Tests for the lead change feed (GET /api/leads/changes) and its pruning
+
+Runs against a throwaway SQLite database:
+    python test_lead_changes.py
+or with pytest:
+    pytest test_lead_changes.py
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_lead_changes.db')}"
+os.environ["RUN_WORKERS_IN_WEB"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from app.database import AsyncSessionLocal
+from app.jobs.prune_lead_changes import run as prune
+from app.main import app
+from app.models import ChangeCommit, LeadTombstone
+
+def _create(client: TestClient, name: str) -> int:
+    response = client.post("/api/leads/", json={"company_name": name, "website": f"{name.lower()}.com"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+def _cursor(client: TestClient) -> str:
+    return client.get("/api/leads/changes").json()["cursor"]
+
+def _sync(client: TestClient, cursor: str, limit: int = 100):
+    """Follow the feed from `cursor` to the end: ({id: company_name}, deleted ids, pages, cursor)"""
+    changed, deleted, pages = {}, set(), 0
+    while True:
+        response = client.get("/api/leads/changes", params={"since": cursor, "limit": limit})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages += 1
+        for lead in page["changes"]:
+            changed[lead["id"]] = lead["company_name"]
+            deleted.discard(lead["id"])
+        for lead_id in page["deleted"]:
+            changed.pop(lead_id, None)
+            deleted.add(lead_id)
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return changed, deleted, pages, cursor
+
+def _age_history(days: int):
+    """Pretend every change recorded so far was committed `days` ago"""
+    async def age():
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ChangeCommit)
+                .values(committed_at=datetime.now(timezone.utc) - timedelta(days=days))
+            )
+            await db.commit()
+    return age
+
+def test_changes_and_tombstones():
+    with TestClient(app) as client:
+        kept, dropped, bulk = _create(client, "Kept"), _create(client, "Dropped"), _create(client, "Bulk")
+        cursor = _cursor(client)
+
+        # Created first: SQLite hands a deleted highest id out again
+        added = _create(client, "Added")
+        assert client.patch(f"/api/leads/{kept}", json={"company_name": "Kept Renamed"}).status_code == 200
+        assert client.delete(f"/api/leads/{dropped}").status_code == 204
+        assert client.request("DELETE", "/api/leads/", json={"ids": [bulk]}).status_code == 200
+
+        changed, deleted, _, cursor = _sync(client, cursor)
+        assert changed == {kept: "Kept Renamed", added: "Added"}
+        assert deleted == {dropped, bulk}
+
+        # Nothing new since
+        assert _sync(client, cursor)[:2] == ({}, set())
+
+def test_pages_split_inside_one_commit():
+    with TestClient(app) as client:
+        cursor = _cursor(client)
+        leads = [{"company_name": f"Page {i}", "website": f"page{i}.com"} for i in range(7)]
+        ids = client.post("/api/leads/bulk", json=leads).json()["ids"]
+
+        changed, _, pages, _ = _sync(client, cursor, limit=3)
+        assert set(changed) == set(ids)
+        assert pages == 3
+
+def test_pruned_cursor_must_resync():
+    with TestClient(app) as client:
+        old_cursor = _cursor(client)
+        _create(client, "Old")
+        dropped = _create(client, "Gone")
+        assert client.delete(f"/api/leads/{dropped}").status_code == 204
+        client.portal.call(_age_history(40))
+        middle_cursor = _cursor(client)
+        recent = _create(client, "Recent")
+
+        assert client.portal.call(prune, True)["pruned"] is False
+        summary = client.portal.call(prune)
+        assert summary["change_commits"] >= 3 and summary["lead_tombstones"] >= 1
+
+        async def leftovers():
+            async with AsyncSessionLocal() as db:
+                return (
+                    len((await db.execute(select(ChangeCommit.token))).all()),
+                    len((await db.execute(select(LeadTombstone.lead_id))).all()),
+                )
+        assert client.portal.call(leftovers) == (1, 0)
+
+        response = client.get("/api/leads/changes", params={"since": old_cursor})
+        assert response.status_code == 410
+
+        # A cursor taken at the horizon still syncs
+        changed, deleted, _, _ = _sync(client, middle_cursor)
+        assert changed == {recent: "Recent"} and deleted == set()
+
+        # Streams get a resync event instead
+        with client.stream(
+            "GET", "/api/leads/changes", params={"since": old_cursor}, headers={"Accept": "text/event-stream"}
+        ) as response:
+            body = "".join(response.iter_text())
+        assert "event: resync" in body
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
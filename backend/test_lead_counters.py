@@ -0,0 +1,107 @@
+"""
+Tests for lead_counters upkeep by single and bulk lead writes
+
+Runs against a throwaway SQLite database:
+    python test_lead_counters.py
+or with pytest:
+    pytest test_lead_counters.py
+"""
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_lead_counters.db')}"
+os.environ["RUN_WORKERS_IN_WEB"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from app.database import AsyncSessionLocal
+from app.jobs.reconcile_lead_counters import run as reconcile
+from app.main import app
+from app.models import Lead, LeadCounter, OutreachDraft, Project
+
+def _reset(client: TestClient):
+    async def clear():
+        async with AsyncSessionLocal() as db:
+            for model in (OutreachDraft, Project, Lead, LeadCounter):
+                await db.execute(delete(model))
+            await db.commit()
+    client.portal.call(clear)
+
+def _summary(client: TestClient):
+    response = client.get("/api/leads/summary")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _assert_no_drift(client: TestClient):
+    assert client.portal.call(reconcile, True)["drifted_keys"] == 0
+
+def test_single_lead_writes():
+    with TestClient(app) as client:
+        _reset(client)
+        ids = [
+            client.post("/api/leads/", json={"company_name": f"Lead {i}", "website": f"lead{i}.com", "region": "UAE"}).json()["id"]
+            for i in range(3)
+        ]
+        assert client.patch(f"/api/leads/{ids[0]}", json={"status": "contacted"}).status_code == 200
+        assert client.patch(f"/api/leads/{ids[1]}", json={"region": "KSA"}).status_code == 200
+        assert client.delete(f"/api/leads/{ids[2]}").status_code == 204
+
+        summary = _summary(client)
+        assert summary["total"] == 2
+        assert summary["by_status"] == {"contacted": 1, "new": 1}
+        assert summary["by_region"] == {"KSA": 1, "UAE": 1}
+        _assert_no_drift(client)
+
+def test_bulk_writes():
+    with TestClient(app) as client:
+        _reset(client)
+        leads = [
+            {"company_name": f"Bulk {i}", "website": f"bulk{i}.com", "region": "UAE" if i % 2 else None}
+            for i in range(10)
+        ]
+        ids = client.post("/api/leads/bulk", json=leads).json()["ids"]
+        assert _summary(client)["by_region"] == {"UAE": 5, "unknown": 5}
+
+        response = client.patch("/api/leads/", json={"filter": {"region": "UAE"}, "changes": {"status": "vetted"}})
+        assert response.status_code == 200, response.text
+        response = client.patch("/api/leads/", json={"ids": ids[:2], "changes": {"region": None}})
+        assert response.status_code == 200, response.text
+        _assert_no_drift(client)
+
+        # Projects of deleted leads go with them
+        project = client.post("/api/projects/", json={"lead_id": ids[1]}).json()["id"]
+        response = client.request("DELETE", "/api/leads/", json={"filter": {"status": "vetted"}})
+        assert response.status_code == 200, response.text
+        assert response.json()["deleted"] == 5 and response.json()["projects_deleted"] == 1
+        assert client.get(f"/api/projects/{project}").status_code == 404
+
+        summary = _summary(client)
+        assert summary["total"] == 5
+        assert summary["by_status"] == {"new": 5}
+        _assert_no_drift(client)
+
+def test_reconcile_repairs_drift():
+    with TestClient(app) as client:
+        _reset(client)
+        client.post("/api/leads/bulk", json=[{"company_name": "Drift Co", "website": "drift.com"}])
+
+        async def drift():
+            async with AsyncSessionLocal() as db:
+                counter = (await db.execute(select(LeadCounter))).scalar_one()
+                counter.count = 7
+                await db.commit()
+        client.portal.call(drift)
+
+        report = client.portal.call(reconcile)
+        assert report["drifted_keys"] == 1 and report["drift"][0]["stored"] == 7
+        assert _summary(client)["total"] == 1
+        _assert_no_drift(client)
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
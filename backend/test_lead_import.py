@@ -0,0 +1,134 @@
+"""
+Tests for streaming lead imports (POST /api/leads/imports) and resume
+
+Runs against a throwaway SQLite database:
+    python test_lead_import.py
+or with pytest:
+    pytest test_lead_import.py
+"""
+import asyncio
+import json
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_lead_import.db')}"
+os.environ["RUN_WORKERS_IN_WEB"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Lead
+from app.services import lead_import
+from app.services.lead_import import parse_csv, parse_ndjson
+
+async def _chunks(data: bytes, size: int = 7):
+    # Small chunks split lines, quoted fields and UTF-8 sequences
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+async def _parse(parse, data: bytes):
+    return [row async for row in parse(_chunks(data))]
+
+def _reset(client: TestClient):
+    async def clear():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Lead))
+            await db.commit()
+    client.portal.call(clear)
+
+def _names(client: TestClient):
+    async def names():
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(Lead.company_name).order_by(Lead.id))).scalars().all()
+    return client.portal.call(names)
+
+def test_parse_csv():
+    data = (
+        "﻿company_name,website,notes\r\n"
+        "Café One,one.com,\"multi\nline, quoted\"\r\n"
+        "\r\n"
+        "Two,,\n"
+        "Short row\n"
+    ).encode()
+    assert asyncio.run(_parse(parse_csv, data)) == [
+        {"company_name": "Café One", "website": "one.com", "notes": "multi\nline, quoted"},
+        {"company_name": "Two", "website": None, "notes": None},
+        "Expected 3 columns, got 1",
+    ]
+    assert asyncio.run(_parse(parse_csv, b'company_name\n"open')) == ["Unterminated quoted field at end of input"]
+
+def test_parse_ndjson():
+    rows = asyncio.run(_parse(parse_ndjson, b'{"company_name": "A"}\n\n[1]\n{oops\n{"company_name": "B"}'))
+    assert rows[0] == {"company_name": "A"} and rows[3] == {"company_name": "B"}
+    assert rows[1] == "Expected a JSON object" and rows[2].startswith("Invalid JSON")
+
+def test_import_answers_before_processing():
+    with TestClient(app) as client:
+        _reset(client)
+        body = "\n".join(json.dumps(row) for row in [
+            {"company_name": "First", "website": "first.com"},
+            {"company_name": "Again", "website": "https://www.first.com/"},
+            {"website": "nameless.com"},
+            {"company_name": "Second", "website": "second.com"},
+        ])
+        response = client.post("/api/leads/imports", params={"filename": "leads.ndjson"}, content=body)
+        assert response.status_code == 202, response.text
+        assert response.json()["status"] == "running" and response.json()["rows_read"] == 0
+        location = response.headers["location"]
+        assert location == f"/api/leads/imports/{response.json()['id']}"
+
+        # TestClient runs the background import before returning
+        result = client.get(location).json()
+        assert result["status"] == "completed"
+        assert (result["rows_read"], result["inserted"], result["skipped"], result["failed"]) == (4, 2, 1, 1)
+        assert [error["index"] for error in result["errors"]] == [1, 2]
+        assert _names(client) == ["First", "Second"]
+
+def test_resume_continues_with_the_failed_chunk():
+    chunk_size = settings.lead_import_chunk_size
+    insert_leads = lead_import.insert_leads
+
+    async def failing_insert_leads(db, rows):
+        if any(index == 4 for index, _ in rows):
+            raise RuntimeError("database went away")
+        return await insert_leads(db, rows)
+
+    with TestClient(app) as client:
+        _reset(client)
+        body = "company_name,website\n" + "".join(f"Lead {i},lead{i}.com\n" for i in range(7))
+        settings.lead_import_chunk_size = 3
+        lead_import.insert_leads = failing_insert_leads
+        try:
+            import_id = client.post("/api/leads/imports", params={"format": "csv"}, content=body).json()["id"]
+        finally:
+            lead_import.insert_leads = insert_leads
+
+        try:
+            failed = client.get(f"/api/leads/imports/{import_id}").json()
+            assert failed["status"] == "failed" and failed["rows_read"] == 3
+            assert "row 3" in failed["error_message"]
+            assert _names(client) == [f"Lead {i}" for i in range(3)]
+
+            response = client.post(f"/api/leads/imports/{import_id}/resume", content=body)
+            assert response.status_code == 202, response.text
+            resumed = client.get(response.headers["location"]).json()
+            assert resumed["status"] == "completed"
+            assert (resumed["rows_read"], resumed["inserted"], resumed["skipped"]) == (7, 7, 0)
+            assert _names(client) == [f"Lead {i}" for i in range(7)]
+
+            # Only failed imports can be resumed
+            assert client.post(f"/api/leads/imports/{import_id}/resume", content=body).status_code == 409
+            assert client.post("/api/leads/imports/999999/resume", content=body).status_code == 404
+        finally:
+            settings.lead_import_chunk_size = chunk_size
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
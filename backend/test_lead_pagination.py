@@ -0,0 +1,122 @@
+"""
+Tests for keyset pagination of GET /api/leads
+
+Runs against a throwaway SQLite database:
+    python test_lead_pagination.py
+or with pytest:
+    pytest test_lead_pagination.py
+"""
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_lead_pagination.db')}"
+os.environ["RUN_WORKERS_IN_WEB"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Lead
+from app.services.pagination import decode_cursor, encode_cursor, estimate_count
+
+def _seed(client: TestClient, count: int = 25):
+    """`count` leads with scores 0, 10, 20, ... and every fifth score NULL"""
+    async def clear():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Lead))
+            await db.commit()
+    client.portal.call(clear)
+
+    leads = [
+        {"company_name": f"Lead {i}", "website": f"lead{i}.com", "region": "UAE" if i % 2 else "KSA"}
+        for i in range(count)
+    ]
+    ids = client.post("/api/leads/bulk", json=leads).json()["ids"]
+
+    async def set_scores():
+        async with AsyncSessionLocal() as db:
+            for n, lead_id in enumerate(ids):
+                score = None if n % 5 == 0 else (n * 10) % 100
+                await db.execute(update(Lead).where(Lead.id == lead_id).values(score=score))
+            await db.commit()
+    client.portal.call(set_scores)
+    return ids
+
+def _all_pages(client: TestClient, **params):
+    leads, pages, cursor = [], 0, None
+    while True:
+        response = client.get("/api/leads", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        leads += response.json()
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return leads, pages
+
+def _score_key(lead):
+    # NULL scores sort as -1, below every real score
+    return lead["score"] if lead["score"] is not None else -1
+
+def test_cursor_round_trip():
+    data = {"sort": "score", "order": "desc", "value": None, "id": 7}
+    assert decode_cursor(encode_cursor(data)) == data
+    for bad in ("", "not base64!", encode_cursor({"x": 1})[:-2] + "@@"):
+        try:
+            decode_cursor(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} decoded")
+
+def test_score_pages_include_null_scores():
+    with TestClient(app) as client:
+        ids = _seed(client)
+        for order in ("asc", "desc"):
+            leads, pages = _all_pages(client, sort="score", order=order, limit=4)
+            assert sorted(lead["id"] for lead in leads) == sorted(ids)
+            assert pages == 7
+
+            keys = [(_score_key(lead), lead["id"]) for lead in leads]
+            assert keys == sorted(keys, reverse=order == "desc")
+            assert sum(lead["score"] is None for lead in leads) == 5
+
+def test_created_at_pages_with_filters():
+    with TestClient(app) as client:
+        ids = _seed(client)
+        leads, _ = _all_pages(client, limit=3, region="UAE")
+        assert [lead["id"] for lead in leads] == sorted((i for n, i in enumerate(ids) if n % 2), reverse=True)
+
+        leads, _ = _all_pages(client, limit=3, min_score=50)
+        assert {lead["id"] for lead in leads} == {i for n, i in enumerate(ids) if n % 5 and (n * 10) % 100 >= 50}
+
+def test_cursor_must_match_the_sort():
+    with TestClient(app) as client:
+        _seed(client)
+        cursor = client.get("/api/leads", params={"limit": 2}).headers["x-next-cursor"]
+        assert client.get("/api/leads", params={"cursor": cursor, "sort": "score"}).status_code == 400
+        assert client.get("/api/leads", params={"cursor": "garbage"}).status_code == 400
+
+def test_estimate_flags_capped_counts():
+    with TestClient(app) as client:
+        _seed(client)
+
+        async def estimates():
+            async with AsyncSessionLocal() as db:
+                uae = [Lead.region == "UAE"]
+                return (
+                    await estimate_count(db, Lead.__table__, uae, cap=5),
+                    await estimate_count(db, Lead.__table__, uae, cap=12),
+                )
+        assert client.portal.call(estimates) == ((5, True), (12, False))
+
+        response = client.get("/api/leads", params={"region": "UAE"})
+        assert response.headers["x-total-estimate"] == "12"
+        assert "x-total-estimate-capped" not in response.headers
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
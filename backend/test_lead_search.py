@@ -0,0 +1,103 @@
+"""
+Tests for full-text lead search
+
+Runs against a throwaway SQLite database:
+    python test_lead_search.py
+or with pytest:
+    pytest test_lead_search.py
+"""
+import asyncio
+import os
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_lead_search.db')}"
+
+from sqlalchemy import delete, insert
+from app.config import settings
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import Lead
+from app.services.lead_search import create_search_index, query_terms, search_leads
+
+async def _reset(rows):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_search_index)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Lead))
+        await db.execute(insert(Lead), [
+            {"status": "new", "vetting_status": "pending", "score": 0, **row} for row in rows
+        ])
+        await db.commit()
+
+async def _search(q, conditions=(), limit=20, position=None):
+    async with AsyncSessionLocal() as db:
+        return await search_leads(db, q, list(conditions), limit, position)
+
+def test_query_terms():
+    assert query_terms("Acme-Café, LLC!") == ["acme", "café", "llc"]
+    assert query_terms("  ...  ") == []
+
+def test_ranks_company_name_above_pain_points():
+    async def scenario():
+        await _reset([
+            {"company_name": "Blue Dental", "website": "blue.com", "region": "UAE",
+             "pain_points": {"issues": ["slow website"]}},
+            {"company_name": "Slow Motors", "website": "motors.com", "region": "KSA"},
+            {"company_name": "Red Bakery", "website": "red.com", "region": "UAE"},
+        ])
+        leads, position, truncated = await _search("slow")
+        assert [lead.company_name for lead in leads] == ["Slow Motors", "Blue Dental"]
+        assert position is None and not truncated
+
+        # Last word as a prefix, every word required
+        assert [lead.company_name for lead in (await _search("blue dent"))[0]] == ["Blue Dental"]
+        assert (await _search("blue motors"))[0] == []
+
+    asyncio.run(scenario())
+
+def test_filters_apply_before_the_candidate_cap():
+    async def scenario():
+        # The only KSA match is older than the newest LEAD_SEARCH_MAX_CANDIDATES matches
+        cap = settings.lead_search_max_candidates
+        settings.lead_search_max_candidates = 5
+        try:
+            await _reset(
+                [{"company_name": "Acme Old", "website": "old.com", "region": "KSA"}] +
+                [{"company_name": f"Acme {i}", "website": f"acme{i}.com", "region": "UAE"} for i in range(10)]
+            )
+            leads, _, truncated = await _search("acme", [Lead.region == "KSA"])
+            assert [lead.company_name for lead in leads] == ["Acme Old"]
+            assert not truncated
+
+            leads, _, truncated = await _search("acme")
+            assert len(leads) == 5 and truncated
+        finally:
+            settings.lead_search_max_candidates = cap
+
+    asyncio.run(scenario())
+
+def test_pages_cover_every_match_once():
+    async def scenario():
+        await _reset([
+            {"company_name": f"Acme {i}", "website": f"acme{i}.com", "region": "UAE" if i % 3 else "Qatar",
+             "pain_points": {"issues": ["acme"] * (i % 4)}}
+            for i in range(40)
+        ])
+        seen, position = [], None
+        while True:
+            leads, position, _ = await _search("acme", [Lead.region == "UAE"], limit=7, position=position)
+            seen += [lead.id for lead in leads]
+            if position is None:
+                break
+        assert len(seen) == len(set(seen)) == 26
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
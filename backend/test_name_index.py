@@ -0,0 +1,136 @@
+"""
+Tests for fuzzy company-name duplicate detection (NameIndex and DiscoveryAgent)
+
+Runs against a throwaway SQLite database:
+    python test_name_index.py
+or with pytest:
+    pytest test_name_index.py
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_name_index.db')}"
+
+from sqlalchemy import delete, select
+from app.agents import DiscoveryAgent
+from app.agents import discovery as discovery_module
+from app.config import settings
+from app.database import AsyncSessionLocal, Base, engine
+from app.jobs.reconcile_lead_counters import run as reconcile
+from app.models import Lead, LeadCounter
+from app.services.event_bus import EventBus
+from app.services.name_index import NameIndex, normalize_name
+
+async def _reset():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Lead))
+        await db.execute(delete(LeadCounter))
+        await db.commit()
+
+async def _discover(*leads):
+    result = await DiscoveryAgent().run({"leads": list(leads)})
+    assert result.status == "success", result.error_message
+    return result.metadata
+
+async def _duplicate_of():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Lead.company_name, Lead.duplicate_of).order_by(Lead.id))
+        return dict(result.all())
+
+async def _id(company_name: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Lead.id).where(Lead.company_name == company_name))).scalar_one()
+
+def _run(scenario):
+    """Run with fuzzy dedup on, a fresh index (as in a new process) and no pipeline"""
+    saved = discovery_module.name_index, discovery_module.event_bus, settings.fuzzy_dedup_enabled
+    discovery_module.name_index = NameIndex(threshold=settings.fuzzy_dedup_threshold)
+    discovery_module.event_bus = EventBus()
+    settings.fuzzy_dedup_enabled = True
+    try:
+        asyncio.run(scenario())
+    finally:
+        discovery_module.name_index, discovery_module.event_bus, settings.fuzzy_dedup_enabled = saved
+
+def test_index_matches_similar_names_per_region():
+    assert normalize_name("The Sakura Sushi Co. L.L.C.") == "sakura sushi"
+
+    index = NameIndex(threshold=0.8)
+    index.add(1, "Sakura Sushi", "UAE")
+    index.add(2, "Blue Dental Clinic", "UAE")
+    assert index.find("Sakura Sushi LLC", "uae")[0] == 1
+    assert index.find("Sakura Sushi", "KSA") is None
+    assert index.find("Sakura Grill", "UAE") is None
+
+    index.remove(1)
+    assert index.find("Sakura Sushi", "UAE") is None
+    assert len(index) == 1
+
+def test_lookups_stay_below_a_millisecond():
+    rng = random.Random(3)
+    words = ["sakura", "sushi", "blue", "dental", "gold", "star", "cafe", "motors", "royal", "palm",
+             "tower", "city", "green", "desert", "falcon", "pearl", "oasis", "crystal", "bakery", "clinic"]
+    names = [f"{' '.join(rng.sample(words, 3))} {i}" for i in range(20000)]
+    index = NameIndex(threshold=0.8)
+    for key, name in enumerate(names):
+        index.add(key, name, "UAE")
+
+    start = time.perf_counter()
+    for name in names[:2000]:
+        index.find(f"{name} LLC", "UAE")
+    assert (time.perf_counter() - start) / 2000 < 0.001
+
+def test_discovery_flags_near_duplicates():
+    async def scenario():
+        await _reset()
+        metadata = await _discover(
+            {"company_name": "Sakura Sushi", "website": "sakura.com", "region": "UAE"},
+            {"company_name": "Sakura Sushi Restaurant", "region": "KSA"},
+            {"company_name": "Sakura Sushi LLC", "region": "UAE"},
+            {"company_name": "Sakura Sushi Restaurant L.L.C.", "region": "KSA"},
+        )
+        assert metadata["new_leads"] == 4 and metadata["near_duplicates_flagged"] == 2
+
+        flags = await _duplicate_of()
+        assert flags["Sakura Sushi LLC"] == await _id("Sakura Sushi")
+        assert flags["Sakura Sushi Restaurant L.L.C."] == await _id("Sakura Sushi Restaurant")
+        assert flags["Sakura Sushi"] is None and flags["Sakura Sushi Restaurant"] is None
+        assert (await reconcile(dry_run=True))["drifted_keys"] == 0
+
+    _run(scenario)
+
+def test_index_follows_other_writers():
+    async def scenario():
+        await _reset()
+        await _discover({"company_name": "Gold Star Bakery", "region": "UAE"})
+
+        # Another process adds a lead and deletes the first one
+        async with AsyncSessionLocal() as db:
+            db.add(Lead(company_name="Palm Tower Dental", region="UAE"))
+            await db.delete(await db.get(Lead, await _id("Gold Star Bakery")))
+            await db.commit()
+
+        metadata = await _discover(
+            {"company_name": "Palm Tower Dental LLC", "region": "UAE"},
+            {"company_name": "Gold Star Bakery Co", "region": "UAE"},
+        )
+        assert metadata["near_duplicates_flagged"] == 1
+        flags = await _duplicate_of()
+        assert flags["Palm Tower Dental LLC"] == await _id("Palm Tower Dental")
+        assert flags["Gold Star Bakery Co"] is None
+
+    _run(scenario)
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
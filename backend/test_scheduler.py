@@ -0,0 +1,173 @@
+"""
+Tests for the agent scheduler and its cron expressions
+
+Runs against a throwaway SQLite database:
+    python test_scheduler.py
+or with pytest:
+    pytest test_scheduler.py
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_scheduler.db')}"
+
+from sqlalchemy import delete, select
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import AgentJob, AgentSchedule
+from app.services.cron import CronSchedule
+from app.services.scheduler import AgentScheduler, load_schedules, utc
+
+UTC = timezone.utc
+
+# --- cron ---
+
+def test_cron_weekday_range_skips_weekend():
+    cron = CronSchedule("*/15 9-17 * * 1-5")
+    # Saturday noon -> Monday 09:00
+    assert cron.next_after(datetime(2026, 10, 17, 12, 0)) == datetime(2026, 10, 19, 9, 0)
+    # Inside the window: next quarter hour
+    assert cron.next_after(datetime(2026, 10, 19, 9, 7)) == datetime(2026, 10, 19, 9, 15)
+
+def test_cron_is_strictly_after():
+    cron = CronSchedule("0 * * * *")
+    assert cron.next_after(datetime(2026, 1, 1, 10, 0)) == datetime(2026, 1, 1, 11, 0)
+    assert cron.next_after(datetime(2026, 1, 1, 10, 0, 30)) == datetime(2026, 1, 1, 11, 0)
+
+def test_cron_month_and_year_rollover():
+    assert CronSchedule("0 0 1 * *").next_after(datetime(2026, 12, 5)) == datetime(2027, 1, 1)
+    assert CronSchedule("30 2 29 2 *").next_after(datetime(2026, 1, 1)) == datetime(2028, 2, 29, 2, 30)
+
+def test_cron_sunday_is_0_and_7():
+    # 2026-10-18 is a Sunday
+    for expression in ("0 8 * * 0", "0 8 * * 7"):
+        assert CronSchedule(expression).next_after(datetime(2026, 10, 16)) == datetime(2026, 10, 18, 8, 0)
+
+def test_cron_day_fields_match_either():
+    # The 1st of the month or any Monday, as in standard cron
+    cron = CronSchedule("0 0 1 * 1")
+    assert cron.next_after(datetime(2026, 10, 17)) == datetime(2026, 10, 19)
+    assert cron.next_after(datetime(2026, 10, 27)) == datetime(2026, 11, 1)
+
+def test_cron_lists_and_steps():
+    cron = CronSchedule("5/20 0,12 * * *")
+    assert cron.next_after(datetime(2026, 1, 1, 0, 5)) == datetime(2026, 1, 1, 0, 25)
+    assert cron.next_after(datetime(2026, 1, 1, 0, 45)) == datetime(2026, 1, 1, 12, 5)
+
+def test_cron_keeps_timezone():
+    moment = datetime(2026, 1, 1, 10, 0, tzinfo=UTC)
+    assert CronSchedule("0 * * * *").next_after(moment) == datetime(2026, 1, 1, 11, 0, tzinfo=UTC)
+
+def test_cron_rejects_invalid_expressions():
+    for expression in ("* * *", "60 * * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"):
+        try:
+            CronSchedule(expression)
+        except ValueError:
+            continue
+        raise AssertionError(f"{expression!r} was accepted")
+
+def test_cron_never_matching_raises():
+    try:
+        CronSchedule("0 0 31 2 *").next_after(datetime(2026, 1, 1))
+    except ValueError:
+        return
+    raise AssertionError("February 31st matched")
+
+# --- scheduler ---
+
+def test_utc_normalizes_naive_and_aware():
+    naive = datetime(2026, 1, 1, 12, 0)
+    assert utc(naive) == datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+    plus_four = timezone(timedelta(hours=4))
+    assert utc(datetime(2026, 1, 1, 16, 0, tzinfo=plus_four)) == datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+
+async def _reset():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AgentSchedule))
+        await db.execute(delete(AgentJob))
+        await db.commit()
+
+async def _schedule_row() -> AgentSchedule:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(AgentSchedule))).scalar_one()
+
+def test_run_with_timezone_aware_rows():
+    """PostgreSQL hands back aware datetimes; _run must not mix them with naive ones"""
+    async def scenario():
+        await _reset()
+        scheduler = AgentScheduler({"vetting": {"interval": 60, "jitter": 0}})
+        scheduler.rules = load_schedules(scheduler.schedules)
+        rule = scheduler.rules[0]
+
+        slot = datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+        async with AsyncSessionLocal() as db:
+            db.add(AgentSchedule(agent_name="vetting", next_run_at=slot, start_after=slot, skipped_runs=0))
+            await db.commit()
+
+        now = slot + timedelta(seconds=5)
+        schedule = await scheduler._acquire(rule, now)
+        assert schedule is not None
+
+        # As asyncpg returns them for timestamptz columns
+        schedule.next_run_at = utc(schedule.next_run_at)
+        schedule.start_after = utc(schedule.start_after)
+
+        # datetime.utcnow() style: naive
+        job_ids = await scheduler._run(rule, schedule, now.replace(tzinfo=None))
+        assert len(job_ids) == 1
+
+        row = await _schedule_row()
+        assert utc(row.next_run_at) == now + timedelta(seconds=60)
+        assert row.lease_owner is None
+
+    asyncio.run(scenario())
+
+def test_tick_accepts_naive_and_aware_now():
+    async def scenario():
+        await _reset()
+        scheduler = AgentScheduler({"vetting": {"interval": 60, "jitter": 0}})
+        await scheduler.start()
+        await scheduler.stop()
+
+        row = await _schedule_row()
+        due = utc(row.start_after)
+        assert await scheduler.tick(due - timedelta(seconds=1)) == []
+        assert len(await scheduler.tick(due.replace(tzinfo=None))) == 1
+
+        # The previous run's job is still queued: the next slot waits for it
+        row = await _schedule_row()
+        assert await scheduler.tick(utc(row.start_after)) == []
+
+    asyncio.run(scenario())
+
+def test_catch_up_none_skips_missed_slots():
+    async def scenario():
+        await _reset()
+        scheduler = AgentScheduler({"vetting": {"interval": 60, "jitter": 0, "catch_up": "none"}})
+        scheduler.rules = load_schedules(scheduler.schedules)
+
+        slot = datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+        async with AsyncSessionLocal() as db:
+            db.add(AgentSchedule(agent_name="vetting", next_run_at=slot, start_after=slot, skipped_runs=0))
+            await db.commit()
+
+        # Back after ten minutes of downtime
+        now = slot + timedelta(minutes=10)
+        assert await scheduler.tick(now) == []
+        row = await _schedule_row()
+        assert row.skipped_runs == 1
+        assert utc(row.next_run_at) == now + timedelta(seconds=60)
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
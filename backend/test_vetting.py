@@ -0,0 +1,150 @@
+"""
+Tests for VettingAgent and the declarative vetting rules
+
+Runs against a throwaway SQLite database:
+    python test_vetting.py
+or with pytest:
+    pytest test_vetting.py
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+# Point the app at a scratch database before it creates its engine
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test_vetting.db')}"
+
+from sqlalchemy import delete, literal, select
+from app.agents import VettingAgent
+from app.database import AsyncSessionLocal, Base, engine
+from app.jobs.reconcile_lead_counters import run as reconcile
+from app.models import Lead, LeadCounter
+from app.services.vetting_rules import SQL_OPERATORS, VettingRule
+
+# The engine's own file: under pytest an earlier test module may have set it up
+DB_PATH = engine.url.database
+
+LEADS = [
+    # company_name, website
+    ("Acme Dental", "acme.com"),
+    ("Acme Dental", None),
+    ("Acme Dental", ""),
+    ("Acme Dental", "a.c"),
+    ("Ab", "ab-company.com"),
+    ("Abc", "abc.com"),
+    ("   ", "spaces.com"),
+    ("No Site", "   "),
+]
+
+def legacy_verdict(company_name, website):
+    """The per-lead checks VettingAgent ran before rules were declarative"""
+    if not website or len(website) < 4:
+        return "No valid website"
+    elif not company_name or len(company_name) < 3:
+        return "Invalid company name"
+    return None
+
+async def _reset(rows):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Lead))
+        await db.execute(delete(LeadCounter))
+        await db.commit()
+        # ORM inserts keep lead_counters in step
+        for row in rows:
+            db.add(Lead(**row))
+        await db.commit()
+
+async def _leads():
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Lead).order_by(Lead.id))).scalars().all()
+
+def test_default_rules_match_the_per_lead_checks():
+    async def scenario():
+        await _reset([{"company_name": name, "website": website} for name, website in LEADS])
+        result = await VettingAgent().run({"chunk_size": 3})
+        assert result.status == "success" and result.leads_processed == len(LEADS)
+
+        for lead in await _leads():
+            reason = legacy_verdict(lead.company_name, lead.website)
+            if reason:
+                assert (lead.status, lead.vetting_status) == ("rejected", "rejected"), lead.id
+                assert lead.pain_points == {"rejection_reason": reason}, lead.id
+            else:
+                assert (lead.status, lead.vetting_status) == ("vetted", "approved"), lead.id
+
+        assert (await reconcile(dry_run=True))["drifted_keys"] == 0
+
+    asyncio.run(scenario())
+
+def test_sql_and_python_operators_agree():
+    values = [None, "", " ", "ab", "abcd", "ACME", "acme.com", "50%_off"]
+    thresholds = {
+        "required": None, "min_length": 3, "max_length": 3, "equals": "ab",
+        "not_equals": "ab", "in": ["ab", "ACME"], "not_in": ["ab", "ACME"],
+        "gte": "b", "lte": "b", "contains": "acme", "not_contains": "%_",
+    }
+    assert set(thresholds) == set(SQL_OPERATORS)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            for operator, threshold in thresholds.items():
+                rule = VettingRule.from_dict({"field": "website", "operator": operator, "threshold": threshold})
+                for value in values:
+                    predicate = SQL_OPERATORS[operator](literal(value), rule.threshold)
+                    in_sql = bool((await db.execute(select(predicate))).scalar())
+                    in_python = rule.batch_predicate([value])[0]
+                    assert in_sql == in_python, (operator, value)
+
+    asyncio.run(scenario())
+
+def test_lead_committed_into_a_chunk_is_left_pending():
+    """A pending lead committed inside a chunk's id range must not be vetted uncounted"""
+    async def scenario():
+        await _reset([
+            {"id": 1, "company_name": "Acme One", "website": "one.com"},
+            {"id": 3, "company_name": "Acme Three", "website": "three.com"},
+        ])
+
+        # Another writer commits lead 2, with its counter, between the
+        # chunk's SELECT and its UPDATEs. A rule without SQL form runs there
+        def insert_late():
+            with sqlite3.connect(DB_PATH) as conn:
+                conn.execute(
+                    "INSERT INTO leads (id, company_name, website, status, vetting_status, score) "
+                    "VALUES (2, 'Acme Two', 'two.com', 'new', 'pending', 0)"
+                )
+                conn.execute(
+                    "UPDATE lead_counters SET count = count + 1 "
+                    "WHERE status = 'new' AND vetting_status = 'pending' AND region = ''"
+                )
+
+        batch_predicate = VettingRule.batch_predicate
+        def late_batch_predicate(rule, values):
+            if len(values) == 2:
+                insert_late()
+            return batch_predicate(rule, values)
+
+        VettingRule.batch_predicate = late_batch_predicate
+        try:
+            result = await VettingAgent().run({
+                "rules": [{"field": "website", "operator": "matches", "threshold": r"\.", "reason": "No dot"}]
+            })
+        finally:
+            VettingRule.batch_predicate = batch_predicate
+
+        assert result.metadata["approved"] == 2
+        statuses = {lead.id: lead.vetting_status for lead in await _leads()}
+        assert statuses == {1: "approved", 2: "pending", 3: "approved"}
+        assert (await reconcile(dry_run=True))["drifted_keys"] == 0
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in list(globals().items()) if name.startswith("test_")]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
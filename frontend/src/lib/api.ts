@@ -13,10 +13,63 @@ export const api = axios.create({
 });
 
 // Lead API
+export interface LeadListParams {
+    cursor?: string;  // X-Next-Cursor header of the previous page
+    limit?: number;
+    sort?: 'created_at' | 'score';
+    order?: 'asc' | 'desc';
+    status?: string;
+    region?: string;
+    vetting_status?: string;
+    min_score?: number;
+    max_score?: number;
+    created_after?: string;
+    created_before?: string;
+}
+
+// Leads targeted by a bulk update or delete; `filter: {}` selects every lead
+export interface LeadFilter {
+    status?: string;
+    region?: string;
+    vetting_status?: string;
+    min_score?: number;
+    max_score?: number;
+    created_after?: string;
+    created_before?: string;
+}
+
+export type LeadSelection = { ids: number[] } | { filter: LeadFilter };
+
+export interface LeadStats {
+    total: number;
+    by_status: Record<string, number>;
+    by_vetting_status: Record<string, number>;
+    by_region: Record<string, number>;
+    score_histogram: { min: number; max: number; count: number }[];
+    average_score: number | null;
+    generated_at: string;
+}
+
+// Page of GET /api/leads/changes (also the data of its `changes` events)
+export interface LeadChanges {
+    changes: any[];
+    deleted: number[];
+    cursor: string;
+    has_more: boolean;
+}
+
 export const leadsApi = {
-    list: (params?: { skip?: number; limit?: number; status?: string }) =>
+    list: (params?: LeadListParams) =>
         api.get('/api/leads', { params }),
 
+    stats: () =>
+        api.get<LeadStats>('/api/leads/stats'),
+
+    // Best matches first; pass the X-Next-Cursor header back as `cursor`
+    // (X-Search-Truncated: true when only the newest matches were ranked)
+    search: (q: string, params?: { cursor?: string; limit?: number } & LeadFilter) =>
+        api.get('/api/leads/search', { params: { q, ...params } }),
+
     get: (id: number) =>
         api.get(`/api/leads/${id}`),
 
@@ -28,6 +81,21 @@ export const leadsApi = {
 
     delete: (id: number) =>
         api.delete(`/api/leads/${id}`),
+
+    bulkUpdate: (selection: LeadSelection, changes: any) =>
+        api.patch<{ updated: number }>('/api/leads/', { ...selection, changes }),
+
+    bulkDelete: (selection: LeadSelection) =>
+        api.delete<{ deleted: number }>('/api/leads/', { data: selection }),
+
+    // Without `since`: a cursor for "now", to take before loading leads
+    changes: (since?: string) =>
+        api.get<LeadChanges>('/api/leads/changes', { params: { since } }),
+
+    // Pushes `changes` events after `since`; reconnects resume by event id.
+    // A `resync` event ends the stream when `since` is older than the kept history
+    streamChanges: (since: string) =>
+        new EventSource(`${API_BASE_URL}/api/leads/changes?since=${encodeURIComponent(since)}`),
 };
 
 // Project API
@@ -46,10 +114,32 @@ export const projectsApi = {
 };
 
 // Agent API
+// Event from GET /api/agents/stream
+export interface AgentEvent {
+    id: number;
+    type: 'agent.started' | 'agent.progress' | 'agent.finished' | 'agent.failed';
+    agent_name: string;
+    log_id: number;
+    time: string;
+    leads_processed?: number;
+    status?: string;
+    error_message?: string | null;
+    metadata?: Record<string, any> | null;
+    duration?: number;
+}
+
+export const AGENT_EVENT_TYPES: AgentEvent['type'][] = [
+    'agent.started', 'agent.progress', 'agent.finished', 'agent.failed',
+];
+
 export const agentsApi = {
     execute: (agentName: string, context?: any) =>
         api.post('/api/agents/execute', { agent_name: agentName, context }),
 
     getLogs: (params?: { skip?: number; limit?: number; agent_name?: string }) =>
         api.get('/api/agents/logs', { params }),
+
+    // EventSource reconnects by itself and resumes from the last event id
+    stream: () =>
+        new EventSource(`${API_BASE_URL}/api/agents/stream`),
 };
@@ -1,5 +1,6 @@
-import { useState, useEffect } from 'react';
-import { agentsApi } from '../lib/api';
+import { useState, useEffect, useRef } from 'react';
+import { agentsApi, AGENT_EVENT_TYPES } from '../lib/api';
+import type { AgentEvent } from '../lib/api';
 import { Play, Clock, CheckCircle, XCircle } from 'lucide-react';
 
 interface AgentLog {
@@ -27,20 +28,72 @@ const AGENTS = [
     },
 ];
 
+// Re-read the log when the stream has been quiet this long: agents running
+// in a separate worker process (RUN_WORKERS_IN_WEB=false) send no events
+const QUIET_POLL_MS = 30000;
+
 
 export function Agents() {
     const [logs, setLogs] = useState<AgentLog[]>([]);
     const [executing, setExecuting] = useState<string | null>(null);
+    const lastUpdate = useRef(0);
 
     useEffect(() => {
-        fetchLogs();
-        const interval = setInterval(fetchLogs, 5000); // Refresh every 5s
-        return () => clearInterval(interval);
+        // Load the log once, then apply live events to it; resync after reconnects
+        const source = agentsApi.stream();
+        source.onopen = () => fetchLogs();
+        const onEvent = (message: MessageEvent) => {
+            lastUpdate.current = Date.now();
+            applyEvent(JSON.parse(message.data));
+        };
+        AGENT_EVENT_TYPES.forEach(type => source.addEventListener(type, onEvent));
+
+        const interval = setInterval(() => {
+            if (Date.now() - lastUpdate.current >= QUIET_POLL_MS) fetchLogs();
+        }, QUIET_POLL_MS);
+
+        return () => {
+            source.close();
+            clearInterval(interval);
+        };
     }, []);
 
+    const applyEvent = (event: AgentEvent) => {
+        setLogs(current => {
+            if (event.type === 'agent.started') {
+                if (current.some(log => log.id === event.log_id)) return current;
+                const started: AgentLog = {
+                    id: event.log_id,
+                    agent_name: event.agent_name,
+                    start_time: event.time,
+                    end_time: null,
+                    status: 'running',
+                    leads_processed: 0,
+                    error_message: null,
+                };
+                return [started, ...current].slice(0, 20);
+            }
+
+            return current.map(log => {
+                if (log.id !== event.log_id) return log;
+                if (event.type === 'agent.progress') {
+                    return { ...log, leads_processed: event.leads_processed ?? log.leads_processed };
+                }
+                return {
+                    ...log,
+                    status: event.status ?? log.status,
+                    end_time: event.time,
+                    leads_processed: event.leads_processed ?? log.leads_processed,
+                    error_message: event.error_message ?? null,
+                };
+            });
+        });
+    };
+
     const fetchLogs = async () => {
         try {
             const response = await agentsApi.getLogs({ limit: 20 });
+            lastUpdate.current = Date.now();
             setLogs(response.data);
         } catch (error) {
             console.error('Failed to fetch logs:', error);
@@ -51,15 +104,11 @@ export function Agents() {
         setExecuting(agentId);
 
         try {
+            // Queued; the run shows up through the event stream
             await agentsApi.execute(agentId);
-
-            // Wait a bit then refresh logs
-            setTimeout(() => {
-                fetchLogs();
-                setExecuting(null);
-            }, 2000);
         } catch (error) {
             console.error('Failed to execute agent:', error);
+        } finally {
             setExecuting(null);
         }
     };
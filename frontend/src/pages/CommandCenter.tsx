@@ -21,18 +21,15 @@ export function CommandCenter() {
     useEffect(() => {
         const fetchStats = async () => {
             try {
-                const [leadsResponse] = await Promise.all([
-                    leadsApi.list({ limit: 1000 }),
-                ]);
-
-                const leads = leadsResponse.data;
-                const approvedLeads = leads.filter((l: any) => l.vetting_status === 'approved');
+                // Aggregated server-side, no lead rows are transferred
+                const { data } = await leadsApi.stats();
+                const approvedLeads = data.by_vetting_status.approved ?? 0;
 
                 setStats({
-                    totalLeads: leads.length,
+                    totalLeads: data.total,
                     activeAgents: 4, // Placeholder
-                    pipelineValue: approvedLeads.length * 5000, // Estimated value
-                    conversionRate: leads.length > 0 ? (approvedLeads.length / leads.length) * 100 : 0,
+                    pipelineValue: approvedLeads * 5000, // Estimated value
+                    conversionRate: data.total > 0 ? (approvedLeads / data.total) * 100 : 0,
                 });
             } catch (error) {
                 console.error('Failed to fetch stats:', error);
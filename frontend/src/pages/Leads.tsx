@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import { leadsApi } from '../lib/api';
+import type { LeadChanges } from '../lib/api';
 import {
     DndContext,
     DragOverlay,
@@ -19,10 +20,13 @@ interface Lead {
     region: string | null;
     status: string;
     vetting_status: string;
-    score: number;
+    score: number | null;
     pain_points: any;
+    created_at: string;
 }
 
+const PAGE_SIZE = 100;
+
 const COLUMNS = [
     { id: 'new', label: 'New' },
     { id: 'vetted', label: 'Vetted' },
@@ -35,6 +39,8 @@ export function Leads() {
     const [leads, setLeads] = useState<Lead[]>([]);
     const [activeId, setActiveId] = useState<number | null>(null);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [discovering, setDiscovering] = useState(false);
     const [clearing, setClearing] = useState(false);
 
@@ -47,13 +53,58 @@ export function Leads() {
     );
 
     useEffect(() => {
-        fetchLeads();
+        // Take the change cursor before loading, then apply pushed changes
+        let source: EventSource | null = null;
+        let closed = false;
+        const subscribe = async () => {
+            try {
+                const { data } = await leadsApi.changes();
+                await fetchLeads();
+                if (closed) return;
+                source = leadsApi.streamChanges(data.cursor);
+                source.addEventListener('changes', (message: MessageEvent) =>
+                    applyChanges(JSON.parse(message.data)));
+                // The cursor fell behind the retained history: start over
+                source.addEventListener('resync', () => {
+                    source?.close();
+                    subscribe();
+                });
+            } catch (error) {
+                console.error('Failed to subscribe to lead changes:', error);
+                fetchLeads();
+            }
+        };
+        subscribe();
+        return () => {
+            closed = true;
+            source?.close();
+        };
     }, []);
 
+    const applyChanges = (page: LeadChanges) => {
+        setLeads(current => {
+            const deleted = new Set(page.deleted);
+            const changed = new Map<number, Lead>(page.changes.map(lead => [lead.id, lead]));
+            const updated = current
+                .filter(lead => !deleted.has(lead.id))
+                .map(lead => changed.get(lead.id) ?? lead);
+            // Leads not on the board only join it when they are newer than its
+            // oldest lead; older ones (e.g. touched by a vetting run) stay off
+            const known = new Set(current.map(lead => lead.id));
+            const oldest = current.reduce<string | null>(
+                (min, lead) => (min === null || lead.created_at < min ? lead.created_at : min), null);
+            const created = page.changes.filter(lead =>
+                !known.has(lead.id) && (oldest === null || lead.created_at >= oldest));
+            created.sort((a, b) => b.created_at.localeCompare(a.created_at));
+            return [...created, ...updated];
+        });
+    };
+
     const fetchLeads = async () => {
         try {
-            const response = await leadsApi.list({ limit: 100 });
+            const response = await leadsApi.list({ limit: PAGE_SIZE });
             setLeads(response.data);
+            setNextCursor(response.headers['x-next-cursor'] ?? null);
         } catch (error) {
             console.error('Failed to fetch leads:', error);
         } finally {
@@ -61,6 +112,24 @@ export function Leads() {
         }
     };
 
+    const loadMoreLeads = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const response = await leadsApi.list({ limit: PAGE_SIZE, cursor: nextCursor });
+            // A lead pushed by the change stream may already be on the board
+            setLeads(current => {
+                const known = new Set(current.map(lead => lead.id));
+                return [...current, ...response.data.filter((lead: Lead) => !known.has(lead.id))];
+            });
+            setNextCursor(response.headers['x-next-cursor'] ?? null);
+        } catch (error) {
+            console.error('Failed to load more leads:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const discoverLeads = async () => {
         setDiscovering(true);
         try {
@@ -92,18 +161,17 @@ export function Leads() {
     };
 
     const clearAllLeads = async () => {
-        if (!confirm(`Are you sure you want to delete all ${leads.length} leads? This action cannot be undone.`)) {
+        if (!confirm(`Are you sure you want to delete all ${leads.length} leads and their projects? This action cannot be undone.`)) {
             return;
         }
 
         setClearing(true);
         try {
-            // Delete each lead
-            await Promise.all(leads.map(lead => leadsApi.delete(lead.id)));
+            await leadsApi.bulkDelete({ ids: leads.map(lead => lead.id) });
             setLeads([]);
         } catch (error) {
             console.error('Failed to clear leads:', error);
-            alert('Failed to delete some leads. Please try again.');
+            alert('Failed to delete leads. Please try again.');
         } finally {
             setClearing(false);
         }
@@ -162,9 +230,18 @@ export function Leads() {
                 <div>
                     <h1 className="text-2xl sm:text-3xl font-bold">Leads Pipeline</h1>
                     <p className="text-zinc-400 mt-2 text-sm sm:text-base">Drag and drop leads between stages</p>
-                    <p className="text-sm text-zinc-500 mt-1">{leads.length} total leads</p>
+                    <p className="text-sm text-zinc-500 mt-1">{leads.length} {nextCursor ? 'leads loaded' : 'total leads'}</p>
                 </div>
                 <div className="flex gap-3 w-full sm:w-auto">
+                    {nextCursor && (
+                        <button
+                            onClick={loadMoreLeads}
+                            disabled={loadingMore}
+                            className="px-4 sm:px-6 py-2 sm:py-3 bg-zinc-800 hover:bg-zinc-700 disabled:opacity-50 disabled:cursor-not-allowed rounded-lg font-semibold flex items-center gap-2 transition-all text-sm sm:text-base flex-1 sm:flex-initial justify-center"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load More'}
+                        </button>
+                    )}
                     <button
                         onClick={clearAllLeads}
                         disabled={clearing || leads.length === 0}
@@ -291,7 +368,7 @@ function LeadCard({ lead, isDragging = false }: LeadCardProps) {
     `}>
             <div className="flex items-start justify-between mb-3">
                 <h4 className="font-semibold text-white line-clamp-1">{lead.company_name}</h4>
-                {lead.score > 0 && (
+                {(lead.score ?? 0) > 0 && (
                     <div className="flex items-center gap-1 text-xs text-green-400 bg-green-500/10 px-2 py-1 rounded">
                         <TrendingUp size={12} />
                         {lead.score}